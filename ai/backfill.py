@@ -0,0 +1,300 @@
+"""
+Bulk AI classification of existing tasks.
+
+POST /ai/backfill-jobs records a job (ai_backfill_jobs) with a filter over tasks;
+the BackfillRunner started in the lifespan walks the matching tasks in id order,
+AI_BACKFILL_BATCH_SIZE at a time. Each task of a batch is classified by the same
+recommendation path as POST /task/recommend-fields (micro-batched when that is on,
+but not cached), at most AI_BACKFILL_CONCURRENCY at once and
+AI_BACKFILL_RATE_PER_SECOND overall, with AI_BACKFILL_MAX_RETRIES retries.
+
+The results of a batch are written back in one transaction together with the
+job's counters and checkpoint (the last task id of the batch), so a restarted
+server resumes a job right after its last committed batch. A task only changes if
+the recommendation differs from what it has, and only if nobody updated it while
+it was being classified (its version is checked, like If-Match on PUT /task).
+"""
+import asyncio
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from ai.recommendations import recommend
+from config import Config
+from database.session import get_async_session
+from database.write_queue import run_write
+from models.ai_backfill_job import ACTIVE_STATUSES, AiBackfillJob
+from models.task import Task
+from schemas.ai_backfill import BackfillFilters
+from schemas.task import Priority, Severity
+
+
+class RateLimiter:
+    """
+        Spaces calls at least 1 / `rate` seconds apart, shared by every worker.
+    """
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate if rate > 0 else 0
+        self._next = 0.0
+
+    async def wait(self):
+        if not self.interval:
+            return
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        start = max(now, self._next)
+        self._next = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+def _task_conditions(filters: BackfillFilters) -> list:
+    conditions = []
+    for field in ("status", "severity", "priority"):
+        value = getattr(filters, field)
+        if value is not None:
+            conditions.append(getattr(Task, field) == value.value)
+    if filters.assignee is not None:
+        conditions.append(Task.assignee == filters.assignee)
+    if filters.created_after is not None:
+        conditions.append(Task.created_date >= filters.created_after)
+    if filters.created_before is not None:
+        conditions.append(Task.created_date < filters.created_before)
+    return conditions
+
+
+async def create_job(db: AsyncSession, filters: BackfillFilters, user_id: Optional[int]) -> AiBackfillJob:
+    """
+        Record a pending job over the tasks matching `filters` and commit it. The
+        runner picks it up with start_job().
+    """
+    total = await db.scalar(select(func.count()).select_from(Task).where(*_task_conditions(filters)))
+    job = AiBackfillJob(status="pending", filters=filters.model_dump_json(exclude_none=True), total=total,
+                        created_by=user_id)
+    db.add(job)
+    await db.commit()
+    return job
+
+
+class BackfillRunner:
+    """
+        Runs the backfill jobs of this process, one asyncio task per job.
+
+        Args:
+            session_factory: Sessions for reading batches and writing results.
+            concurrency: Tasks being classified at once, across all jobs.
+            rate: Classifications started per second at most, across all jobs (0 for no limit).
+            batch_size: Tasks per batch, and per write transaction.
+            max_retries: Further attempts for a task whose classification failed.
+            retry_delay: Seconds before the first retry, doubled for every further one.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker, concurrency: int, rate: float, batch_size: int,
+                 max_retries: int, retry_delay: float = 1.0):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self._slots = asyncio.Semaphore(concurrency)
+        self._limiter = RateLimiter(rate)
+        self._jobs: Dict[int, asyncio.Task] = {}
+        self.classified = 0
+        self.retries = 0
+
+    async def resume(self):
+        """
+            Start every job left pending or running, e.g. by a restart.
+        """
+        async with self.session_factory() as db:
+            ids = list(await db.scalars(select(AiBackfillJob.id).where(AiBackfillJob.status.in_(ACTIVE_STATUSES))))
+        for job_id in ids:
+            self.start_job(job_id)
+
+    def start_job(self, job_id: int):
+        if job_id not in self._jobs:
+            task = asyncio.create_task(self._run_job(job_id))
+            self._jobs[job_id] = task
+            task.add_done_callback(lambda _: self._jobs.pop(job_id, None))
+
+    async def cancel_job(self, db: AsyncSession, job_id: int) -> Optional[AiBackfillJob]:
+        """
+            Mark a pending or running job cancelled and stop it. The batch being
+            classified is dropped; what was committed before stays.
+
+            Returns:
+                Optional[AiBackfillJob]: The job, or None if there is none with this id.
+        """
+        job = await db.scalar(
+            update(AiBackfillJob)
+            .where(AiBackfillJob.id == job_id, AiBackfillJob.status.in_(ACTIVE_STATUSES))
+            .values(status="cancelled", finished_date=datetime.now())
+            .returning(AiBackfillJob)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        task = self._jobs.get(job_id)
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        return job or await db.get(AiBackfillJob, job_id)
+
+    async def stop(self):
+        """
+            Stop every job where it is; they stay running in the database and
+            are resumed from their checkpoint by the next resume().
+        """
+        for task in list(self._jobs.values()):
+            task.cancel()
+        await asyncio.gather(*self._jobs.values(), return_exceptions=True)
+        self._jobs.clear()
+
+    async def _run_job(self, job_id: int):
+        try:
+            async with self.session_factory() as db:
+                job = await db.get(AiBackfillJob, job_id)
+                filters = BackfillFilters.model_validate_json(job.filters)
+                checkpoint = job.checkpoint
+                await db.execute(
+                    update(AiBackfillJob)
+                    .where(AiBackfillJob.id == job_id, AiBackfillJob.status == "pending")
+                    .values(status="running")
+                )
+                await db.commit()
+
+            conditions = _task_conditions(filters)
+            while True:
+                async with self.session_factory() as db:
+                    statement = select(Task.id, Task.title, Task.description, Task.severity, Task.priority,
+                                       Task.version).where(*conditions)
+                    if checkpoint is not None:
+                        statement = statement.where(Task.id > checkpoint)
+                    rows = (await db.execute(statement.order_by(Task.id).limit(self.batch_size))).all()
+                if not rows:
+                    break
+
+                results = await asyncio.gather(*(self._classify(row.title, row.description) for row in rows))
+                checkpoint = rows[-1].id
+                if not await self._write_batch(job_id, rows, results, checkpoint):
+                    return  # Cancelled since the batch was read
+
+            await self._finish(job_id, "done")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"AI backfill job {job_id} failed: {e}")
+            await self._finish(job_id, "failed", str(e))
+
+    async def _classify(self, title: str, description: str) -> Optional[tuple]:
+        """
+            The (severity, priority) values recommended for a task, or None if
+            every attempt failed.
+        """
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self.retries += 1
+                await asyncio.sleep(self.retry_delay * 2 ** (attempt - 1))
+            async with self._slots:
+                await self._limiter.wait()
+                try:
+                    recommendation = await recommend(title, description)
+                    self.classified += 1
+                    return (Severity[recommendation["severity"].upper()].value,
+                            Priority[recommendation["priority"].upper()].value)
+                except Exception as e:
+                    error = e
+        print(f"AI backfill classification failed: {error}")
+        return None
+
+    async def _write_batch(self, job_id: int, rows: list, results: List[Optional[tuple]], checkpoint) -> bool:
+        changes = [
+            {"b_id": row.id, "b_version": row.version, "b_severity": result[0], "b_priority": result[1]}
+            for row, result in zip(rows, results)
+            if result is not None and result != (row.severity, row.priority)
+        ]
+        failed = results.count(None)
+
+        async def write(db: AsyncSession) -> Optional[int]:
+            progress = await db.execute(
+                update(AiBackfillJob)
+                .where(AiBackfillJob.id == job_id, AiBackfillJob.status == "running")
+                .values(processed=AiBackfillJob.processed + len(rows), failed=AiBackfillJob.failed + failed,
+                        checkpoint=checkpoint)
+            )
+            if not progress.rowcount:
+                return None  # Cancelled (possibly by another process): leave the tasks alone
+            if not changes:
+                return 0
+            result = await db.execute(
+                update(Task.__table__)
+                .where(Task.id == bindparam("b_id"), Task.version == bindparam("b_version"))
+                .values(severity=bindparam("b_severity"), priority=bindparam("b_priority"),
+                        version=Task.version + 1),
+                changes,
+            )
+            # Tasks updated (or deleted) since they were read keep what they have
+            await db.execute(
+                update(AiBackfillJob)
+                .where(AiBackfillJob.id == job_id)
+                .values(changed=AiBackfillJob.changed + result.rowcount,
+                        skipped=AiBackfillJob.skipped + len(changes) - result.rowcount)
+            )
+            return result.rowcount
+
+        async with self.session_factory() as db:
+            changed = await run_write(db, write)
+        if changed:
+            from api.feed import task_feed  # The api package imports this module through its routes
+            # Like the bulk endpoints: one re-fetch for /tasks/stream subscribers rather than a delta per task
+            task_feed.resync_all()
+        return changed is not None
+
+    async def _finish(self, job_id: int, status: str, error: Optional[str] = None):
+        async with self.session_factory() as db:
+            await db.execute(
+                update(AiBackfillJob)
+                .where(AiBackfillJob.id == job_id, AiBackfillJob.status.in_(ACTIVE_STATUSES))
+                .values(status=status, error=error, finished_date=datetime.now())
+            )
+            await db.commit()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": True,
+            "running_jobs": sorted(self._jobs),
+            "classified": self.classified,
+            "retries": self.retries,
+        }
+
+
+_runner: Optional[BackfillRunner] = None
+
+
+async def start_backfill_runner():
+    global _runner
+    if _runner is None and Config.AI_BACKFILL_ENABLED:
+        _runner = BackfillRunner(
+            get_async_session(),
+            concurrency=Config.AI_BACKFILL_CONCURRENCY,
+            rate=Config.AI_BACKFILL_RATE_PER_SECOND,
+            batch_size=Config.AI_BACKFILL_BATCH_SIZE,
+            max_retries=Config.AI_BACKFILL_MAX_RETRIES,
+        )
+        await _runner.resume()
+
+
+async def stop_backfill_runner():
+    global _runner
+    if _runner is not None:
+        await _runner.stop()
+    _runner = None
+
+
+def get_backfill_runner() -> Optional[BackfillRunner]:
+    return _runner
+
+
+def backfill_stats() -> dict:
+    return _runner.stats() if _runner is not None else {"enabled": False}
@@ -0,0 +1,144 @@
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy import text
+
+from database.session import get_async_session
+
+
+def recommendation_key(title: str, description: str) -> str:
+    """
+        Hash of the normalized title and description, so edits that only change
+        case or whitespace map to the same entry.
+    """
+    normalized = "\x1f".join(" ".join(value.split()).casefold() for value in (title, description))
+    return hashlib.sha256(normalized.encode()).hexdigest()
+
+
+class SqliteRecommendationStore:
+    """
+        Second cache tier in the recommendation_cache table, so entries survive restarts.
+    """
+
+    async def load(self, key: str) -> Optional[dict]:
+        async with get_async_session()() as db:
+            value = await db.scalar(
+                text("SELECT value FROM recommendation_cache WHERE key = :key AND expires_at > :now"),
+                {"key": key, "now": time.time()},
+            )
+        return json.loads(value) if value is not None else None
+
+    async def save(self, key: str, value: dict, ttl: float):
+        async with get_async_session()() as db:
+            await db.execute(
+                text("INSERT INTO recommendation_cache (key, value, expires_at) VALUES (:key, :value, :expires_at) "
+                     "ON CONFLICT (key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at"),
+                {"key": key, "value": json.dumps(value), "expires_at": time.time() + ttl},
+            )
+            await db.commit()
+
+
+class RecommendationCache:
+    """
+        Bounded LRU + TTL cache in front of the recommendation model.
+
+        Concurrent misses for the same key share a single upstream call. Failed
+        calls are not cached.
+
+        Args:
+            loader: Coroutine function (title, description) -> recommendation, called on a miss.
+            max_entries: Entries kept in memory before the least recently used is evicted.
+            ttl: Seconds an entry stays valid.
+            store: Optional persistent tier consulted before calling the loader.
+    """
+
+    def __init__(self, loader: Callable[[str, str], Awaitable[dict]], max_entries: int, ttl: float, store=None):
+        self.loader = loader
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.store = store
+        self._entries: OrderedDict = OrderedDict()  # key -> (expires_at, value)
+        self._inflight: dict = {}  # key -> load Task shared by concurrent misses
+        self.hits = 0
+        self.misses = 0
+        self.store_hits = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    async def get(self, title: str, description: str) -> dict:
+        key = recommendation_key(title, description)
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            del self._entries[key]
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            return await asyncio.shield(inflight)
+
+        self.misses += 1
+        # The load belongs to the cache, not to this request: a client disconnecting
+        # cancels its own wait only, never the load the other waiters share
+        load = asyncio.create_task(self._load_and_put(key, title, description))
+        self._inflight[key] = load
+        # Waiters re-raise a failure themselves; mark it retrieved so asyncio does not warn when none is left
+        load.add_done_callback(lambda task: task.cancelled() or task.exception())
+        return await asyncio.shield(load)
+
+    async def _load_and_put(self, key: str, title: str, description: str) -> dict:
+        try:
+            value = await self._load(key, title, description)
+            self._put(key, value)
+            return value
+        finally:
+            del self._inflight[key]
+
+    async def _load(self, key: str, title: str, description: str) -> dict:
+        # The persistent tier is best effort, a broken store must not fail recommendations
+        if self.store is not None:
+            try:
+                value = await self.store.load(key)
+            except Exception as e:
+                print(e)
+                value = None
+            if value is not None:
+                self.store_hits += 1
+                return value
+
+        value = await self.loader(title, description)
+        if self.store is not None:
+            try:
+                await self.store.save(key, value, self.ttl)
+            except Exception as e:
+                print(e)
+        return value
+
+    def _put(self, key: str, value: dict):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "store_hits": self.store_hits,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+        }
@@ -0,0 +1,27 @@
+from typing import Optional
+
+import openai
+
+from config import Config
+
+_openai_client: Optional[openai.AsyncOpenAI] = None
+
+
+def get_openai_client() -> openai.AsyncOpenAI:
+    """
+        Return the process-wide OpenAI client, created on first use.
+    """
+    global _openai_client
+    if _openai_client is None:
+        if not Config.OPENAI_API_KEY:
+            raise ValueError("Missing OpenAI API key. Set OPENAI_API_KEY in your .env file or environment variables.")
+        _openai_client = openai.AsyncOpenAI(api_key=Config.OPENAI_API_KEY)
+    return _openai_client
+
+
+def set_openai_client(client):
+    """
+        Replace the process-wide client, e.g. with a local fake in benchmarks.
+    """
+    global _openai_client
+    _openai_client = client
@@ -0,0 +1,264 @@
+import asyncio
+import json
+from typing import List, Optional, Tuple
+
+from ai.cache import RecommendationCache, SqliteRecommendationStore
+from ai.client import get_openai_client
+from config import Config
+from metrics import track_openai
+
+MODEL = "gpt-3.5-turbo"
+
+
+def build_prompt(title: str, description: str) -> str:
+    return (
+        "Based on the following task title and description, suggest a severity level (Low, Medium, High) "
+        "and a priority level (Low, Medium, High). \n"
+        f"Title: {title}\n"
+        f"Description: {description}\n\n"
+        "Respond in this exact format "
+        "{'severity': <Severity Level you recommend (from the options provided earlier), 'priority': <Priority Level you recommend>} \n"
+        "Return in valid JSON that I can simply parse without extra steps."
+    )
+
+
+def parse_recommendation(ai_response: str) -> dict:
+    obj = json.loads(ai_response)
+    severity = obj['severity']
+    priority = obj['priority']
+
+    if not severity or not priority:
+        raise ValueError("Invalid AI response format")
+
+    return {"severity": severity, "priority": priority}
+
+
+async def fetch_recommendation(client, title: str, description: str) -> dict:
+    """
+        Ask the model for a severity and priority. `client` is an openai.AsyncOpenAI
+        or anything exposing the same `chat.completions.create` coroutine.
+    """
+    with track_openai("recommendation") as call:
+        response = await client.chat.completions.create(
+            model=MODEL,
+            messages=[{"role": "user", "content": build_prompt(title, description)}],
+            max_tokens=20,  # Allow enough space for both values
+        )
+        call.record_usage(getattr(response, "usage", None))
+    return parse_recommendation(response.choices[0].message.content.strip())
+
+
+def build_batch_prompt(tasks: List[Tuple[str, str]]) -> str:
+    listed = "\n\n".join(
+        f"Task {n}:\nTitle: {title}\nDescription: {description}" for n, (title, description) in enumerate(tasks, 1)
+    )
+    return (
+        f"For each of the following {len(tasks)} tasks, suggest a severity level (Low, Medium, High) "
+        "and a priority level (Low, Medium, High).\n\n"
+        f"{listed}\n\n"
+        "Respond with a JSON array with exactly one element per task, in the same order, each element in this "
+        "exact format {\"severity\": <Severity Level>, \"priority\": <Priority Level>}. "
+        "Return only the JSON array, so I can parse it without extra steps."
+    )
+
+
+def parse_batch_recommendations(ai_response: str, count: int) -> List[Optional[dict]]:
+    """
+        Parse the answer to a batch prompt. Elements that are not a valid
+        recommendation come back as None, so only those need asking again.
+
+        Raises:
+            ValueError: If the answer is not a JSON array of `count` elements.
+    """
+    items = json.loads(ai_response)
+    if not isinstance(items, list) or len(items) != count:
+        raise ValueError(f"Expected a JSON array of {count} recommendations")
+
+    parsed = []
+    for item in items:
+        try:
+            parsed.append(parse_recommendation(json.dumps(item)))
+        except (KeyError, TypeError, ValueError):
+            parsed.append(None)
+    return parsed
+
+
+async def fetch_batch_recommendations(client, tasks: List[Tuple[str, str]]) -> List[Optional[dict]]:
+    with track_openai("recommendation_batch") as call:
+        response = await client.chat.completions.create(
+            model=MODEL,
+            messages=[{"role": "user", "content": build_batch_prompt(tasks)}],
+            max_tokens=20 * len(tasks) + 10,
+        )
+        call.record_usage(getattr(response, "usage", None))
+    return parse_batch_recommendations(response.choices[0].message.content.strip(), len(tasks))
+
+
+class RecommendationBatcher:
+    """
+        Micro-batching in front of the model: recommendations requested within
+        `window` seconds of each other (up to `max_batch`) are asked for in one
+        prompt returning a JSON array, and each caller gets its own element.
+
+        A batch whose answer cannot be parsed is asked again one task per call;
+        when only some elements are invalid, only those are. An error from the
+        batch call itself (e.g. a rate limit) fails every request of the batch,
+        as retrying them one by one would only make it worse.
+
+        Args:
+            client_factory: Returns the openai.AsyncOpenAI-like client to use.
+            window: Seconds to wait for more requests after the first one arrives.
+            max_batch: Tasks per prompt at most.
+    """
+
+    def __init__(self, client_factory, window: float, max_batch: int):
+        self.client_factory = client_factory
+        self.window = window
+        self.max_batch = max_batch
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._worker: Optional[asyncio.Task] = None
+        self._calls = set()
+        self.batches = 0
+        self.requests = 0
+        self.fallbacks = 0
+
+    def start(self):
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+            Stop collecting, and let the batches already sent finish.
+        """
+        if self._worker is not None:
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+        await asyncio.gather(*self._calls, return_exceptions=True)
+        self._worker = None
+
+    async def submit(self, title: str, description: str) -> dict:
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((title, description, future))
+        return await future
+
+    async def _next_batch(self) -> list:
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.window
+        while len(batch) < self.max_batch:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = [item for item in await self._next_batch() if not item[2].done()]
+            if batch:
+                # Sent concurrently: the next batch is collected while this one is answered
+                call = asyncio.create_task(self._send(batch))
+                self._calls.add(call)
+                call.add_done_callback(self._calls.discard)
+
+    async def _send(self, batch: list):
+        # Whatever goes wrong, no request of the batch is left waiting
+        try:
+            await self._answer(batch)
+        except asyncio.CancelledError:
+            for _, _, future in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+    async def _answer(self, batch: list):
+        self.batches += 1
+        self.requests += len(batch)
+        client = self.client_factory()
+        if len(batch) == 1:
+            results = [None]
+        else:
+            tasks = [(title, description) for title, description, _ in batch]
+            try:
+                results = await fetch_batch_recommendations(client, tasks)
+            except (ValueError, KeyError, TypeError, AttributeError, IndexError):
+                results = [None] * len(batch)
+
+        # Single requests, and the elements the batch answer got wrong, are asked alone
+        retry = [(item, n) for n, item in enumerate(batch) if results[n] is None]
+        self.fallbacks += len(retry) if len(batch) > 1 else 0
+        answers = await asyncio.gather(
+            *(fetch_recommendation(client, title, description) for (title, description, _), _ in retry),
+            return_exceptions=True,
+        )
+        for (_, n), answer in zip(retry, answers):
+            results[n] = answer
+
+        for (_, _, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": True,
+            "batches": self.batches,
+            "requests": self.requests,
+            "fallbacks": self.fallbacks,
+            "pending": self._queue.qsize(),
+        }
+
+
+_batcher: Optional[RecommendationBatcher] = None
+
+
+def start_recommendation_batcher():
+    global _batcher
+    if _batcher is None and Config.RECOMMENDATION_BATCH_ENABLED:
+        _batcher = RecommendationBatcher(
+            get_openai_client,
+            window=Config.RECOMMENDATION_BATCH_WINDOW_MS / 1000,
+            max_batch=Config.RECOMMENDATION_BATCH_MAX_SIZE,
+        )
+        _batcher.start()
+
+
+async def stop_recommendation_batcher():
+    global _batcher
+    if _batcher is not None:
+        await _batcher.stop()
+    _batcher = None
+
+
+async def recommend(title: str, description: str) -> dict:
+    """
+        A recommendation from the model: through the batcher when it is running,
+        otherwise with a call of its own.
+    """
+    if _batcher is None:
+        return await fetch_recommendation(get_openai_client(), title, description)
+    return await _batcher.submit(title, description)
+
+
+def recommendation_batch_stats() -> dict:
+    return _batcher.stats() if _batcher is not None else {"enabled": False}
+
+
+recommendation_cache = RecommendationCache(
+    loader=recommend,
+    max_entries=Config.RECOMMENDATION_CACHE_SIZE,
+    ttl=Config.RECOMMENDATION_CACHE_TTL,
+    store=SqliteRecommendationStore() if Config.RECOMMENDATION_CACHE_PERSIST else None,
+)
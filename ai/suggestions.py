@@ -0,0 +1,53 @@
+from typing import AsyncIterator, Iterable
+
+from ai.recommendations import MODEL
+from metrics import track_openai
+
+MAX_TOKENS = 20
+
+
+def build_prompt(descriptions: Iterable[str]) -> str:
+    prompt = (
+        "Based on the following task descriptions, generate a new task description for someone to complete:"
+    )
+
+    for description in descriptions:
+        prompt += f'\n{description}'
+
+    return prompt
+
+
+async def fetch_suggestion(client, descriptions: Iterable[str]) -> str:
+    with track_openai("suggestion") as call:
+        response = await client.chat.completions.create(
+            model=MODEL,
+            messages=[{"role": "user", "content": build_prompt(descriptions)}],
+            max_tokens=MAX_TOKENS,
+        )
+        call.record_usage(getattr(response, "usage", None))
+    return response.choices[0].message.content.strip()
+
+
+async def stream_suggestion(client, descriptions: Iterable[str]) -> AsyncIterator[str]:
+    """
+        Yield the suggestion's text as the model produces it.
+
+        Closing the generator (e.g. when it is cancelled because the HTTP client went
+        away) closes the upstream response, which aborts the completion.
+    """
+    with track_openai("suggestion_stream") as call:
+        stream = await client.chat.completions.create(
+            model=MODEL,
+            messages=[{"role": "user", "content": build_prompt(descriptions)}],
+            max_tokens=MAX_TOKENS,
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        try:
+            async for chunk in stream:
+                # Usage comes in a final chunk without choices
+                call.record_usage(getattr(chunk, "usage", None))
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            await stream.close()
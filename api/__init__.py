@@ -1,9 +1,15 @@
+from api.routes.admin import router as admin_router
+from api.routes.ai_backfill import router as ai_backfill_router
 from api.routes.auth import router as auth_router
+from api.routes.metrics import router as metrics_router
 from api.routes.task import router as task_router
 from api.routes.user import router as user_router
 
 __all__ = [
+    "admin_router",
+    "ai_backfill_router",
     "auth_router",
+    "metrics_router",
     "task_router",
     "user_router",
 ]
\ No newline at end of file
@@ -0,0 +1,44 @@
+import hashlib
+
+from fastapi import Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.table_version import TableVersion
+
+
+async def table_etag(db: AsyncSession, request: Request, *tables: str) -> str:
+    """
+        Strong ETag for a response built from `tables`, derived from their change
+        counters and the request's path and query string.
+
+        Call it before the route's own queries: the SELECT starts the read
+        transaction, so the rows that follow come from the same snapshot as the version.
+        The versions are kept in request.state.table_versions for the route to reuse.
+    """
+    versions = (await db.execute(
+        select(TableVersion.name, TableVersion.version).where(TableVersion.name.in_(tables))
+    )).all()
+    request.state.table_versions = dict(versions)
+    shape = [request.url.path, sorted(request.query_params.multi_items()), sorted(versions)]
+    return '"' + hashlib.sha256(repr(shape).encode()).hexdigest()[:32] + '"'
+
+
+def etag_headers(etag: str) -> dict:
+    # no-cache lets clients keep the body but makes them revalidate on every poll
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+
+def not_modified(request: Request, etag: str) -> bool:
+    """
+        Whether the request's If-None-Match matches `etag` (weak comparison, as RFC 9110 requires for GET).
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [candidate.strip().removeprefix("W/") for candidate in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def not_modified_response(etag: str) -> Response:
+    return Response(status_code=304, headers=etag_headers(etag))
@@ -0,0 +1,146 @@
+import asyncio
+import json
+from collections import defaultdict
+from typing import Optional
+
+from fastapi.encoders import jsonable_encoder
+
+from config import Config
+
+
+def sse_event(event: str, data: str) -> str:
+    lines = "".join(f"data: {line}\n" for line in data.split("\n"))
+    return f"event: {event}\n{lines}\n"
+
+
+RESYNC = sse_event("resync", "")
+
+
+class Subscription:
+    """
+        One change feed subscriber: its filters and a bounded queue of encoded events.
+
+        When the queue is full the pending events are dropped and replaced by a
+        single "resync" event; nothing more is queued until the subscriber reads
+        it, since it has to re-fetch the list anyway.
+    """
+
+    def __init__(self, status: Optional[int], assignee: Optional[int], max_queued: int):
+        self.status = status
+        self.assignee = assignee
+        self.queue: asyncio.Queue = asyncio.Queue(max_queued)
+        self.resync_pending = False
+        self.dropped = 0
+
+    def matches(self, status: int) -> bool:
+        # Same meaning as the GET /tasks filter: no status means every task that is not done
+        return status != 2 if self.status is None else status == self.status
+
+    def offer(self, event: str) -> bool:
+        """
+            Queue an event. Returns True if it overflowed the queue and triggered a resync.
+        """
+        if self.resync_pending:
+            self.dropped += 1
+            return False
+        try:
+            self.queue.put_nowait(event)
+            return False
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return self.resync()
+
+    def resync(self) -> bool:
+        if self.resync_pending:
+            return False
+        while not self.queue.empty():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(RESYNC)
+        self.resync_pending = True
+        return True
+
+    async def get(self) -> str:
+        event = await self.queue.get()
+        if event is RESYNC:
+            self.resync_pending = False
+        return event
+
+
+class TaskFeed:
+    """
+        In-process publish/subscribe of task changes, fanned out to the
+        GET /tasks/stream subscribers whose status and assignee filters match.
+
+        Each event is encoded once and shared by every queue it is put on.
+        Events are only published after their transaction commits.
+
+        Args:
+            max_queued: Events buffered per subscriber before it is told to resync.
+    """
+
+    def __init__(self, max_queued: int):
+        self.max_queued = max_queued
+        # assignee filter (None = any, -1 = unassigned) -> subscriptions
+        self._subscribers: defaultdict = defaultdict(set)
+        self.published = 0
+        self.resyncs = 0
+
+    def subscribe(self, status: Optional[int] = None, assignee: Optional[int] = None) -> Subscription:
+        subscription = Subscription(status, assignee, self.max_queued)
+        self._subscribers[assignee].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscribers = self._subscribers.get(subscription.assignee)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.assignee]
+
+    def publish(self, event: str, task: dict, previous: Optional[dict] = None):
+        """
+            Send a task delta to the matching subscribers.
+
+            Args:
+                event: SSE event name ("created" or "updated").
+                task: The delta; must include the task's current `status` and `assignee`.
+                previous: The `status` and `assignee` before an update, so subscribers
+                    whose filter the task just left are told about it too. A missing
+                    key means the old value is unknown and matches every filter.
+        """
+        encoded = sse_event(event, json.dumps(jsonable_encoder(task), separators=(",", ":")))
+        self.published += 1
+
+        targets = set()
+        for values in (task, previous) if previous is not None else (task,):
+            if "assignee" in values:
+                assignee = values["assignee"] if values["assignee"] is not None else -1
+                groups = [self._subscribers.get(None, ()), self._subscribers.get(assignee, ())]
+            else:
+                groups = list(self._subscribers.values())
+            for subscribers in groups:
+                for subscription in subscribers:
+                    if "status" not in values or subscription.matches(values["status"]):
+                        targets.add(subscription)
+
+        for subscription in targets:
+            self.resyncs += subscription.offer(encoded)
+
+    def resync_all(self):
+        """
+            Tell every subscriber to re-fetch, for changes too large to send as deltas (bulk writes).
+        """
+        for subscribers in self._subscribers.values():
+            for subscription in subscribers:
+                self.resyncs += subscription.resync()
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": sum(len(subscribers) for subscribers in self._subscribers.values()),
+            "published": self.published,
+            "resyncs": self.resyncs,
+        }
+
+
+task_feed = TaskFeed(max_queued=Config.FEED_QUEUE_SIZE)
@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import security
+from database.archive import archive_stats, tier_sizes
+from database.db import get_async_db
+
+router = APIRouter()
+
+
+@router.get("/admin/tiers", response_model=dict)
+async def get_tiers(
+        db: AsyncSession = Depends(get_async_db),
+        _: security.Principal = Depends(security.get_principal),
+):
+    """
+        Rows and bytes of the live (tasks) and archive (tasks_archive) tiers, and
+        what the archive compactor has done so far.
+    """
+    return {"tiers": await tier_sizes(db), "compactor": archive_stats()}
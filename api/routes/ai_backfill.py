@@ -0,0 +1,86 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import security
+from ai.backfill import backfill_stats, create_job, get_backfill_runner
+from database.db import get_async_db
+from models.ai_backfill_job import AiBackfillJob
+from schemas.ai_backfill import BackfillFilters, BackfillJobResponse, BackfillJobsResponse
+
+router = APIRouter()
+
+
+def _job_response(job: AiBackfillJob) -> BackfillJobResponse:
+    return BackfillJobResponse.model_validate({
+        **{column.name: getattr(job, column.name) for column in AiBackfillJob.__table__.columns},
+        "filters": BackfillFilters.model_validate_json(job.filters),
+    })
+
+
+def _runner():
+    runner = get_backfill_runner()
+    if runner is None:
+        raise HTTPException(status_code=503, detail="AI backfill jobs are disabled")
+    return runner
+
+
+@router.post("/ai/backfill-jobs", response_model=BackfillJobResponse, status_code=202)
+async def start_backfill_job(
+        filters: BackfillFilters,
+        db: AsyncSession = Depends(get_async_db),
+        principal: security.Principal = Depends(security.get_principal),
+):
+    """
+        Classify the severity and priority of every (live) task matching the
+        filters with the model, in the background. Poll the job for progress.
+    """
+    runner = _runner()
+    job = await create_job(db, filters, principal.id)
+    runner.start_job(job.id)
+    return _job_response(job)
+
+
+@router.get("/ai/backfill-jobs", response_model=BackfillJobsResponse)
+async def get_backfill_jobs(
+        db: AsyncSession = Depends(get_async_db),
+        _: security.Principal = Depends(security.get_principal),
+        limit: int = Query(20, ge=1, le=100, description="Most recent jobs first"),
+):
+    jobs = await db.scalars(select(AiBackfillJob).order_by(AiBackfillJob.id.desc()).limit(limit))
+    return {"jobs": [_job_response(job) for job in jobs]}
+
+
+@router.get("/ai/backfill-jobs/stats", response_model=dict)
+async def get_backfill_stats(
+        _: security.Principal = Depends(security.get_principal),
+):
+    return backfill_stats()
+
+
+@router.get("/ai/backfill-jobs/{job_id}", response_model=BackfillJobResponse)
+async def get_backfill_job(
+        job_id: int,
+        db: AsyncSession = Depends(get_async_db),
+        _: security.Principal = Depends(security.get_principal),
+):
+    job = await db.get(AiBackfillJob, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_response(job)
+
+
+@router.post("/ai/backfill-jobs/{job_id}/cancel", response_model=BackfillJobResponse)
+async def cancel_backfill_job(
+        job_id: int,
+        db: AsyncSession = Depends(get_async_db),
+        _: security.Principal = Depends(security.get_principal),
+):
+    """
+        Stop a pending or running job. Tasks of the batches already written keep
+        their new values; cancelling a finished job changes nothing.
+    """
+    job = await _runner().cancel_job(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_response(job)
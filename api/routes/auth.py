@@ -1,59 +1,108 @@
 import json
 from datetime import timedelta
+from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 import security
-from database.db import get_db
+from config import Config
+from database.db import get_async_db
+from database.refresh_tokens import issue_refresh_token, revoke_refresh_token, rotate_refresh_token
+from database.user_directory import user_directory, users_version
 from models.users import User
-from schemas.auth import Token
+from schemas.auth import RefreshTokenRequest, Token
 from schemas.users import UserCreate
-from security import verify_password, hash_password
+from security import verify_password_async, hash_password_async
 
 router = APIRouter()
 
 
 @router.post("/signup")
-def create_user(
+async def create_user(
         user: UserCreate,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
 ):
-    # Hash the user's password
-    hashed_password = hash_password(user.password)
+    # Hash the user's password (bcrypt is CPU bound, it runs in the password process pool)
+    hashed_password = await hash_password_async(user.password)
 
     # Create a new user instance
     db_user = User(username=user.username, hashed_password=hashed_password)
 
     try:
         db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
+        await db.flush()
+        # Read in the inserting transaction: the version this signup moved the users table to
+        version = await users_version(db)
+        await db.commit()
+        user_directory.add(db_user.id, db_user.username, version)
         return {"message": "User created successfully", "user": {"username": db_user.username, "id": db_user.id}}
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=409, detail="Username already exists")
-    finally:
-        db.close()
+
+
+def _tokens(user_id: int, username: str, refresh_token: Optional[str] = None) -> dict:
+    expire = timedelta(minutes=Config.ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = security.create_access_token(
+        subject=json.dumps({"username": username, "id": user_id}),
+        expires_delta=expire
+    )
+    return {"access_token": access_token, "token_type": "bearer", "expires_in": int(expire.total_seconds()),
+            "refresh_token": refresh_token}
 
 
 @router.post("/login", response_model=Token)
-def login(
-        db: Session = Depends(get_db),
+async def login(
+        db: AsyncSession = Depends(get_async_db),
         form_data: OAuth2PasswordRequestForm = Depends(),
 ):
-    user = db.query(User).filter(User.username == form_data.username).first()
+    user = await db.scalar(select(User).filter(User.username == form_data.username))
     if not user:
         raise HTTPException(status_code=400, detail="User not found")
-    if not verify_password(form_data.password, str(user.hashed_password)):
+    if not await verify_password_async(form_data.password, str(user.hashed_password)):
         raise HTTPException(status_code=400, detail="Incorrect password")
 
-    expire = timedelta(minutes=30)
-    access_token = security.create_access_token(
-        subject=json.dumps({"username": user.username, "id": user.id}),
-        expires_delta=expire
-    )
+    refresh_token = None
+    if Config.REFRESH_TOKEN_TTL_DAYS > 0:
+        refresh_token = issue_refresh_token(db, user.id)
+        await db.commit()
+    return _tokens(user.id, user.username, refresh_token)
+
+
+@router.post("/token/refresh", response_model=Token)
+async def refresh_access_token(
+        body: RefreshTokenRequest,
+        db: AsyncSession = Depends(get_async_db),
+):
+    """
+        Exchange a refresh token for a new access token and a new refresh token,
+        without the password (and its bcrypt verification). The token sent is
+        used up: sending it again revokes every token descended from its login.
+    """
+    rotation = None
+    if Config.REFRESH_TOKEN_TTL_DAYS > 0:
+        rotation = await rotate_refresh_token(db, body.refresh_token)
+    if rotation is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return _tokens(rotation.user_id, rotation.username, rotation.refresh_token)
+
 
-    return {"access_token": access_token, "token_type": "bearer"}
+@router.post("/token/revoke", status_code=status.HTTP_204_NO_CONTENT)
+async def revoke_token(
+        body: RefreshTokenRequest,
+        db: AsyncSession = Depends(get_async_db),
+):
+    """
+        Log out: revoke a refresh token and every token descended from its login.
+        Answers 204 whether or not the token was valid.
+    """
+    await revoke_refresh_token(db, body.refresh_token)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
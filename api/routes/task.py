@@ -1,158 +1,242 @@
-import json
-from datetime import date
-from typing import Optional
+import asyncio
+import csv
+import io
+import re
+from datetime import date, datetime
+from typing import Any, AsyncIterator, List, Optional, Union
 from uuid import UUID
 
-import openai
-from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, case, func, literal_column, not_, or_, select, union_all
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 import security
+from ai.client import get_openai_client
+from ai.recommendations import recommendation_cache, recommendation_batch_stats
+from ai.suggestions import fetch_suggestion, stream_suggestion
+from api.etag import table_etag, etag_headers, not_modified, not_modified_response
+from api.feed import task_feed, sse_event
+from api.pagination import encode_cursor, decode_cursor
+from api.serialization import task_page_response, export_ndjson
 from config import Config
-from database.db import get_db
+from crud.task import create_values, update_values, update_task_row, bulk_create_tasks, bulk_update_tasks
+from database.db import get_async_db
+from database.session import get_async_session
+from database.user_directory import user_directory
+from database.write_queue import run_write, write_queue_stats
 from models.task import Task
+from models.task_archive import TaskArchive
+from models.task_search import tasks_fts, tasks_fts_match, task_rowid
+from models.task_stats import TaskAssigneeStats, TaskStats, TaskStatusTotal
 from models.users import User
 from schemas.task import TaskCreate, TaskCreateResponse, TaskUpdate, TaskUpdateResponse, TasksGetResponse, \
-    TaskRecommendSeverity, Status
+    TaskRecommendSeverity, Status, BulkResponse
 
 router = APIRouter()
 
-if not Config.OPENAI_API_KEY:
-    raise ValueError("Missing OpenAI API key. Set OPENAI_API_KEY in your .env file or environment variables.")
-
-openai_client = openai.OpenAI(api_key=Config.OPENAI_API_KEY)
-
 
 @router.post("/task", response_model=TaskCreateResponse)
-def create_task(
+async def create_task(
         task: TaskCreate,
-        db: Session = Depends(get_db),
-        _: str = Depends(security.token_required),
+        response: Response,
+        db: AsyncSession = Depends(get_async_db),
+        _: security.Principal = Depends(security.get_principal),
 ):
-    db_task = Task(
-        title=task.title,
-        description=task.description,
-        assignee=task.assignee,
-        status=task.status.value,
-        severity=task.severity.value,
-        priority=task.priority.value,
-        due_date=task.due_date,
-    )
+    values = create_values(task)
+
+    async def insert(session: AsyncSession) -> Task:
+        db_task = Task(**values)
+        session.add(db_task)
+        return db_task
+
     try:
-        db.add(db_task)
-        db.commit()
-        db.refresh(db_task)
+        db_task = await run_write(db, insert)
+        task_feed.publish("created", _task_delta(db_task))
+        response.headers["ETag"] = _task_etag(db_task)
         return db_task
 
     # TODO: Proper error handling
     except IntegrityError as e:
-        db.rollback()
+        await db.rollback()
         print(e)
         raise HTTPException(status_code=400, detail="Task not valid")
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail=f"Validation failed: {str(e)}")
 
 
-@router.put("/task/{task_id}", response_model=TaskUpdateResponse)
-def update_task(
-        task_id: str,
-        task: TaskUpdate,
-        db: Session = Depends(get_db),
-        _: str = Depends(security.token_required)
-):
+def _task_delta(task: Task, columns=None) -> dict:
+    """
+        Change feed payload for a task: every field, or only the `columns` an
+        update changed plus the id, status and assignee subscribers filter on.
+    """
+    delta = {"id": task.id, "status": task.status, "assignee": task.assignee}
+    for column in columns if columns is not None else ("title", "description", "severity", "priority", "due_date"):
+        delta[column] = getattr(task, column)
+    return delta
+
+
+def _task_etag(task: Task) -> str:
+    return f'"{task.version}"'
+
+
+def _if_match_version(if_match: Optional[str]) -> Optional[int]:
+    """
+        The version an If-Match header requires, or None when any version will do.
+        Only this API's own (strong) task ETags can match; anything else is a 412.
+    """
+    if if_match is None or if_match.strip() == "*":
+        return None
+    value = if_match.strip()
+    if len(value) > 2 and value[0] == value[-1] == '"' and value[1:-1].isdigit():
+        return int(value[1:-1])
+    raise HTTPException(status_code=412, detail="Task was modified, reload it and retry")
+
+
+def _parse_task_id(task_id: str) -> str:
     try:
-        task_id = UUID(task_id)
+        return str(UUID(task_id))
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid task id")
-    db_task = db.query(Task).filter(Task.id == str(task_id)).first()
 
+
+@router.get("/task/{task_id}", response_model=TaskCreateResponse)
+async def get_task(
+        task_id: str,
+        response: Response,
+        db: AsyncSession = Depends(get_async_db),
+        _: security.Principal = Depends(security.get_principal)
+):
+    task_id = _parse_task_id(task_id)
+    db_task = await db.get(Task, task_id) or await db.get(TaskArchive, task_id)
     if not db_task:
         raise HTTPException(status_code=404, detail="Task not found")
+    response.headers["ETag"] = _task_etag(db_task)
+    return db_task
 
-    if task.title:
-        db_task.title = task.title
-    if task.description:
-        db_task.description = task.description
-    if task.assignee:
-        db_task.assignee = None if task.assignee == -1 else task.assignee
-    if task.status:
-        db_task.status = task.status.value
-    if task.severity:
-        db_task.severity = task.severity.value
-    if task.priority:
-        db_task.priority = task.priority.value
-    if task.due_date:
-        db_task.due_date = task.due_date
+
+@router.put("/task/{task_id}", response_model=TaskUpdateResponse)
+async def update_task(
+        task_id: str,
+        task: TaskUpdate,
+        response: Response,
+        db: AsyncSession = Depends(get_async_db),
+        _: security.Principal = Depends(security.get_principal),
+        if_match: Optional[str] = Header(None, description="The task's ETag, to fail with 412 if it changed since"),
+):
+    """
+        Apply the non-empty fields in one UPDATE ... RETURNING statement. With
+        If-Match the update only happens if the task is still at that version.
+    """
+    task_id = _parse_task_id(task_id)
+    version = _if_match_version(if_match)
+    values = update_values(task)
 
     try:
-        db.commit()
-        db.refresh(db_task)
+        db_task = await run_write(db, lambda session: update_task_row(session, task_id, values, version))
+        if db_task is None:
+            # Only failed updates pay for a second query, to tell a missing task from a conflict
+            current = (await db.scalar(select(Task.version).where(Task.id == task_id))
+                       or await db.scalar(select(TaskArchive.version).where(TaskArchive.id == task_id)))
+            if current is None:
+                raise HTTPException(status_code=404, detail="Task not found")
+            raise HTTPException(status_code=412, detail="Task was modified, reload it and retry",
+                                headers={"ETag": f'"{current}"'})
+
+        # RETURNING only has the new row: a changed status or assignee had an unknown old value
+        previous = {column: getattr(db_task, column) for column in ("status", "assignee") if column not in values}
+        task_feed.publish("updated", _task_delta(db_task, values), previous)
+        response.headers["ETag"] = _task_etag(db_task)
         return db_task
 
+    except HTTPException:
+        await db.rollback()
+        raise
+
     # TODO: Proper error handling
     except IntegrityError as e:
-        db.rollback()
+        await db.rollback()
         print(e)
         raise HTTPException(status_code=400, detail="Task update failed due to integrity constraints")
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail=f"Update failed: {str(e)}")
 
 
-@router.get("/tasks", response_model=TasksGetResponse)
-def get_tasks(
-        db: Session = Depends(get_db),
-        _: str = Depends(security.token_required),
-        status: Optional[int] = Query(None, description="Filter by task status"),
-        assignee: Optional[int] = Query(None, description="Filter by assignee id"),
-        offset: int = Query(0, ge=0, description="Number of records to skip"),
-        limit: int = Query(10, ge=1, le=100, description="Limit the number of results"),
+def _resync_feed(response: dict):
+    # A bulk write is one re-fetch for every subscriber rather than thousands of deltas
+    if response["succeeded"]:
+        task_feed.resync_all()
+
+
+def _check_bulk_size(items: list):
+    if len(items) > Config.BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {Config.BULK_MAX_ITEMS} tasks per request")
+
+
+def _bulk_response(results: List[dict]) -> dict:
+    failed = sum(1 for result in results if result.get("error") is not None)
+    return {"succeeded": len(results) - failed, "failed": failed, "results": results}
+
+
+@router.post("/tasks/bulk", response_model=BulkResponse)
+async def create_tasks_bulk(
+        items: List[Any] = Body(..., description="Tasks to create, each validated as a TaskCreate"),
+        db: AsyncSession = Depends(get_async_db),
+        _: security.Principal = Depends(security.get_principal),
 ):
-    query = (
-        db.query(
-            Task.id,
-            Task.title,
-            Task.description,
-            User.username.label("assignee_name"),  # Fetch username from users table
-            Task.status,
-            Task.severity,
-            Task.priority,
-            Task.due_date
-        )
-        .outerjoin(User, Task.assignee == User.id)  # LEFT JOIN to include tasks with no assignee
-    )
+    _check_bulk_size(items)
+    try:
+        response = _bulk_response(await bulk_create_tasks(db, items))
+    except IntegrityError as e:
+        await db.rollback()
+        print(e)
+        raise HTTPException(status_code=400, detail="Tasks not valid, nothing was created")
+    _resync_feed(response)
+    return response
 
-    # Always exclude "Done" tasks (status = 1) unless explicitly filtered by status
-    if status is None:
-        query = query.filter(Task.status != 2)  # Exclude "Done" tasks
-    elif status is not None:
-        query = query.filter(Task.status == status)
 
-    if assignee == -1:
-        query = query.filter(Task.assignee.is_(None))
-    elif assignee is not None:
-        query = query.filter(Task.assignee == assignee)
+@router.patch("/tasks/bulk", response_model=BulkResponse)
+async def update_tasks_bulk(
+        items: List[Any] = Body(..., description="Updates, each a TaskUpdate plus the task's id"),
+        db: AsyncSession = Depends(get_async_db),
+        _: security.Principal = Depends(security.get_principal),
+):
+    _check_bulk_size(items)
+    try:
+        response = _bulk_response(await bulk_update_tasks(db, items))
+    except IntegrityError as e:
+        await db.rollback()
+        print(e)
+        raise HTTPException(status_code=400, detail="Task updates not valid, nothing was updated")
+    _resync_feed(response)
+    return response
 
-    total_count = query.count()
 
-    query = query.order_by(
-        Task.due_date.asc().nullslast(),
-        Task.priority.desc()
+def _list_columns(model=Task) -> tuple:
+    return (
+        model.id,
+        model.title,
+        model.description,
+        model.assignee,  # Named from the user directory, see _task_page
+        model.status,
+        model.severity,
+        model.priority,
+        model.due_date,
     )
 
-    tasks = query.offset(offset).limit(limit).all()
-
-    more = (offset + limit) < total_count
 
-    response = {
+def _task_page(tasks: list, names: dict, total: Optional[int], more: bool, offset: int, limit: int,
+               next_cursor: Optional[str]) -> dict:
+    return {
         "tasks": [
             {
                 "id": str(task.id),
                 "title": task.title,
                 "description": task.description,
-                "assignee_name": task.assignee_name or "Unassigned",
+                "assignee_name": names.get(task.assignee, "Unassigned"),
                 "status": task.status,
                 "severity": task.severity,
                 "priority": task.priority,
@@ -160,77 +244,375 @@ def get_tasks(
             } for task in tasks
         ],
         "pagination": {
-            "total": total_count,
+            "total": total,
             "more": more,
             "offset": offset,
-            "limit": limit
+            "limit": limit,
+            "next_cursor": next_cursor
         }
     }
 
-    return response
 
+def _filter_tasks(query, status: Optional[int], assignee: Optional[int], exclude_done: bool = True, model=Task):
+    # Exclude "Done" tasks (status = 2) unless explicitly filtered by status (or asked not to)
+    if status is not None:
+        query = query.filter(model.status == status)
+    elif exclude_done:
+        query = query.filter(model.status != 2)  # Exclude "Done" tasks
 
-@router.post("/task/recommend-fields")
-def recommend_severity_priority(
-        task: TaskRecommendSeverity,
-        _: str = Depends(security.token_required)
-):
-    prompt = (
-        "Based on the following task title and description, suggest a severity level (Low, Medium, High) "
-        "and a priority level (Low, Medium, High). \n"
-        f"Title: {task.title}\n"
-        f"Description: {task.description}\n\n"
-        "Respond in this exact format "
-        "{'severity': <Severity Level you recommend (from the options provided earlier), 'priority': <Priority Level you recommend>} \n"
-        "Return in valid JSON that I can simply parse without extra steps."
+    if assignee == -1:
+        query = query.filter(model.assignee.is_(None))
+    elif assignee is not None:
+        query = query.filter(model.assignee == assignee)
+
+    return query
+
+
+def _tiers(status: Optional[int], exclude_done: bool = True) -> tuple:
+    # Done tasks may have been archived, so reads that include them read both tables
+    if status == Status.DONE.value or (status is None and not exclude_done):
+        return Task, TaskArchive
+    return (Task,)
+
+
+def _order_tasks(query, model=Task):
+    # Task.id breaks ties so the order (and therefore the cursor) is total
+    return query.order_by(
+        model.due_date.asc().nullslast(),
+        model.priority.desc(),
+        model.id.asc()
     )
 
+
+def _task_sort_key(task) -> tuple:
+    # The _order_tasks order, for merging the rows of both tiers
+    return task.due_date is None, task.due_date or date.min, -task.priority, task.id
+
+
+def _task_cursor(task) -> str:
+    return encode_cursor(task.due_date.isoformat() if task.due_date else None, task.priority, str(task.id))
+
+
+async def _seek_tasks(db: AsyncSession, query, cursor: str, limit: int, model=Task) -> list:
+    """
+        Fetch the `limit` rows that follow the cursor's (due_date NULLS LAST, priority DESC, id) key.
+
+        The seek is split into the dated rows and the undated rows so each half is a
+        plain index range instead of an OR that would force a scan from the start.
+    """
+    due_date, priority, task_id = decode_cursor(cursor, 3)
     try:
-        response = openai_client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=20,  # Allow enough space for both values
-        )
+        due_date = date.fromisoformat(due_date) if due_date is not None else None
+        priority = int(priority)
+        task_id = str(UUID(str(task_id)))
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    same_key_or_before = or_(model.priority > priority, and_(model.priority == priority, model.id <= task_id))
+
+    if due_date is None:
+        result = await db.execute(_order_tasks(
+            query.filter(model.due_date.is_(None), model.priority <= priority, not_(same_key_or_before)), model
+        ).limit(limit))
+        return result.all()
+
+    result = await db.execute(_order_tasks(
+        query.filter(model.due_date >= due_date, not_(and_(model.due_date == due_date, same_key_or_before))), model
+    ).limit(limit))
+    rows = result.all()
+    if len(rows) < limit:
+        result = await db.execute(_order_tasks(query.filter(model.due_date.is_(None)), model).limit(limit - len(rows)))
+        rows += result.all()
+    return rows
+
+
+async def _task_rows(db: AsyncSession, model, status: Optional[int], assignee: Optional[int], offset: int,
+                     limit: int, cursor: Optional[str]) -> list:
+    query = _filter_tasks(
+        select(*_list_columns(model)), status, assignee, model=model
+    )
+    if cursor is None:
+        return (await db.execute(_order_tasks(query, model).offset(offset).limit(limit))).all()
+    return await _seek_tasks(db, query, cursor, limit, model)
+
 
-        ai_response = response.choices[0].message.content.strip()
+@router.get("/tasks", response_model=TasksGetResponse)
+async def get_tasks(
+        request: Request,
+        db: AsyncSession = Depends(get_async_db),
+        _: security.Principal = Depends(security.get_principal),
+        status: Optional[int] = Query(None, description="Filter by task status"),
+        assignee: Optional[int] = Query(None, description="Filter by assignee id"),
+        offset: int = Query(0, ge=0, description="Number of records to skip (ignored when a cursor is given)"),
+        limit: int = Query(10, ge=1, le=100, description="Limit the number of results"),
+        cursor: Optional[str] = Query(None, description="Continue after pagination.next_cursor of a previous page"),
+        include_total: bool = Query(False, description="Also count every matching task (slow on large tables)"),
+):
+    # Unchanged polls are answered from the version counters alone
+    etag = await table_etag(db, request, "tasks", "users")
+    if not_modified(request, etag):
+        return not_modified_response(etag)
+
+    tiers = _tiers(status)
+    if cursor is not None:
+        offset = 0
+
+    # The join never changes the number of rows, so count the tasks alone to stay on the indexes
+    total_count = None
+    if include_total:
+        total_count = 0
+        for model in tiers:
+            total_count += await db.scalar(
+                _filter_tasks(select(func.count(model.id)), status, assignee, model=model)
+            )
+
+    # Fetch one extra row to know whether there is a next page without counting
+    if len(tiers) == 1:
+        tasks = await _task_rows(db, Task, status, assignee, offset, limit + 1, cursor)
+    elif cursor is None:
+        # Both tiers merged and paged by SQLite, so a large offset is skipped there instead of loaded here
+        merged = union_all(*(
+            _filter_tasks(select(*_list_columns(model)), status, assignee, model=model) for model in tiers
+        )).subquery()
+        tasks = (await db.execute(_order_tasks(select(merged), merged.c).offset(offset).limit(limit + 1))).all()
+    else:
+        # The page after the cursor from each tier, merged in the same order. A task
+        # archived between the two queries would show up twice, hence the dict
+        rows = {}
+        for model in tiers:
+            for row in await _task_rows(db, model, status, assignee, 0, limit + 1, cursor):
+                rows[row.id] = row
+        tasks = sorted(rows.values(), key=_task_sort_key)[:limit + 1]
+
+    more = len(tasks) > limit
+    tasks = tasks[:limit]
+
+    # The users version was read for the ETag, in this same transaction
+    names = await user_directory.names(db, (task.assignee for task in tasks),
+                                       request.state.table_versions.get("users"))
+    page = _task_page(tasks, names, total_count, more, offset, limit, _task_cursor(tasks[-1]) if more else None)
+    # Rendered without the response_model round trip, see api/serialization.py
+    return task_page_response(page, etag_headers(etag))
+
+
+def _search_cursor(task, floor: int) -> str:
+    return encode_cursor(task.rank, task.rowid, floor)
+
+
+async def _search_floor(db: AsyncSession, match, status: Optional[int], assignee: Optional[int]) -> int:
+    """
+        Lowest rowid among the newest SEARCH_MAX_CANDIDATES matches that pass the
+        filters. Ranking is limited to rows at or above it: bm25 has to score every
+        candidate before the first row can be returned, which takes seconds for a
+        word in most tasks. The filters are applied first, so a filtered search never
+        loses matches to newer tasks it would not have returned anyway.
+    """
+    if Config.SEARCH_MAX_CANDIDATES <= 0:
+        return 0
+    query = select(tasks_fts.c.rowid).select_from(tasks_fts).join(Task, task_rowid == tasks_fts.c.rowid).where(match)
+    floor = await db.scalar(
+        _filter_tasks(query, status, assignee)
+        .order_by(tasks_fts.c.rowid.desc()).limit(1).offset(Config.SEARCH_MAX_CANDIDATES - 1)
+    )
+    return floor or 0
+
+
+def _match_expression(q: str) -> str:
+    """
+        FTS5 query for free text: every word must match, as a prefix. Words are
+        quoted, so FTS5 operators and syntax in `q` are searched for literally.
+    """
+    words = re.findall(r"\w+", q)
+    if not words:
+        raise HTTPException(status_code=400, detail="Search query has no words")
+    return " ".join(f'"{word}"*' for word in words)
+
+
+@router.get("/tasks/search", response_model=TasksGetResponse)
+async def search_tasks(
+        q: str = Query(..., min_length=1, max_length=200, description="Words to find in titles and descriptions"),
+        db: AsyncSession = Depends(get_async_db),
+        _: security.Principal = Depends(security.get_principal),
+        status: Optional[int] = Query(None, description="Filter by task status"),
+        assignee: Optional[int] = Query(None, description="Filter by assignee id"),
+        limit: int = Query(10, ge=1, le=100, description="Limit the number of results"),
+        cursor: Optional[str] = Query(None, description="Continue after pagination.next_cursor of a previous page"),
+):
+    """
+        Full-text search over task titles and descriptions, best match (bm25,
+        title hits weighted higher) first. Takes the same filters as GET /tasks.
+
+        Words matching more than SEARCH_MAX_CANDIDATES tasks (that pass the
+        filters) are ranked among the newest that many matches only.
+        Archived tasks (done for longer than ARCHIVE_AFTER_DAYS) are not searched.
+    """
+    match = tasks_fts_match.match(_match_expression(q))
+    query = (
+        select(*_list_columns(), tasks_fts.c.rank, tasks_fts.c.rowid)
+        .select_from(tasks_fts)
+        .join(Task, task_rowid == tasks_fts.c.rowid)
+        .where(match)
+    )
+    query = _filter_tasks(query, status, assignee)
+
+    # The floor travels in the cursor, so tasks created while paging do not reshuffle the results
+    if cursor is None:
+        floor = await _search_floor(db, match, status, assignee)
+    else:
+        rank, rowid, floor = decode_cursor(cursor, 3)
+        try:
+            rank, rowid, floor = float(rank), int(rowid), int(floor)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.where(or_(
+            tasks_fts.c.rank > rank,
+            and_(tasks_fts.c.rank == rank, tasks_fts.c.rowid > rowid),
+        ))
+    if floor:
+        query = query.where(tasks_fts.c.rowid >= floor)
+
+    tasks = (await db.execute(query.order_by(tasks_fts.c.rank, tasks_fts.c.rowid).limit(limit + 1))).all()
+    more = len(tasks) > limit
+    tasks = tasks[:limit]
+    names = await user_directory.names(db, (task.assignee for task in tasks))
+    return task_page_response(
+        _task_page(tasks, names, None, more, 0, limit, _search_cursor(tasks[-1], floor) if more else None)
+    )
+
+
+EXPORT_COLUMNS = ("id", "title", "description", "assignee", "assignee_name", "status", "severity", "priority",
+                  "due_date", "created_date", "updated_date")
+
+
+def _export_value(value):
+    return value.isoformat() if isinstance(value, (date, datetime)) else value
+
+
+def _csv_chunk(rows) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([_export_value(value) for value in row] for row in rows)
+    return buffer.getvalue()
+
+
+async def _export_rows(query, export_format: str) -> AsyncIterator[Union[str, bytes]]:
+    chunk = _csv_chunk if export_format == "csv" else export_ndjson
+    if export_format == "csv":
+        yield _csv_chunk([EXPORT_COLUMNS])
 
-        # Extract severity and priority using basic parsing
-        severity = None
-        priority = None
+    # Own session: request-scoped dependencies are closed before the body streams
+    async with get_async_session()() as db:
+        result = await db.stream(query.execution_options(yield_per=Config.EXPORT_BATCH_SIZE))
+        async for rows in result.partitions():
+            yield chunk(rows)
 
-        obj = json.loads(ai_response)
-        severity = obj['severity']
-        priority = obj['priority']
 
-        if not severity or not priority:
-            raise ValueError("Invalid AI response format")
+def _export_query(model, status: Optional[int], assignee: Optional[int], updated_since: Optional[datetime]):
+    query = select(
+        model.id,
+        model.title,
+        model.description,
+        model.assignee,
+        User.username.label("assignee_name"),
+        model.status,
+        model.severity,
+        model.priority,
+        model.due_date,
+        model.created_date,
+        model.updated_date,
+    ).outerjoin(User, model.assignee == User.id)
+    query = _filter_tasks(query, status, assignee, exclude_done=False, model=model)
 
-        return {"severity": severity, "priority": priority}
+    if updated_since is not None:
+        query = query.filter(model.updated_date >= updated_since)
+    return query
+
+
+@router.get("/tasks/export")
+async def export_tasks(
+        _: security.Principal = Depends(security.get_principal),
+        export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$",
+                                   description="ndjson (one JSON object per line) or csv"),
+        status: Optional[int] = Query(None, description="Filter by task status (default: every status)"),
+        assignee: Optional[int] = Query(None, description="Filter by assignee id (-1 for unassigned)"),
+        updated_since: Optional[datetime] = Query(None, description="Only tasks created or updated at or after this time"),
+):
+    """
+        Stream every matching task with its assignee's username, in batches read
+        through a server-side cursor, so memory stays flat however large the table.
+
+        Unlike GET /tasks, done tasks are included unless a status is given. For
+        incremental exports pass the largest updated_date of the previous export
+        as updated_since (rows at exactly that time are sent again); those come in
+        updated_date order. Otherwise archived tasks come after the live ones.
+    """
+    # One statement, so a task archived or restored mid-export is read from one
+    # snapshot and sent once
+    tiers = [_export_query(model, status, assignee, updated_since) for model in _tiers(status, exclude_done=False)]
+    query = tiers[0] if len(tiers) == 1 else union_all(*tiers)
+    if updated_since is not None:
+        # Each tier walks its updated_date index and SQLite merges the two, so no sort is needed
+        query = query.order_by(query.selected_columns.updated_date)
+
+    media_type = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        _export_rows(query, export_format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="tasks.{export_format}"'},
+    )
+
+
+@router.post("/task/recommend-fields")
+async def recommend_severity_priority(
+        task: TaskRecommendSeverity,
+        _: security.Principal = Depends(security.get_principal)
+):
+    try:
+        # Identical (normalized) titles and descriptions are answered from the cache
+        return await recommendation_cache.get(task.title, task.description)
 
     except Exception as e:
         print(e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/task/recommend-fields/stats", response_model=dict)
+async def get_recommendation_cache_stats(
+        _: security.Principal = Depends(security.get_principal)
+):
+    return {**recommendation_cache.stats(), "batching": recommendation_batch_stats()}
+
+
 @router.get("/tasks/open-count", response_model=dict)
-def get_open_tasks_count(
-        db: Session = Depends(get_db),
-        _: str = Depends(security.token_required),
+async def get_open_tasks_count(
+        db: AsyncSession = Depends(get_async_db),
+        _: security.Principal = Depends(security.get_principal),
         assignee: Optional[int] = Query(None, description="Filter by assignee id"),
         due_date: Optional[date] = Query(None, description="Filter by due date (YYYY-MM-DD)")
 ):
     try:
-        query = db.query(Task).filter(Task.status != Status.DONE.value)
-
-        if assignee == -1:
-            query = query.filter(Task.assignee.is_(None))
-        elif assignee is not None:
-            query = query.filter(Task.assignee == assignee)
-
+        # Summed from the trigger-maintained summaries instead of counting tasks. Only a
+        # due date needs task_stats (a row per status, assignee and due date); otherwise
+        # a rollup answers from at most a few rows
         if due_date is not None:
-            query = query.filter(Task.due_date == due_date)
-
-        open_count = query.count()
+            query = select(func.coalesce(func.sum(TaskStats.count), 0)).filter(
+                TaskStats.status != Status.DONE.value, TaskStats.due_date == due_date
+            )
+            if assignee == -1:
+                query = query.filter(TaskStats.assignee.is_(None))
+            elif assignee is not None:
+                query = query.filter(TaskStats.assignee == assignee)
+        elif assignee is not None:
+            query = select(func.coalesce(func.sum(TaskAssigneeStats.count), 0)).filter(
+                # -1 inlined, so the expression matches the one ux_task_assignee_stats_key is on
+                func.ifnull(TaskAssigneeStats.assignee, literal_column("-1")) == assignee,
+                TaskAssigneeStats.status != Status.DONE.value,
+            )
+        else:
+            query = select(func.coalesce(func.sum(TaskStatusTotal.count), 0)).filter(
+                TaskStatusTotal.status != Status.DONE.value
+            )
+
+        open_count = await db.scalar(query)
 
         return {"open_count": open_count}
     except Exception as e:
@@ -239,13 +621,16 @@ def get_open_tasks_count(
 
 
 @router.get("/tasks/percentage-complete", response_model=dict)
-def get_task_summaries(
-        db: Session = Depends(get_db),
-        _: str = Depends(security.token_required)
+async def get_task_summaries(
+        db: AsyncSession = Depends(get_async_db),
+        _: security.Principal = Depends(security.get_principal)
 ):
     try:
-        total_tasks = db.query(Task).count()
-        done_tasks = db.query(Task).filter(Task.status == Status.DONE.value).count()
+        # One row per status
+        done_count = case((TaskStatusTotal.status == Status.DONE.value, TaskStatusTotal.count), else_=0)
+        total_tasks, done_tasks = (await db.execute(
+            select(func.coalesce(func.sum(TaskStatusTotal.count), 0), func.coalesce(func.sum(done_count), 0))
+        )).one()
 
         return {
             "total": total_tasks,
@@ -256,29 +641,111 @@ def get_task_summaries(
         raise HTTPException(status_code=500, detail=f"Failed to fetch task summaries: {str(e)}")
 
 
+async def _recent_task_descriptions(db: AsyncSession, assignee: int) -> list:
+    tasks = await db.scalars(
+        select(Task.description).filter(Task.assignee == assignee).order_by(Task.created_date.desc()).limit(5)
+    )
+    return list(tasks)
+
+
 @router.post("/task/suggest-new", response_model=dict)
-def get_next_task_suggestion(
-        request: Request,
-        db: Session = Depends(get_db),
-        _: str = Depends(security.token_required),
+async def get_next_task_suggestion(
+        db: AsyncSession = Depends(get_async_db),
+        principal: security.Principal = Depends(security.get_principal),
 ):
     try:
-        current_user = security.get_current_user(request.headers["Authorization"])
-        tasks = db.query(Task).filter(Task.assignee == current_user).order_by(Task.created_date.desc()).limit(5).all()
-
-        prompt = (
-            "Based on the following task descriptions, generate a new task description for someone to complete:"
-        )
-
-        for task in tasks:
-            prompt += f'\n{task.description}'
-
-        response = openai_client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=20,  # Allow enough space for both values
-        )
-        description = response.choices[0].message.content.strip()
+        descriptions = await _recent_task_descriptions(db, principal.id)
+        description = await fetch_suggestion(get_openai_client(), descriptions)
         return {'newTaskDescription': description}
     except Exception as e:
         print(e)
+        raise HTTPException(status_code=502, detail=f"Failed to suggest a task: {str(e)}")
+
+
+async def _suggestion_events(recent: asyncio.Task) -> AsyncIterator[str]:
+    # Sent before any awaiting so the client gets its first byte immediately
+    yield ": connected\n\n"
+    try:
+        descriptions = await recent
+        async for token in stream_suggestion(get_openai_client(), descriptions):
+            yield sse_event("token", token)
+        yield sse_event("done", "")
+    except Exception as e:
+        print(e)
+        yield sse_event("error", str(e))
+    finally:
+        # Starlette cancels this generator when the client disconnects, which lands here
+        recent.cancel()
+
+
+@router.post("/task/suggest-new/stream")
+async def stream_next_task_suggestion(
+        principal: security.Principal = Depends(security.get_principal),
+):
+    """
+        Server-Sent Events variant of /task/suggest-new: "token" events carry the
+        suggestion as it is generated, followed by "done" (or "error").
+    """
+    async def lookup():
+        # Own session: request-scoped dependencies are closed before the body streams
+        async with get_async_session()() as db:
+            return await _recent_task_descriptions(db, principal.id)
+
+    # Start the prompt lookup now, it runs while the response is being set up and sent
+    recent = asyncio.create_task(lookup())
+    return StreamingResponse(
+        _suggestion_events(recent),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _feed_events(status: Optional[int], assignee: Optional[int]) -> AsyncIterator[str]:
+    # Subscribe inside the generator so a client that never starts reading cannot leak a subscription
+    subscription = task_feed.subscribe(status, assignee)
+    try:
+        yield ": connected\n\n"
+        while True:
+            try:
+                yield await asyncio.wait_for(subscription.get(), Config.FEED_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                # Keeps proxies from closing an idle stream
+                yield ": keep-alive\n\n"
+    finally:
+        task_feed.unsubscribe(subscription)
+
+
+@router.get("/tasks/stream")
+async def stream_task_changes(
+        _: security.Principal = Depends(security.get_principal),
+        status: Optional[int] = Query(None, description="Only tasks with this status (default: not done)"),
+        assignee: Optional[int] = Query(None, description="Only tasks of this assignee id (-1 for unassigned)"),
+):
+    """
+        Server-Sent Events feed of task changes, replacing GET /tasks polling.
+
+        "created" and "updated" events carry task deltas; an update only has the
+        changed fields plus id, status and assignee, and is also sent when the
+        task just left the filter. "resync" means events were dropped (the client
+        fell behind, or after a bulk write) and the list has to be re-fetched.
+        Fetch the list after ": connected" to not miss anything.
+    """
+    return StreamingResponse(
+        _feed_events(status, assignee),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/tasks/write-queue/stats", response_model=dict)
+async def get_write_queue_stats(
+        _: security.Principal = Depends(security.get_principal)
+):
+    return write_queue_stats()
+
+
+@router.get("/tasks/stream/stats", response_model=dict)
+async def get_task_feed_stats(
+        _: security.Principal = Depends(security.get_principal)
+):
+    return task_feed.stats()
@@ -1,20 +1,39 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 
 import security
-from database.db import get_db
-from models.users import User
+from api.etag import table_etag, etag_headers, not_modified, not_modified_response
+from database.db import get_async_db
+from database.user_directory import user_directory
 
 router = APIRouter()
 
 
 @router.get("/users")
-def get_users(
-        db: Session = Depends(get_db),
-        _: str = Depends(security.token_required),
+async def get_users(
+        request: Request,
+        response: Response,
+        db: AsyncSession = Depends(get_async_db),
+        _: security.Principal = Depends(security.get_principal),
+        prefix: str = Query("", max_length=100, description="Only usernames starting with this"),
+        offset: int = Query(0, ge=0, description="Number of users to skip"),
+        limit: Optional[int] = Query(None, ge=1, le=1000, description="Limit the number of users (default: all)"),
 ):
+    """
+        Users in username order, from the in-memory user directory. The number of
+        users matching the prefix is in the X-Total-Count header.
+    """
     try:
-        users = db.query(User).all()
-        return [{"id": user.id, "username": user.username} for user in users]
+        etag = await table_etag(db, request, "users")
+        if not_modified(request, etag):
+            return not_modified_response(etag)
+        response.headers.update(etag_headers(etag))
+
+        await user_directory.sync(db, request.state.table_versions.get("users"))
+        total, users = user_directory.search(prefix, offset, limit)
+        response.headers["X-Total-Count"] = str(total)
+        return users
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving users: {str(e)}")
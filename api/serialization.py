@@ -0,0 +1,85 @@
+"""
+JSON bytes for the task lists, straight from the rows.
+
+With a response_model, FastAPI validates every returned dict into
+TasksGetResponse (one TaskGetResponse per task), dumps the models back to dicts
+and encodes them with the stdlib json module. The list routes instead return a
+Response rendered here by pydantic-core serializers built once at import, from
+TypedDict mirrors of the response schemas: nothing is instantiated per row and
+the bytes are identical to what the response_model path produces. The routes
+keep their response_model, so the documented schema does not change.
+
+The rows are not validated on the way out: they come from the database, whose
+CHECK constraints already hold status, severity and priority to the enum values.
+benchmarks/check_serialization.py compares both paths.
+"""
+from datetime import date, datetime
+from typing import List, Optional
+
+from fastapi import Response
+from pydantic import TypeAdapter
+from typing_extensions import TypedDict  # pydantic needs this one on Python < 3.12
+
+
+class _TaskItem(TypedDict):
+    # schemas.task.TaskGetResponse, with the enums as their int values
+    id: str
+    title: str
+    description: str
+    assignee_name: Optional[str]
+    status: int
+    severity: int
+    priority: int
+    due_date: Optional[date]
+
+
+class _Pagination(TypedDict):
+    total: Optional[int]
+    more: bool
+    offset: int
+    limit: int
+    next_cursor: Optional[str]
+
+
+class _TaskPage(TypedDict):
+    tasks: List[_TaskItem]
+    pagination: _Pagination
+
+
+class _ExportRow(TypedDict):
+    # api.routes.task.EXPORT_COLUMNS
+    id: str
+    title: str
+    description: str
+    assignee: Optional[int]
+    assignee_name: Optional[str]
+    status: int
+    severity: int
+    priority: int
+    due_date: Optional[date]
+    created_date: Optional[datetime]
+    updated_date: Optional[datetime]
+
+
+_task_page = TypeAdapter(_TaskPage)
+_export_row = TypeAdapter(_ExportRow)
+
+
+def task_page_json(page: dict) -> bytes:
+    return _task_page.dump_json(page)
+
+
+def task_page_response(page: dict, headers: Optional[dict] = None) -> Response:
+    """
+        A response with `page` (as built by api.routes.task._task_page) as its body.
+        Headers set on an injected Response are not merged into a returned one,
+        so pass them here.
+    """
+    return Response(content=task_page_json(page), media_type="application/json", headers=headers)
+
+
+def export_ndjson(rows) -> bytes:
+    """
+        One JSON object per row and line; the rows hold the EXPORT_COLUMNS, labeled.
+    """
+    return b"".join([_export_row.dump_json(row._asdict()) + b"\n" for row in rows])
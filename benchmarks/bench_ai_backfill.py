@@ -0,0 +1,76 @@
+"""
+An AI backfill job over every task, against a fake model that fails some calls:
+classification throughput at the configured concurrency and rate, retries, and
+resumption from the checkpoint when the app is restarted halfway through.
+
+    python -m benchmarks.bench_ai_backfill [tasks] [failure rate]
+"""
+import asyncio
+import json
+import random
+import sys
+import time
+
+import httpx
+
+from ai.client import set_openai_client
+from benchmarks.common import temp_database, insert_tasks, load_app
+from benchmarks.fake_openai import FakeOpenAI, recommendation_reply
+from config import Config
+
+
+def flaky_reply(failure_rate: float):
+    rng = random.Random(0)
+    levels = ("Low", "Medium", "High")
+
+    def reply(prompt: str) -> str:
+        if rng.random() < failure_rate:
+            return "Sorry, I can't help with that."  # Not JSON: fails the parse, so the task is retried
+        answer = json.loads(recommendation_reply(prompt))
+        if isinstance(answer, list):
+            return json.dumps([{"severity": rng.choice(levels), "priority": rng.choice(levels)} for _ in answer])
+        return json.dumps({"severity": rng.choice(levels), "priority": rng.choice(levels)})
+
+    return reply
+
+
+async def wait_for(client: httpx.AsyncClient, job_id: int, done) -> dict:
+    while True:
+        job = (await client.get(f"/ai/backfill-jobs/{job_id}")).json()
+        if done(job):
+            return job
+        await asyncio.sleep(0.1)
+
+
+async def main(tasks: int = 2000, failure_rate: float = 0.05):
+    Config.AI_BACKFILL_RATE_PER_SECOND = 0
+    Config.AI_BACKFILL_CONCURRENCY = 32
+    path = temp_database()
+    insert_tasks(path, tasks)
+    fake = FakeOpenAI(latency=0.2, reply=flaky_reply(failure_rate))
+    set_openai_client(fake)
+    app, headers = load_app(path)
+
+    start = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench",
+                                     headers=headers) as client:
+            job = (await client.post("/ai/backfill-jobs", json={})).json()
+            job = await wait_for(client, job["id"], lambda job: job["processed"] >= job["total"] // 2)
+            print(f"restarting at {job['processed']} of {job['total']} processed")
+
+    # The lifespan stopped the runner; the job is still running in the database
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench",
+                                     headers=headers) as client:
+            job = await wait_for(client, job["id"], lambda job: job["status"] != "running")
+            stats = (await client.get("/ai/backfill-jobs/stats")).json()
+    elapsed = time.perf_counter() - start
+
+    print(f"job {job['status']}: {job['processed']} of {job['total']} processed, {job['changed']} changed, "
+          f"{job['skipped']} skipped, {job['failed']} failed in {elapsed:.1f} s ({job['processed'] / elapsed:.0f} tasks/s)")
+    print(f"upstream calls {fake.calls}, retries after the restart {stats['retries']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000, float(sys.argv[2]) if len(sys.argv) > 2 else 0.05))
@@ -0,0 +1,94 @@
+"""
+Archiving done tasks: GET /tasks latency and tier sizes before and after moving
+every old done task to tasks_archive, and how long each compactor batch holds the
+write lock while lists are being read.
+
+    python -m benchmarks.bench_archive [tasks] [batch size]
+"""
+import asyncio
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta
+
+import httpx
+
+from benchmarks.common import temp_database, insert_tasks, load_app, summarize, print_summary
+from config import Config
+from database.archive import archive_batch, tier_sizes
+from database.session import get_async_session, dispose_async_engine
+
+LISTS = {"open": {}, "open, assignee 1": {"assignee": 1}, "done": {"status": 2}, "done, assignee 1": {"status": 2, "assignee": 1}}
+
+
+async def list_latencies(client: httpx.AsyncClient, label: str, requests: int = 200):
+    for name, params in LISTS.items():
+        samples = []
+        for _ in range(requests):
+            t0 = time.perf_counter()
+            (await client.get("/tasks", params=params)).raise_for_status()
+            samples.append(time.perf_counter() - t0)
+        print_summary(f"{label} GET /tasks {name}", summarize(samples))
+
+
+async def print_tiers(label: str):
+    async with get_async_session()() as db:
+        for tier, size in (await tier_sizes(db)).items():
+            print(f"{label} {tier:<8} {size['rows']:>9,} rows {size['bytes'] / 2 ** 20:>8.1f} MiB")
+
+
+async def compact(batch_size: int) -> list:
+    cutoff = datetime.now() - timedelta(days=Config.ARCHIVE_AFTER_DAYS or 30)
+    durations = []
+    while True:
+        t0 = time.perf_counter()
+        async with get_async_session()() as db:
+            moved = await archive_batch(db, cutoff, batch_size)
+            await db.commit()
+        durations.append(time.perf_counter() - t0)
+        if moved < batch_size:
+            return durations
+        await asyncio.sleep(0.05)
+
+
+async def main(count: int = 300_000, batch_size: int = 500):
+    path = temp_database()
+    insert_tasks(path, count)
+    conn = sqlite3.connect(path)
+    conn.execute("UPDATE tasks SET updated_date = '2020-01-01 00:00:00' WHERE status = 2")
+    conn.execute("ANALYZE")
+    conn.commit()
+    conn.close()
+
+    # The compactor is run by hand below, not by the app
+    Config.ARCHIVE_AFTER_DAYS = 0
+    app, headers = load_app(path)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app), base_url="http://test", headers=headers,
+                                 timeout=60) as client:
+        await print_tiers("before")
+        await list_latencies(client, "before")
+
+        reads = []
+
+        async def read_during_compaction():
+            while True:
+                t0 = time.perf_counter()
+                (await client.get("/tasks")).raise_for_status()
+                reads.append(time.perf_counter() - t0)
+
+        reader = asyncio.create_task(read_during_compaction())
+        start = time.perf_counter()
+        durations = await compact(batch_size)
+        elapsed = time.perf_counter() - start
+        reader.cancel()
+        await asyncio.gather(reader, return_exceptions=True)
+
+        print_summary(f"compactor batch of {batch_size}", summarize(durations, elapsed))
+        print_summary("GET /tasks during compaction", summarize(reads))
+        await print_tiers("after")
+        await list_latencies(client, "after")
+    await dispose_async_engine()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*(int(arg) for arg in sys.argv[1:3])))
@@ -0,0 +1,53 @@
+"""
+Per-request cost of authentication: decoding the JWT twice (verifying it, then
+decoding it again for the user id, as routes did before security.get_principal),
+decoding it once, and a hit in the verified-token cache of get_principal.
+
+    python -m benchmarks.bench_auth [iterations]
+"""
+import asyncio
+import json
+import sys
+import time
+from datetime import timedelta
+
+import jwt
+
+import security
+from benchmarks.common import summarize, print_summary
+from config import Config
+
+
+async def timed_async(fn, iterations: int) -> dict:
+    samples = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        await fn()
+        samples.append(time.perf_counter() - t0)
+    return summarize(samples, time.perf_counter() - start)
+
+
+async def main(iterations: int = 50_000):
+    Config.SECRET_KEY = Config.SECRET_KEY or "benchmark-secret"
+    token = security.create_access_token(json.dumps({"username": "user1", "id": 1}), timedelta(minutes=30))
+
+    async def decode_twice():
+        security.verify_token(token)
+        payload = jwt.decode(token, Config.SECRET_KEY, algorithms=[security.ALGORITHM])
+        json.loads(payload["sub"])["id"]
+
+    async def uncached():
+        security._token_cache.clear()
+        await security.get_principal(token)
+
+    async def cached():
+        await security.get_principal(token)
+
+    print_summary("decode twice (before)", await timed_async(decode_twice, iterations))
+    print_summary("get_principal, cache miss", await timed_async(uncached, iterations))
+    print_summary("get_principal, cache hit", await timed_async(cached, iterations))
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*(int(arg) for arg in sys.argv[1:2])))
@@ -0,0 +1,53 @@
+"""
+Task import throughput: one POST /task / PUT /task/{id} per row versus
+POST /tasks/bulk and PATCH /tasks/bulk.
+
+    python -m benchmarks.bench_bulk [tasks] [batch]
+"""
+import sys
+import time
+
+from benchmarks.common import temp_database, insert_tasks, app_client
+
+
+def task(n: int) -> dict:
+    return {"title": f"Imported #{n}", "description": "Bulk import", "assignee": n % 10 + 1,
+            "status": n % 3, "severity": n % 3, "priority": (n // 3) % 3, "due_date": "2025-06-01"}
+
+
+def report(name: str, rows: int, elapsed: float):
+    print(f"{name:<32} {rows} rows in {elapsed:.2f}s = {rows / elapsed:,.0f} rows/s")
+
+
+def main(tasks: int = 20_000, batch: int = 5000):
+    path = temp_database()
+    insert_tasks(path, 0)  # Just the users
+
+    with app_client(path) as client:
+        single = min(tasks, 2000)  # The per-row endpoints are too slow for the full run
+
+        start = time.perf_counter()
+        ids = [client.post("/task", json=task(n)).json()["id"] for n in range(single)]
+        report("POST /task", single, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for task_id in ids:
+            client.put(f"/task/{task_id}", json={"status": 1}).raise_for_status()
+        report("PUT /task/{id}", single, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        ids = []
+        for offset in range(0, tasks, batch):
+            response = client.post("/tasks/bulk", json=[task(n) for n in range(offset, min(tasks, offset + batch))])
+            ids += [result["id"] for result in response.json()["results"]]
+        report(f"POST /tasks/bulk ({batch}/request)", tasks, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for offset in range(0, tasks, batch):
+            client.patch("/tasks/bulk", json=[{"id": task_id, "status": 1}
+                                              for task_id in ids[offset:offset + batch]]).raise_for_status()
+        report(f"PATCH /tasks/bulk ({batch}/request)", tasks, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,49 @@
+"""
+Per-request database overhead: a fresh engine per request (the old
+``get_session`` behaviour) versus the process-wide pooled engine.
+
+    python -m benchmarks.bench_engine [iterations]
+"""
+import sys
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.common import temp_database, timed, print_summary
+from database.session import init_engine, get_session, dispose_engine
+
+QUERY = text("SELECT id, title FROM tasks WHERE status != 2 LIMIT 10")
+
+
+def legacy_request(url: str):
+    engine = create_engine(url)
+    with engine.connect() as connection:
+        connection.execute(text("PRAGMA foreign_keys = ON;"))
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    try:
+        db.execute(QUERY).all()
+    finally:
+        db.close()
+
+
+def pooled_request():
+    db = get_session()()
+    try:
+        db.execute(QUERY).all()
+    finally:
+        db.close()
+
+
+def main(iterations: int = 2000):
+    url = f"sqlite:///{temp_database()}"
+
+    print_summary("engine per request", timed(lambda: legacy_request(url), iterations))
+
+    init_engine(url)
+    pooled_request()  # Open the first pooled connection outside the timing
+    print_summary("process-wide pooled engine", timed(pooled_request, iterations))
+    dispose_engine()
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,31 @@
+"""
+Unchanged polling of GET /tasks and GET /users, with and without If-None-Match.
+
+    python -m benchmarks.bench_etag [tasks]
+"""
+import sys
+
+from benchmarks.common import temp_database, insert_tasks, app_client, timed, print_summary
+
+
+def main(tasks: int = 200_000):
+    path = temp_database()
+    insert_tasks(path, tasks)
+
+    with app_client(path) as client:
+        for url in ("/tasks?limit=100", "/tasks?limit=100&include_total=true", "/users"):
+            etag = client.get(url).headers["etag"]
+            print_summary(f"GET {url}", timed(lambda: client.get(url).raise_for_status(), 200))
+            print_summary(f"GET {url} (304)", timed(
+                lambda: client.get(url, headers={"If-None-Match": etag}), 200))
+
+        # Any write must invalidate the tag
+        etag = client.get("/tasks").headers["etag"]
+        task = client.post("/task", json={"title": "Changed", "description": "Changed", "assignee": 1,
+                                          "status": 0, "severity": 0, "priority": 0, "due_date": "2025-01-01"})
+        status = client.get("/tasks", headers={"If-None-Match": etag}).status_code
+        print(f"after POST /task ({task.status_code}): conditional GET /tasks -> {status}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,62 @@
+"""
+GET /tasks/export throughput and server memory on a multi-million row table,
+next to paging through GET /tasks 100 rows at a time.
+
+    python -m benchmarks.bench_export [tasks]
+"""
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+from benchmarks.common import temp_database, insert_tasks, load_app, serve
+
+
+def rss_mib() -> float:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+
+async def export(client: httpx.AsyncClient, params: dict):
+    rows = size = 0
+    peak = start_rss = rss_mib()
+    start = time.perf_counter()
+    async with client.stream("GET", "/tasks/export", params=params) as response:
+        response.raise_for_status()
+        async for chunk in response.aiter_bytes():
+            rows += chunk.count(b"\n")
+            size += len(chunk)
+            peak = max(peak, rss_mib())
+    elapsed = time.perf_counter() - start
+    print(f"export {params}: {rows:,} lines, {size / 2 ** 20:.0f} MiB in {elapsed:.1f}s = {rows / elapsed:,.0f} rows/s, "
+          f"RSS {start_rss:.0f} -> peak {peak:.0f} MiB")
+
+
+async def page(client: httpx.AsyncClient, pages: int):
+    start = time.perf_counter()
+    cursor = None
+    for _ in range(pages):
+        params = {"status": 1, "limit": 100, "include_total": True, **({"cursor": cursor} if cursor else {})}
+        cursor = (await client.get("/tasks", params=params)).json()["pagination"]["next_cursor"]
+    elapsed = time.perf_counter() - start
+    print(f"GET /tasks paging: {pages * 100:,} rows in {elapsed:.1f}s = {pages * 100 / elapsed:,.0f} rows/s")
+
+
+async def main(tasks: int = 2_000_000):
+    path = temp_database()
+    insert_tasks(path, tasks)
+    app, headers = load_app(path)
+
+    with serve(app) as base_url:
+        async with httpx.AsyncClient(base_url=base_url, headers=headers, timeout=None) as client:
+            await page(client, 100)
+            await export(client, {"status": 1})
+            await export(client, {"format": "ndjson"})
+            await export(client, {"format": "csv"})
+            await export(client, {"updated_since": "2000-01-01T00:00:00"})
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*(int(arg) for arg in sys.argv[1:2])))
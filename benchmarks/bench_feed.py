@@ -0,0 +1,112 @@
+"""
+Soak test of the GET /tasks/stream change feed.
+
+First in process, with thousands of simulated subscribers (some of which never
+read) on a TaskFeed, then end to end with real SSE connections receiving the
+updates made through PUT /task/{id}.
+
+    python -m benchmarks.bench_feed [subscribers] [events] [connections]
+"""
+import asyncio
+import random
+import sys
+import time
+import tracemalloc
+
+import httpx
+
+from api.feed import TaskFeed, RESYNC
+from benchmarks.common import temp_database, insert_tasks, load_app, serve, summarize, print_summary
+
+
+async def soak(subscribers: int, events: int, stalled: float = 0.1, batch: int = 50):
+    feed = TaskFeed(max_queued=256)
+    rng = random.Random(0)
+    received, resyncs = [0] * subscribers, [0] * subscribers
+
+    async def consume(index, subscription):
+        while True:
+            event = await subscription.get()
+            received[index] += 1
+            resyncs[index] += event is RESYNC
+
+    tracemalloc.start()
+    consumers = []
+    for index in range(subscribers):
+        subscription = feed.subscribe(status=rng.choice([None, 0, 1]), assignee=rng.choice([None, -1] + list(range(1, 11))))
+        if rng.random() >= stalled:
+            consumers.append(asyncio.create_task(consume(index, subscription)))
+
+    publish_times = []
+    start = time.perf_counter()
+    for n in range(events):
+        task = {"id": f"task-{n}", "status": rng.choice([0, 1, 2]), "assignee": rng.choice([None] + list(range(1, 11))),
+                "title": f"Task {n}"}
+        t0 = time.perf_counter()
+        feed.publish("updated", task, {"status": rng.choice([0, 1]), "assignee": task["assignee"]})
+        publish_times.append(time.perf_counter() - t0)
+        if n % batch == 0:
+            await asyncio.sleep(0)  # Let the consumers drain, like an event loop serving other requests would
+    await asyncio.sleep(0.1)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    for consumer in consumers:
+        consumer.cancel()
+
+    print_summary(f"publish to {subscribers} subscribers", summarize(publish_times, elapsed))
+    reading = [index for index in range(subscribers) if received[index]]
+    print(f"events received by reading subscribers: {sum(received[i] for i in reading) / max(1, len(reading)):.0f} avg, "
+          f"resync events received: {sum(resyncs)}, stalled subscribers: {subscribers - len(consumers)}, "
+          f"feed resyncs: {feed.stats()['resyncs']}, peak traced memory: {peak / 2 ** 20:.1f} MiB")
+
+
+async def end_to_end(connections: int, updates: int = 50):
+    path = temp_database()
+    insert_tasks(path, 1000)
+    app, headers = load_app(path)
+
+    with serve(app) as base_url:
+        async with httpx.AsyncClient(base_url=base_url, headers=headers, timeout=30,
+                                     limits=httpx.Limits(max_connections=connections + 10)) as client:
+            task_id = (await client.get("/tasks", params={"assignee": 1})).json()["tasks"][0]["id"]
+            delivered = []
+            connected = asyncio.Semaphore(0)
+
+            async def listen():
+                async with client.stream("GET", "/tasks/stream", params={"assignee": 1}) as response:
+                    lines = response.aiter_lines()
+                    async for line in lines:
+                        if line.startswith(": connected"):
+                            connected.release()
+                        elif line.startswith("data: "):
+                            delivered.append(time.perf_counter())
+
+            listeners = [asyncio.create_task(listen()) for _ in range(connections)]
+            for _ in range(connections):
+                await connected.acquire()
+
+            latencies = []
+            for n in range(updates):
+                expected = len(delivered) + connections
+                t0 = time.perf_counter()
+                (await client.put(f"/task/{task_id}", json={"title": f"Renamed {n}"})).raise_for_status()
+                while len(delivered) < expected:
+                    await asyncio.sleep(0.001)
+                latencies.append(delivered[-1] - t0)
+
+            print_summary(f"PUT /task -> {connections} SSE clients", summarize(latencies))
+            print(f"feed stats: {(await client.get('/tasks/stream/stats')).json()}")
+            for listener in listeners:
+                listener.cancel()
+            await asyncio.gather(*listeners, return_exceptions=True)
+
+
+async def main(subscribers: int = 5000, events: int = 5000, connections: int = 200):
+    await soak(subscribers, events)
+    await end_to_end(connections)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*(int(arg) for arg in sys.argv[1:4])))
@@ -0,0 +1,48 @@
+"""
+Concurrent load against GET /tasks: requests per second and latency
+percentiles with many simultaneous clients, driven in-process through httpx.
+
+    python -m benchmarks.bench_load [clients] [seconds] [tasks]
+"""
+import asyncio
+import sys
+import time
+
+import httpx
+
+from benchmarks.common import temp_database, insert_tasks, load_app, summarize, print_summary
+
+
+async def run(app, headers: dict, clients: int, seconds: float) -> dict:
+    samples, errors = [], 0
+    deadline = time.perf_counter() + seconds
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers, timeout=60) as client:
+        async def worker(n: int):
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                t0 = time.perf_counter()
+                response = await client.get("/tasks", params={"assignee": n % 10 + 1, "limit": 20})
+                samples.append(time.perf_counter() - t0)
+                errors += response.status_code != 200
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(n) for n in range(clients)))
+        elapsed = time.perf_counter() - start
+
+    return {**summarize(samples, elapsed), "errors": errors}
+
+
+async def main(clients: int = 200, seconds: float = 10, tasks: int = 100_000):
+    path = temp_database()
+    insert_tasks(path, tasks)
+    app, headers = load_app(path)
+
+    async with app.router.lifespan_context(app):
+        await run(app, headers, clients, 1)  # Warm up the pool
+        print_summary(f"GET /tasks x{clients} clients", await run(app, headers, clients, seconds))
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*(int(arg) for arg in sys.argv[1:4])))
@@ -0,0 +1,73 @@
+"""
+GET /tasks latency on its own and while a login storm runs alongside it.
+
+Compare the password process pool with bcrypt on the threadpool by running
+it twice:
+
+    PASSWORD_HASH_WORKERS=0 python -m benchmarks.bench_login_mix
+    python -m benchmarks.bench_login_mix [task_clients] [login_clients] [seconds]
+"""
+import asyncio
+import sqlite3
+import sys
+import time
+
+import httpx
+
+import security
+from benchmarks.common import temp_database, insert_tasks, load_app, summarize, print_summary
+from config import Config
+
+
+async def traffic(client: httpx.AsyncClient, task_clients: int, login_clients: int, seconds: float):
+    deadline = time.perf_counter() + seconds
+    tasks, logins, statuses = [], [], {}
+
+    async def task_worker(n: int):
+        while time.perf_counter() < deadline:
+            t0 = time.perf_counter()
+            response = await client.get("/tasks", params={"assignee": n % 10 + 1})
+            response.raise_for_status()
+            tasks.append(time.perf_counter() - t0)
+
+    async def login_worker(n: int):
+        while time.perf_counter() < deadline:
+            t0 = time.perf_counter()
+            response = await client.post("/login", data={"username": f"user{n % 10 + 1}", "password": "password"})
+            logins.append(time.perf_counter() - t0)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(task_worker(n) for n in range(task_clients)),
+                         *(login_worker(n) for n in range(login_clients)))
+    elapsed = time.perf_counter() - start
+    return summarize(tasks, elapsed), (summarize(logins, elapsed) if logins else None), statuses
+
+
+async def main(task_clients: int = 10, login_clients: int = 20, seconds: float = 10):
+    path = temp_database()
+    insert_tasks(path, 50_000)
+    conn = sqlite3.connect(path)
+    conn.execute("UPDATE users SET hashed_password = ?", (security.hash_password("password"),))
+    conn.commit()
+    conn.close()
+
+    app, headers = load_app(path)
+    mode = f"{Config.PASSWORD_HASH_WORKERS} process(es)" if Config.PASSWORD_HASH_WORKERS > 0 else "threadpool"
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers,
+                                     timeout=120) as client:
+            await client.post("/login", data={"username": "user1", "password": "password"})  # Warm the pool
+
+            alone, _, _ = await traffic(client, task_clients, 0, seconds)
+            print_summary("GET /tasks alone", alone)
+
+            mixed, logins, statuses = await traffic(client, task_clients, login_clients, seconds)
+            print_summary(f"GET /tasks + logins ({mode})", mixed)
+            print_summary(f"POST /login ({mode})", logins)
+            print(f"login status codes: {statuses}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*(int(arg) for arg in sys.argv[1:4])))
@@ -0,0 +1,53 @@
+"""
+Overhead of the Prometheus instrumentation: throughput and latency of the same
+requests against a server with METRICS_ENABLED=true and one with it false,
+alternating between the two so drift on the machine hits both alike.
+
+    python -m benchmarks.bench_metrics [requests per run] [clients] [rounds]
+"""
+import asyncio
+import json
+import statistics
+import sys
+from urllib.request import Request, urlopen
+
+from benchmarks.common import temp_database, insert_tasks, serve_process, http_load, print_summary
+
+TASK = json.dumps({"title": "Metrics overhead", "description": "Instrumented insert", "assignee": 1,
+                   "status": 0, "severity": 0, "priority": 0}).encode()
+
+
+def scenarios(task_id: str) -> dict:
+    return {
+        "GET /tasks": ("GET", "/tasks?assignee=1&limit=20", b""),
+        "GET /task/{id}": ("GET", f"/task/{task_id}", b""),
+        "POST /task": ("POST", "/task", TASK),
+    }
+
+
+async def main(requests: int = 4000, clients: int = 16, rounds: int = 3):
+    path = temp_database()
+    insert_tasks(path, 100_000)
+
+    throughput = {}
+    for round_ in range(rounds):
+        for enabled in (False, True):
+            with serve_process(path, METRICS_ENABLED=str(enabled).lower()) as (base_url, headers):
+                headers = {**headers, "Content-Type": "application/json"}
+                with urlopen(Request(f"{base_url}/tasks?limit=1", headers=headers)) as response:
+                    task_id = json.load(response)["tasks"][0]["id"]
+                for name, (method, target, body) in scenarios(task_id).items():
+                    await http_load(base_url, method, target, headers, body, clients, requests // 10)  # Warm up
+                    summary = await http_load(base_url, method, target, headers, body, clients, requests)
+                    throughput.setdefault((name, enabled), []).append(summary["ops_per_sec"])
+                    print_summary(f"round {round_ + 1} metrics={'on' if enabled else 'off'} {name}", summary)
+
+    print()
+    for name in scenarios(""):
+        off = statistics.median(throughput[(name, False)])
+        on = statistics.median(throughput[(name, True)])
+        print(f"{name:<16} median req/s off {off:,.0f}, on {on:,.0f} ({(on - off) / off:+.1%})")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*(int(arg) for arg in sys.argv[1:4])))
@@ -0,0 +1,37 @@
+"""
+Latency of deep pages of GET /tasks: OFFSET/LIMIT with a COUNT versus keyset
+cursors without one.
+
+    python -m benchmarks.bench_pagination [tasks] [pages]
+"""
+import sys
+
+from benchmarks.common import temp_database, insert_tasks, app_client, timed, print_summary
+
+PAGE_SIZE = 100
+
+
+def main(tasks: int = 1_000_000, pages: int = 200):
+    path = temp_database()
+    insert_tasks(path, tasks)
+
+    with app_client(path) as client:
+        def page(**params):
+            response = client.get("/tasks", params={"limit": PAGE_SIZE, **params})
+            response.raise_for_status()
+            return response.json()
+
+        # Walk the cursor chain once so both modes fetch exactly the same pages
+        cursors = [None]
+        for _ in range(pages - 1):
+            params = {"cursor": cursors[-1]} if cursors[-1] else {}
+            cursors.append(page(**params)["pagination"]["next_cursor"])
+
+        for depth in (1, pages // 2, pages - 1):
+            offset = depth * PAGE_SIZE
+            print_summary(f"offset+count page {depth}", timed(lambda: page(offset=offset, include_total=True), 5))
+            print_summary(f"cursor page {depth}", timed(lambda: page(cursor=cursors[depth]), 5))
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
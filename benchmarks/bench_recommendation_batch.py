@@ -0,0 +1,65 @@
+"""
+POST /task/recommend-fields with many concurrent cache misses, with and without
+micro-batching, against a local fake OpenAI server reached through the real
+openai client: throughput, latency, upstream calls and rate-limited requests.
+
+    python -m benchmarks.bench_recommendation_batch [clients] [requests per client] [server concurrency limit]
+"""
+import asyncio
+import sys
+import time
+import uuid
+
+import httpx
+import openai
+
+from ai.client import set_openai_client
+from ai.recommendations import start_recommendation_batcher, stop_recommendation_batcher, recommendation_batch_stats
+from benchmarks.common import temp_database, load_app, serve, summarize, print_summary
+from benchmarks.fake_openai import fake_openai_app
+from config import Config
+
+
+async def load(client: httpx.AsyncClient, clients: int, requests: int) -> dict:
+    latencies, errors = [], 0
+
+    async def one_client():
+        nonlocal errors
+        for _ in range(requests):
+            t0 = time.perf_counter()
+            # Unique titles, so every request misses the cache
+            response = await client.post("/task/recommend-fields",
+                                         json={"title": f"Fix login issue {uuid.uuid4()}", "description": "Users see a 500"})
+            latencies.append(time.perf_counter() - t0)
+            errors += not response.is_success
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one_client() for _ in range(clients)))
+    return {**summarize(latencies, time.perf_counter() - start), "errors": errors}
+
+
+async def main(clients: int = 100, requests: int = 5, limit: int = 0):
+    Config.RECOMMENDATION_BATCH_ENABLED = True  # Started and stopped below, not by the lifespan
+    app, headers = load_app(temp_database())
+    llm = fake_openai_app(latency=0.3, max_concurrency=limit)
+
+    with serve(llm) as llm_url:
+        set_openai_client(openai.AsyncOpenAI(base_url=f"{llm_url}/v1", api_key="sk-benchmark", max_retries=0))
+        transport = httpx.ASGITransport(app=app)
+        async with app.router.lifespan_context(app):
+            await stop_recommendation_batcher()
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers,
+                                         timeout=120) as client:
+                for batching in (False, True):
+                    if batching:
+                        start_recommendation_batcher()
+                    calls, rejected = llm.state.calls, llm.state.rejected
+                    summary = await load(client, clients, requests)
+                    print_summary(f"batching {'on' if batching else 'off'}", summary)
+                    print(f"  upstream calls {llm.state.calls - calls}, rate limited {llm.state.rejected - rejected}, "
+                          f"batcher {recommendation_batch_stats()}")
+                    await stop_recommendation_batcher()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*(int(arg) for arg in sys.argv[1:4])))
@@ -0,0 +1,48 @@
+"""
+POST /task/recommend-fields with bursts of identical and distinct requests
+against a fake model, showing cache hits, coalescing and upstream calls.
+
+    python -m benchmarks.bench_recommendation_cache [clients] [distinct]
+"""
+import asyncio
+import sys
+import time
+
+import httpx
+
+from ai.client import set_openai_client
+from ai.recommendations import recommendation_cache
+from benchmarks.common import temp_database, load_app, summarize, print_summary
+from benchmarks.fake_openai import FakeOpenAI
+
+
+async def burst(client: httpx.AsyncClient, clients: int, distinct: int) -> dict:
+    async def one(n: int):
+        t0 = time.perf_counter()
+        # Vary case and whitespace, which normalize to the same key
+        title = f"Fix login  issue {n % distinct}" if n % 2 else f"fix LOGIN issue {n % distinct}"
+        response = await client.post("/task/recommend-fields", json={"title": title, "description": "Users see a 500"})
+        response.raise_for_status()
+        return time.perf_counter() - t0
+
+    start = time.perf_counter()
+    samples = await asyncio.gather(*(one(n) for n in range(clients)))
+    return summarize(samples, time.perf_counter() - start)
+
+
+async def main(clients: int = 500, distinct: int = 20):
+    app, headers = load_app(temp_database())
+    fake = FakeOpenAI(latency=0.5)
+    set_openai_client(fake)
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as client:
+            print_summary("cold burst", await burst(client, clients, distinct))
+            print_summary("warm burst", await burst(client, clients, distinct))
+
+    print(f"upstream calls: {fake.calls} for {2 * clients} requests, cache: {recommendation_cache.stats()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*(int(arg) for arg in sys.argv[1:3])))
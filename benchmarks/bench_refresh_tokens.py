@@ -0,0 +1,103 @@
+"""
+Server CPU per authenticated client-hour, with and without refresh tokens.
+
+Every client logs in once, renews its access token every
+ACCESS_TOKEN_EXPIRE_MINUTES of simulated time (logging in again with the
+password, or exchanging its refresh token at /token/refresh) and sends
+`requests_per_hour` GET /tasks in between. bcrypt runs on the threadpool of this
+process (PASSWORD_HASH_WORKERS=0) so process CPU time accounts for all of it.
+
+    python -m benchmarks.bench_refresh_tokens [clients] [hours] [requests_per_hour]
+"""
+import asyncio
+import sqlite3
+import sys
+import time
+
+import httpx
+
+import security
+from benchmarks.common import temp_database, insert_tasks, load_app
+from config import Config
+
+PASSWORD = "password"
+
+
+async def run(client: httpx.AsyncClient, clients: int, hours: float, requests_per_hour: int, refresh: bool) -> dict:
+    renewals = int(hours * 60 / Config.ACCESS_TOKEN_EXPIRE_MINUTES)
+    slots = asyncio.Semaphore(4)
+    cpu = {"auth": 0.0, "requests": 0.0}
+
+    async def login(n: int) -> dict:
+        response = await client.post("/login", data={"username": f"user{n}", "password": PASSWORD})
+        response.raise_for_status()
+        return response.json()
+
+    async def renew(n: int, tokens: dict) -> dict:
+        if not refresh:
+            return await login(n)
+        response = await client.post("/token/refresh", json={"refresh_token": tokens["refresh_token"]})
+        response.raise_for_status()
+        return response.json()
+
+    async def session(n: int, tokens: dict):
+        async with slots:
+            for _ in range(int(requests_per_hour * hours / (renewals + 1))):
+                response = await client.get("/tasks", params={"assignee": n, "limit": 20},
+                                            headers={"Authorization": f"Bearer {tokens['access_token']}"})
+                response.raise_for_status()
+
+    async def timed(kind: str, calls):
+        start = time.process_time()
+        results = await asyncio.gather(*calls)
+        cpu[kind] += time.process_time() - start
+        return results
+
+    # Logins and renewals are timed apart from the requests made with each token
+    tokens = await timed("auth", (login(n) for n in range(1, clients + 1)))
+    for period in range(renewals + 1):
+        await timed("requests", (session(n, tokens[n - 1]) for n in range(1, clients + 1)))
+        if period < renewals:
+            tokens = await timed("auth", (renew(n, tokens[n - 1]) for n in range(1, clients + 1)))
+
+    client_hours = clients * hours
+    return {
+        "logins": clients * (1 if refresh else renewals + 1),
+        "refreshes": clients * renewals if refresh else 0,
+        "auth_ms": cpu["auth"] / client_hours * 1000,
+        "requests_ms": cpu["requests"] / client_hours * 1000,
+        "total_ms": sum(cpu.values()) / client_hours * 1000,
+    }
+
+
+async def main(clients: int = 10, hours: float = 2, requests_per_hour: int = 60):
+    path = temp_database()
+    insert_tasks(path, 20_000, users=clients)
+    conn = sqlite3.connect(path)
+    conn.execute("UPDATE users SET hashed_password = ?", (security.hash_password(PASSWORD),))
+    conn.commit()
+    conn.close()
+
+    Config.PASSWORD_HASH_WORKERS = 0
+    Config.TOKEN_CACHE_SIZE = 0  # Every request verifies its token, as on a server with many clients
+    app, _ = load_app(path)
+    results = {}
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench",
+                                     timeout=120) as client:
+            for refresh in (False, True):
+                name = "refresh tokens" if refresh else "password logins"
+                results[name] = await run(client, clients, hours, requests_per_hour, refresh)
+                print(f"{name:<16} " + " ".join(
+                    f"{key}={value:.1f}" if isinstance(value, float) else f"{key}={value}"
+                    for key, value in results[name].items()))
+
+    before, after = results["password logins"], results["refresh tokens"]
+    print(f"\nCPU per client-hour ({requests_per_hour} requests, a new access token every "
+          f"{Config.ACCESS_TOKEN_EXPIRE_MINUTES:g} min): auth {before['auth_ms']:.1f} -> {after['auth_ms']:.1f} ms, "
+          f"total {before['total_ms']:.1f} -> {after['total_ms']:.1f} ms "
+          f"({after['total_ms'] / before['total_ms'] - 1:+.0%})")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*(float(arg) if i == 1 else int(arg) for i, arg in enumerate(sys.argv[1:4]))))
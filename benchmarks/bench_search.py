@@ -0,0 +1,61 @@
+"""
+GET /tasks/search latency at 1M tasks, next to the LIKE scan a client-side
+filter amounts to, plus the time to rebuild the index.
+
+    python -m benchmarks.bench_search [tasks]
+"""
+import sqlite3
+import sys
+import time
+
+from benchmarks.common import temp_database, insert_tasks, app_client, timed, print_summary
+from database.session import create_db_engine
+from database.task_search import rebuild
+
+QUERIES = {
+    "common word": {"q": "fix"},
+    "mid-frequency word": {"q": "deadline"},
+    "rare word": {"q": "term1500"},
+    "prefix": {"q": "dep"},
+    "two words": {"q": "login token"},
+    "filtered": {"q": "cache", "assignee": 3, "status": 1},
+}
+
+
+def main(tasks: int = 1_000_000):
+    path = temp_database()
+    start = time.perf_counter()
+    insert_tasks(path, tasks)
+    print(f"inserted {tasks} tasks (indexed by the triggers) in {time.perf_counter() - start:.1f}s")
+
+    conn = sqlite3.connect(path)
+    print_summary("LIKE '%deadline%' scan", timed(lambda: conn.execute(
+        "SELECT id FROM tasks WHERE status != 2 AND (title LIKE '%deadline%' OR description LIKE '%deadline%') "
+        "LIMIT 10").fetchall(), 20))
+    print_summary("LIKE '%term1500%' scan", timed(lambda: conn.execute(
+        "SELECT id FROM tasks WHERE status != 2 AND (title LIKE '%term1500%' OR description LIKE '%term1500%') "
+        "LIMIT 10").fetchall(), 5))
+
+    with app_client(path) as client:
+        for name, params in QUERIES.items():
+            response = client.get("/tasks/search", params=params)
+            response.raise_for_status()
+            matches = conn.execute("SELECT COUNT(*) FROM tasks_fts WHERE tasks_fts MATCH ?",
+                                   (f'"{params["q"].split()[0]}"*',)).fetchone()[0]
+            print_summary(f"search {name} ({matches} matches)", timed(
+                lambda: client.get("/tasks/search", params=params).raise_for_status(), 50))
+
+        # Tenth page through the cursor
+        params = dict(QUERIES["mid-frequency word"], limit=100)
+        for _ in range(9):
+            params["cursor"] = client.get("/tasks/search", params=params).json()["pagination"]["next_cursor"]
+        print_summary("search page 10 (cursor)", timed(
+            lambda: client.get("/tasks/search", params=params).raise_for_status(), 50))
+
+    start = time.perf_counter()
+    rebuild(create_db_engine(f"sqlite:///{path}"))
+    print(f"rebuild: {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,41 @@
+"""
+Serialization alone, no database: a 100-task GET /tasks page rendered through the
+response_model (validate into TasksGetResponse, dump, stdlib json) and through
+api/serialization.py, and an export batch of EXPORT_BATCH_SIZE rows through the
+stdlib json and through api/serialization.py.
+
+    python -m benchmarks.bench_serialization [iterations]
+"""
+import random
+import sys
+
+from api.routes.task import _task_page
+from api.serialization import export_ndjson, task_page_json
+from benchmarks.check_serialization import export_rows, list_rows, response_model_json, stdlib_ndjson
+from benchmarks.common import timed, print_summary
+from config import Config
+
+
+def main(iterations: int = 2000):
+    rng = random.Random(0)
+    names = {user_id: f"user{user_id}" for user_id in range(100)}
+    page = _task_page(list_rows(rng, 100), names, None, True, 0, 100, "cursor")
+    rows = export_rows(rng, Config.EXPORT_BATCH_SIZE)
+
+    results = {
+        "page response_model": timed(lambda: response_model_json(page), iterations),
+        "page serializer": timed(lambda: task_page_json(page), iterations),
+        "export stdlib json": timed(lambda: stdlib_ndjson(rows).encode(), max(1, iterations // 20)),
+        "export serializer": timed(lambda: export_ndjson(rows), max(1, iterations // 20)),
+    }
+    for name, summary in results.items():
+        print_summary(name, summary)
+
+    print()
+    for what in ("page", "export"):
+        old, new = [summary for name, summary in results.items() if name.startswith(what)]
+        print(f"{what}: {old['mean_ms']:.3f} -> {new['mean_ms']:.3f} ms ({old['mean_ms'] / new['mean_ms']:.1f}x)")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
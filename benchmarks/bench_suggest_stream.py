@@ -0,0 +1,57 @@
+"""
+Time to first byte and total time of POST /task/suggest-new versus the
+Server-Sent Events variant /task/suggest-new/stream, against a fake model.
+
+    python -m benchmarks.bench_suggest_stream [requests]
+"""
+import asyncio
+import sys
+import time
+
+import httpx
+
+from ai.client import set_openai_client
+from benchmarks.common import temp_database, insert_tasks, load_app, serve, summarize, print_summary
+from benchmarks.fake_openai import FakeOpenAI
+
+REPLY = "Write an integration test for the login flow covering expired tokens and wrong passwords"
+
+
+async def measure(client: httpx.AsyncClient, url: str, requests: int):
+    first_byte, total = [], []
+    for _ in range(requests):
+        t0 = time.perf_counter()
+        async with client.stream("POST", url) as response:
+            response.raise_for_status()
+            ttfb = None
+            async for _chunk in response.aiter_raw():
+                ttfb = ttfb or time.perf_counter() - t0
+        first_byte.append(ttfb)
+        total.append(time.perf_counter() - t0)
+    print_summary(f"{url} first byte", summarize(first_byte))
+    print_summary(f"{url} complete", summarize(total))
+
+
+async def main(requests: int = 20):
+    path = temp_database()
+    insert_tasks(path, 1000)
+    app, headers = load_app(path)
+    fake = FakeOpenAI(latency=0.8, reply=lambda prompt: REPLY)
+    set_openai_client(fake)
+
+    with serve(app) as base_url:
+        async with httpx.AsyncClient(base_url=base_url, headers=headers) as client:
+            await measure(client, "/task/suggest-new", requests)
+            await measure(client, "/task/suggest-new/stream", requests)
+
+            # Disconnect after the first token: the upstream stream must be closed
+            async with client.stream("POST", "/task/suggest-new/stream") as response:
+                async for line in response.aiter_lines():
+                    if line.startswith("event: token"):
+                        break
+            await asyncio.sleep(0.1)  # Well before the remaining tokens would have been generated
+            print(f"upstream streams closed: {fake.closed_streams} of {requests + 1}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*(int(arg) for arg in sys.argv[1:2])))
@@ -0,0 +1,87 @@
+"""
+Task id formats: insert rate and on-disk size of the tasks table and its indexes
+with 36-character TEXT uuid4 ids (before migration 0009), 16-byte BLOB uuid4 ids
+and 16-byte BLOB UUIDv7 ids (what new_task_id() generates now).
+
+Each variant is a real schema from the migrations. The triggers on tasks (task
+stats, table versions, search index) are dropped first: they cost the same
+whatever the key, and with them 10M rows take hours instead of minutes.
+
+    python -m benchmarks.bench_task_ids [tasks] [batch]
+"""
+import random
+import sqlite3
+import sys
+import time
+import uuid
+from datetime import date, timedelta
+
+from benchmarks.common import temp_database
+from config import Config
+from models.task import new_task_id
+
+VARIANTS = {
+    "text uuid4": (8, lambda: str(uuid.uuid4())),
+    "blob uuid4": (None, lambda: uuid.uuid4().bytes),
+    "blob uuid7": (None, lambda: uuid.UUID(new_task_id()).bytes),
+}
+
+
+def load(name: str, target, make_id, count: int, batch: int, report_every: int = 1_000_000):
+    path = temp_database(target)
+    conn = sqlite3.connect(path)
+    conn.execute(f"PRAGMA journal_mode = {Config.SQLITE_JOURNAL_MODE}")
+    conn.execute(f"PRAGMA synchronous = {Config.SQLITE_SYNCHRONOUS}")
+    conn.execute(f"PRAGMA cache_size = {Config.SQLITE_CACHE_SIZE}")
+    for (trigger,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'tasks'").fetchall():
+        conn.execute(f"DROP TRIGGER {trigger}")
+    conn.executemany("INSERT INTO users (id, username, hashed_password) VALUES (?, ?, '')",
+                     [(i, f"user{i}") for i in range(1, 11)])
+    conn.commit()
+
+    rng = random.Random(0)
+    start_date = date(2025, 3, 20)
+    dates = [(start_date + timedelta(days=day)).isoformat() for day in range(366)]
+    statement = ("INSERT INTO tasks (id, title, description, assignee, status, severity, priority, due_date, "
+                 "created_date, updated_date) VALUES (?, ?, 'Benchmark task', ?, ?, ?, ?, ?, ?, ?)")
+
+    start = segment_start = time.perf_counter()
+    for first in range(0, count, batch):
+        now = time.strftime("%Y-%m-%d %H:%M:%S")
+        rows = [
+            (make_id(), f"Task #{n}", rng.choice([None, *range(1, 11)]), rng.randrange(3), rng.randrange(3),
+             rng.randrange(3), rng.choice(dates), now, now)
+            for n in range(first, min(count, first + batch))
+        ]
+        conn.executemany(statement, rows)
+        conn.commit()
+        done = first + len(rows)
+        if done % report_every == 0 or done == count:
+            elapsed = time.perf_counter() - segment_start
+            rows_in_segment = done % report_every or report_every
+            print(f"{name:<12} {done:>11,} rows  {rows_in_segment / elapsed:>9,.0f} rows/s (last segment)", flush=True)
+            segment_start = time.perf_counter()
+    total = time.perf_counter() - start
+
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    sizes = dict(conn.execute(
+        "SELECT name, SUM(pgsize) FROM dbstat WHERE name IN "
+        "(SELECT name FROM sqlite_master WHERE tbl_name = 'tasks' AND type IN ('table', 'index')) GROUP BY name"
+    ))
+    conn.close()
+    table = sizes.pop("tasks")
+    indexes = sum(sizes.values())
+    print(f"{name:<12} {count / total:,.0f} rows/s overall, tasks {table / 2 ** 20:,.0f} MiB, "
+          f"indexes {indexes / 2 ** 20:,.0f} MiB, file {path.stat().st_size / 2 ** 20:,.0f} MiB", flush=True)
+    for index, size in sorted(sizes.items()):
+        print(f"    {index:<40} {size / 2 ** 20:>8,.0f} MiB")
+    path.unlink()
+
+
+def main(count: int = 10_000_000, batch: int = 10_000):
+    for name, (target, make_id) in VARIANTS.items():
+        load(name, target, make_id, count, batch)
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,52 @@
+"""
+GET /tasks/open-count and /tasks/percentage-complete served from task_stats and
+its rollups, next to the COUNT(*) queries they replaced, on a database made by
+benchmarks.generate (Zipf-distributed assignees, two years of due dates), so the
+summaries have as many keys as they would in production.
+
+    python -m benchmarks.bench_task_stats [tasks] [users]
+"""
+import sqlite3
+import sys
+
+from benchmarks.common import temp_database, app_client, timed, print_summary
+from benchmarks.generate import generate
+from database.task_stats import SUMMARIES
+
+
+def main(tasks: int = 500_000, users: int = 1000):
+    path = temp_database()
+    generate(path, users, tasks)
+    conn = sqlite3.connect(path)
+    for table in SUMMARIES:
+        print(f"{table}: {conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]:,} rows")
+    print(f"tasks: {tasks:,} rows\n")
+
+    print_summary("COUNT open tasks", timed(
+        lambda: conn.execute("SELECT COUNT(*) FROM tasks WHERE status != 2").fetchone(), 20))
+    print_summary("COUNT open tasks of user1", timed(
+        lambda: conn.execute("SELECT COUNT(*) FROM tasks WHERE status != 2 AND assignee = 1").fetchone(), 20))
+    print_summary("COUNT total + done", timed(
+        lambda: (conn.execute("SELECT COUNT(*) FROM tasks").fetchone(),
+                 conn.execute("SELECT COUNT(*) FROM tasks WHERE status = 2").fetchone()), 20))
+    # The queries the routes now run, without the HTTP round trip
+    print_summary("SUM open task_status_totals", timed(
+        lambda: conn.execute("SELECT SUM(count) FROM task_status_totals WHERE status != 2").fetchone(), 200))
+    print_summary("SUM open task_assignee_stats", timed(
+        lambda: conn.execute("SELECT SUM(count) FROM task_assignee_stats "
+                             "WHERE IFNULL(assignee, -1) = 1 AND status != 2").fetchone(), 200))
+    print_summary("SUM task_status_totals (total+done)", timed(
+        lambda: conn.execute("SELECT SUM(count), SUM(CASE WHEN status = 2 THEN count ELSE 0 END) "
+                             "FROM task_status_totals").fetchone(), 200))
+
+    with app_client(path) as client:
+        for name, params in [("", {}), ("?assignee=1", {"assignee": 1}), ("?assignee=-1", {"assignee": -1}),
+                             ("?due_date=2025-06-02", {"due_date": "2025-06-02"})]:
+            print_summary(f"GET /tasks/open-count{name}", timed(
+                lambda: client.get("/tasks/open-count", params=params).raise_for_status(), 200))
+        print_summary("GET /tasks/percentage-complete", timed(
+            lambda: client.get("/tasks/percentage-complete").raise_for_status(), 200))
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,99 @@
+"""
+Task update cost and optimistic concurrency.
+
+Compares the old load + modify + commit update with the single UPDATE ... RETURNING
+statement, then has many parallel writers increment counters stored in a few
+tasks, with and without If-Match, and checks how many increments were lost.
+
+    python -m benchmarks.bench_update [writers] [increments]
+"""
+import asyncio
+import random
+import sys
+import time
+
+import httpx
+from sqlalchemy import select
+
+from benchmarks.common import temp_database, insert_tasks, load_app, serve, summarize, print_summary
+
+
+async def statement_latency(iterations: int = 2000):
+    from crud.task import update_task_row
+    from database.session import get_async_session, dispose_async_engine
+    from models.task import Task
+
+    async with get_async_session()() as db:
+        ids = list(await db.scalars(select(Task.id).limit(iterations)))
+
+    async def load_and_commit(db, task_id, n):
+        task = await db.get(Task, task_id)
+        task.title = f"Loaded {n}"
+        task.version += 1
+        await db.commit()
+
+    async def returning(db, task_id, n):
+        await update_task_row(db, task_id, {"title": f"Returned {n}"})
+        await db.commit()
+
+    for name, update in (("SELECT + UPDATE + commit", load_and_commit), ("UPDATE ... RETURNING + commit", returning)):
+        samples = []
+        for n, task_id in enumerate(random.Random(0).sample(ids, len(ids))):
+            # A fresh session per update, as every request gets one
+            async with get_async_session()() as db:
+                start = time.perf_counter()
+                await update(db, task_id, n)
+                samples.append(time.perf_counter() - start)
+        print_summary(name, summarize(samples))
+    await dispose_async_engine()
+
+
+async def writers(client: httpx.AsyncClient, task_ids: list, writers: int, increments: int, if_match: bool):
+    for task_id in task_ids:
+        (await client.put(f"/task/{task_id}", json={"description": "0"})).raise_for_status()
+
+    conflicts = 0
+
+    async def writer(seed: int):
+        nonlocal conflicts
+        rng = random.Random(seed)
+        for _ in range(increments):
+            task_id = rng.choice(task_ids)
+            while True:
+                current = await client.get(f"/task/{task_id}")
+                headers = {"If-Match": current.headers["etag"]} if if_match else {}
+                await asyncio.sleep(0)  # Give the other writers a chance to interleave
+                response = await client.put(f"/task/{task_id}", headers=headers,
+                                            json={"description": str(int(current.json()["description"]) + 1)})
+                if response.status_code != 412:
+                    response.raise_for_status()
+                    break
+                conflicts += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(writer(seed) for seed in range(writers)))
+    elapsed = time.perf_counter() - start
+
+    total = sum([int((await client.get(f"/task/{task_id}")).json()["description"]) for task_id in task_ids])
+    expected = writers * increments
+    print(f"{writers} writers {'with' if if_match else 'without'} If-Match: {total}/{expected} increments kept "
+          f"({expected - total} lost), {conflicts} conflicts retried, {expected / elapsed:,.0f} increments/s")
+
+
+async def main(writer_count: int = 20, increments: int = 25):
+    path = temp_database()
+    insert_tasks(path, 10000)
+    app, headers = load_app(path)
+
+    with serve(app) as base_url:
+        async with httpx.AsyncClient(base_url=base_url, headers=headers, timeout=60,
+                                     limits=httpx.Limits(max_connections=writer_count)) as client:
+            task_ids = [task["id"] for task in (await client.get("/tasks", params={"limit": 5})).json()["tasks"]]
+            await writers(client, task_ids, writer_count, increments, if_match=False)
+            await writers(client, task_ids, writer_count, increments, if_match=True)
+
+    await statement_latency()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*(int(arg) for arg in sys.argv[1:3])))
@@ -0,0 +1,46 @@
+"""
+GET /users and the task lists with 100k users. Run it on this commit and on the
+one before the user directory to compare (older versions ignore prefix and limit):
+
+    python -m benchmarks.bench_user_directory [users] [tasks] [requests]
+"""
+import asyncio
+import sys
+import time
+
+import httpx
+
+from benchmarks.common import temp_database, load_app, summarize, print_summary
+from benchmarks.generate import generate
+
+REQUESTS = {
+    "GET /users (all)": ("/users", {}),
+    "GET /users?prefix&limit=50": ("/users", {"prefix": "user12", "limit": 50}),
+    "GET /tasks": ("/tasks", {"limit": 20}),
+    "GET /tasks?assignee": ("/tasks", {"assignee": 1, "limit": 20}),
+    "GET /tasks?status=2": ("/tasks", {"status": 2, "limit": 100}),
+    "GET /tasks/search": ("/tasks/search", {"q": "fix", "limit": 20}),
+}
+
+
+async def main(users: int = 100_000, tasks: int = 200_000, requests: int = 200):
+    path = temp_database()
+    generate(path, users, tasks)
+    app, headers = load_app(path)
+
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench",
+                                     headers=headers, timeout=60) as client:
+            for name, (url, params) in REQUESTS.items():
+                count = requests // 10 if "(all)" in name else requests
+                samples = []
+                start = time.perf_counter()
+                for _ in range(count):
+                    t0 = time.perf_counter()
+                    (await client.get(url, params=params)).raise_for_status()
+                    samples.append(time.perf_counter() - t0)
+                print_summary(name, summarize(samples, time.perf_counter() - start))
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*(int(arg) for arg in sys.argv[1:4])))
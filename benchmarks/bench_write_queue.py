@@ -0,0 +1,36 @@
+"""
+POST /task throughput against the number of concurrent clients, with each request
+committing on its own versus the group-commit write queue (WRITE_QUEUE_ENABLED),
+under synchronous=NORMAL and synchronous=FULL (an fsync per commit).
+
+    python -m benchmarks.bench_write_queue [requests per run]
+"""
+import asyncio
+import json
+import sys
+
+from benchmarks.common import temp_database, insert_tasks, serve_process, http_load, print_summary
+
+CONCURRENCY = (1, 8, 32, 128)
+TASK = json.dumps({"title": "Concurrent insert", "description": "Group commit benchmark", "assignee": 1,
+                   "status": 0, "severity": 0, "priority": 0}).encode()
+
+
+async def main(requests: int = 4096):
+    path = temp_database()
+    insert_tasks(path, 10000)
+
+    for synchronous in ("NORMAL", "FULL"):
+        for enabled in (False, True):
+            settings = {"SQLITE_SYNCHRONOUS": synchronous, "WRITE_QUEUE_ENABLED": str(enabled).lower()}
+            with serve_process(path, **settings) as (base_url, headers):
+                for clients in CONCURRENCY:
+                    print_summary(
+                        f"synchronous={synchronous} queue={'on' if enabled else 'off'} clients={clients}",
+                        await http_load(base_url, "POST", "/task", {**headers, "Content-Type": "application/json"},
+                                        TASK, clients, requests),
+                    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*(int(arg) for arg in sys.argv[1:2])))
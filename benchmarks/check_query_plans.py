@@ -0,0 +1,87 @@
+"""
+Run every task route against a populated database, capture the SQL it issues
+and check ``EXPLAIN QUERY PLAN`` for each statement. Exits non-zero if any of
+them reads the tasks table with a full table scan instead of an index.
+
+    python -m benchmarks.check_query_plans
+"""
+import re
+import sys
+
+from sqlalchemy import event
+
+from ai.client import get_openai_client, set_openai_client
+from benchmarks.common import temp_database, insert_tasks, app_client
+from database.session import create_db_engine, get_async_engine
+
+# "SCAN tasks" without "USING [COVERING] INDEX" is a full table scan
+FULL_SCAN = re.compile(r"^SCAN tasks\b(?! USING (COVERING )?INDEX)")
+
+REQUESTS = [
+    ("GET", "/tasks", {}),
+    ("GET", "/tasks", {"status": 0}),
+    ("GET", "/tasks", {"status": 2}),
+    ("GET", "/tasks", {"assignee": 1}),
+    ("GET", "/tasks", {"assignee": -1}),
+    ("GET", "/tasks", {"status": 1, "assignee": 2}),
+    ("GET", "/tasks", {"include_total": True}),
+    ("GET", "/tasks/search", {"q": "login"}),
+    ("GET", "/tasks/search", {"q": "log tok", "status": 1, "assignee": 2}),
+    ("GET", "/tasks/export", {"updated_since": "2025-06-01T00:00:00"}),  # A full export is a scan by design
+    ("GET", "/tasks/open-count", {}),
+    ("GET", "/tasks/open-count", {"assignee": 1}),
+    ("GET", "/tasks/open-count", {"due_date": "2025-04-01"}),
+    ("GET", "/tasks/open-count", {"assignee": 1, "due_date": "2025-04-01"}),
+    ("GET", "/tasks/percentage-complete", {}),
+    ("POST", "/task/suggest-new", {}),
+]
+
+
+def main() -> int:
+    path = temp_database()
+    insert_tasks(path, 20000)
+
+    with app_client(path) as client:
+        # The AI routes are only run for their queries, fail the upstream call fast
+        set_openai_client(get_openai_client().with_options(base_url="http://127.0.0.1:9", max_retries=0))
+
+        statements = []
+        engine = get_async_engine().sync_engine
+        explain_engine = create_db_engine(f"sqlite:///{path}")
+        with explain_engine.connect() as connection:
+            connection.exec_driver_sql("ANALYZE")
+            connection.commit()
+
+        def capture(_conn, _cursor, statement, parameters, _context, _executemany):
+            if not statement.lstrip().upper().startswith(("PRAGMA", "EXPLAIN")):
+                statements.append((statement, parameters))
+
+        event.listen(engine, "before_cursor_execute", capture)
+        for method, url, params in REQUESTS:
+            try:
+                response = client.request(method, url, params=params)
+            except Exception as e:
+                print(f"{method} {url} failed after querying: {e!r}")
+                continue
+            # Also exercise the cursor seek for every list query
+            if url in ("/tasks", "/tasks/search") and response.json()["pagination"]["next_cursor"]:
+                client.get(url, params={**params, "cursor": response.json()["pagination"]["next_cursor"]})
+        event.remove(engine, "before_cursor_execute", capture)
+
+        failures = 0
+        with explain_engine.connect() as connection:
+            for statement, parameters in statements:
+                plan = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+                scans = [row[3] for row in plan if FULL_SCAN.match(row[3])]
+                status = "FULL SCAN" if scans else "ok"
+                failures += bool(scans)
+                print(f"[{status}] {' '.join(statement.split())}")
+                for row in plan:
+                    print(f"    {row[3]}")
+
+    print(f"{len(statements)} statements checked, {failures} full table scan(s)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""
+Check that the task lists rendered by api/serialization.py match what the
+response_model path renders: byte for byte for GET /tasks and /tasks/search
+pages (built from random and hostile strings: control characters, quotes,
+backslashes, non-ASCII, astral characters, U+2028), value for value for the
+NDJSON export (the stdlib json escaped non-ASCII and put spaces after separators,
+both are gone). Then the same against the running app, and its OpenAPI schema.
+Exits non-zero on any difference.
+
+    python -m benchmarks.check_serialization [pages]
+"""
+import json
+import random
+import sys
+import uuid
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+
+from fastapi.responses import JSONResponse
+
+from api.routes.task import EXPORT_COLUMNS, _task_page
+from api.serialization import export_ndjson, task_page_json
+from benchmarks.common import temp_database, insert_tasks, app_client, words
+from schemas.task import TasksGetResponse
+
+ListRow = namedtuple("ListRow", "id title description assignee status severity priority due_date")
+ExportRow = namedtuple("ExportRow", EXPORT_COLUMNS)
+
+ALPHABET = (
+    [chr(c) for c in range(0x20)] + ['"', "\\", "/", "\x7f", "\u2028", "\u2029", "\ufeff", "\uffff"]
+    + list("a\u00e9\u4e2d\u00fc\u20ac") + ["\U0001f600", "\U00010000", "\U0010ffff"]
+)
+
+
+def response_model_json(page: dict) -> bytes:
+    # What FastAPI does with a response_model: validate, dump in JSON mode, render with JSONResponse
+    return JSONResponse(TasksGetResponse.model_validate(page).model_dump(mode="json")).body
+
+
+def stdlib_ndjson(rows) -> str:
+    # The export before api/serialization.py
+    return "".join(
+        json.dumps({column: value.isoformat() if isinstance(value, (date, datetime)) else value
+                    for column, value in zip(EXPORT_COLUMNS, row)}) + "\n"
+        for row in rows
+    )
+
+
+def text(rng: random.Random) -> str:
+    if rng.random() < 0.5:
+        return words(rng, rng.randint(0, 12))
+    return "".join(rng.choices(ALPHABET, k=rng.randint(0, 40)))
+
+
+def list_rows(rng: random.Random, count: int) -> list:
+    return [
+        ListRow(str(uuid.UUID(int=rng.getrandbits(128))), text(rng), text(rng), rng.choice([None, 1, 2, 3, 99]),
+                rng.randint(0, 2), rng.randint(0, 2), rng.randint(0, 2),
+                rng.choice([None, date(2025, 1, 1) + timedelta(days=rng.randint(-9000, 9000))]))
+        for _ in range(count)
+    ]
+
+
+def export_rows(rng: random.Random, count: int) -> list:
+    def moment():
+        # Whole seconds too: isoformat() leaves out zero microseconds
+        value = datetime(2025, 1, 1) + timedelta(seconds=rng.randint(-10 ** 8, 10 ** 8))
+        return value if rng.random() < 0.3 else value.replace(microsecond=rng.randint(0, 999_999))
+
+    return [
+        ExportRow(row.id, row.title, row.description, row.assignee, rng.choice([None, text(rng)]), row.status,
+                  row.severity, row.priority, row.due_date, moment(), rng.choice([None, moment()]))
+        for row in list_rows(rng, count)
+    ]
+
+
+def page_args(rng: random.Random) -> tuple:
+    return (rng.choice([None, rng.randint(0, 10 ** 6)]), rng.random() < 0.5, rng.randint(0, 1000),
+            rng.randint(1, 100), rng.choice([None, text(rng)]))
+
+
+def check_offline(pages: int) -> int:
+    rng = random.Random(0)
+    names = {1: "user1", 2: "\u00e9 \"quoted\" \\ \u2028", 3: text(rng)}
+    failures = 0
+    for n in range(pages):
+        page = _task_page(list_rows(rng, rng.randint(0, 100)), names, *page_args(rng))
+        if task_page_json(page) != response_model_json(page):
+            failures += 1
+            print(f"page {n} differs:\n  {response_model_json(page)[:300]!r}\n  {task_page_json(page)[:300]!r}")
+
+        rows = export_rows(rng, rng.randint(0, 50))
+        new, old = export_ndjson(rows).decode().split("\n"), stdlib_ndjson(rows).split("\n")
+        if [line and json.loads(line) for line in new] != [line and json.loads(line) for line in old]:
+            failures += 1
+            print(f"export chunk {n} differs")
+    print(f"{pages} pages and export chunks: {failures} differences")
+    return failures
+
+
+def check_app() -> int:
+    path = temp_database()
+    insert_tasks(path, 2000)
+    failures = 0
+    with app_client(path) as client:
+        for url, params in [("/tasks", {"limit": 100}), ("/tasks", {"status": 2, "include_total": True}),
+                            ("/tasks/search", {"q": "fix", "limit": 100})]:
+            response = client.get(url, params=params)
+            expected = response_model_json(response.json())
+            ok = (response.status_code == 200 and response.content == expected
+                  and response.headers["content-type"] == "application/json"
+                  and (url != "/tasks" or "etag" in response.headers))
+            failures += not ok
+            print(f"GET {url} {params}: {'ok' if ok else 'DIFFERS'}")
+
+        response = client.get("/tasks/export")
+        lines = response.text.splitlines()
+        ok = len(lines) == 2000 and all(json.loads(line).keys() == set(EXPORT_COLUMNS) for line in lines)
+        failures += not ok
+        print(f"GET /tasks/export: {'ok' if ok else 'DIFFERS'}")
+
+        schema = client.get("/openapi.json").json()
+        for url in ("/tasks", "/tasks/search"):
+            content = schema["paths"][url]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+            ok = content == {"$ref": "#/components/schemas/TasksGetResponse"}
+            failures += not ok
+            print(f"OpenAPI {url}: {'ok' if ok else content}")
+    return failures
+
+
+if __name__ == "__main__":
+    failures = check_offline(int(sys.argv[1]) if len(sys.argv) > 1 else 2000) + check_app()
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,264 @@
+"""
+Shared helpers for the benchmark scripts in this package.
+
+Run any benchmark from the repo root, e.g. ``python -m benchmarks.bench_engine``.
+"""
+import json
+import os
+import random
+import socket
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import date, timedelta
+from itertools import accumulate
+from pathlib import Path
+
+from database.migrate import upgrade
+from database.session import create_db_engine
+from models.task import new_task_id
+
+# Words for generated titles and descriptions, drawn with Zipf-like frequencies so
+# search benchmarks see both very common and rare terms
+WORDS = (
+    "fix update add remove refactor test deploy review login signup token password user task api endpoint "
+    "database index query migration cache latency timeout error crash bug feature page list filter search "
+    "export import report dashboard chart email notification reminder schedule deadline priority severity "
+    "assignee status frontend backend mobile android ios browser layout button form modal dropdown "
+    "validation docs readme release build pipeline docker kubernetes monitoring alert metrics logging "
+    "billing invoice payment customer onboarding settings profile avatar upload download"
+).split()
+WORDS += [f"term{i}" for i in range(2000)]
+WORD_WEIGHTS = [1 / (rank + 1) for rank in range(len(WORDS))]
+# Passed to choices() so it does not add up the 2,000+ weights again on every call
+WORD_CUM_WEIGHTS = list(accumulate(WORD_WEIGHTS))
+
+
+def words(rng: random.Random, count: int) -> str:
+    return " ".join(rng.choices(WORDS, cum_weights=WORD_CUM_WEIGHTS, k=count))
+
+
+def temp_database(target: int = None) -> Path:
+    """Create an empty database in a temporary directory, migrated to `target` (default: the latest version)."""
+    path = Path(tempfile.mkdtemp(prefix="task-app-bench-")) / "database.db"
+    engine = create_db_engine(f"sqlite:///{path}")
+    upgrade(engine, target)
+    engine.dispose()
+    return path
+
+
+def load_app(path: Path):
+    """
+    Import the app bound to the database at `path`.
+
+    Returns:
+        The FastAPI app and the headers authenticating requests as user 1.
+    """
+    from config import Config
+    Config.DATABASE_URL = f"sqlite:///{path}"
+    Config.SECRET_KEY = Config.SECRET_KEY or "benchmark-secret"
+    Config.OPENAI_API_KEY = Config.OPENAI_API_KEY or "sk-benchmark"
+
+    import security
+    from main import app
+
+    token = security.create_access_token(json.dumps({"username": "user1", "id": 1}), timedelta(hours=1))
+    return app, {"Authorization": f"Bearer {token}"}
+
+
+def app_client(path: Path):
+    """
+    A TestClient for the app bound to the database at `path`, authenticated as user 1.
+
+    Use it as a context manager so the app lifespan (engine setup) runs.
+    """
+    from fastapi.testclient import TestClient
+
+    app, headers = load_app(path)
+    return TestClient(app, headers=headers)
+
+
+@contextmanager
+def serve(app):
+    """
+    Run the app on a local port with uvicorn in a background thread.
+
+    Needed when the response has to be observed as it streams, which the in-process
+    httpx ASGITransport cannot do (it buffers the whole body).
+
+    Yields:
+        The base URL of the server.
+    """
+    import uvicorn
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        thread.join()
+
+
+@contextmanager
+def serve_process(path: Path, **env):
+    """
+    Run the app with uvicorn in a separate process, bound to the database at `path`.
+
+    Unlike serve(), the server does not share the GIL with the benchmark's own
+    client, which otherwise skews throughput measurements under concurrency.
+
+    Args:
+        env: Extra settings for the server, e.g. WRITE_QUEUE_ENABLED="true".
+
+    Yields:
+        The base URL of the server and the headers authenticating requests as user 1.
+    """
+    _, headers = load_app(path)
+    from config import Config
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    server_env = {**os.environ, "DATABASE_URL": Config.DATABASE_URL, "SECRET_KEY": Config.SECRET_KEY,
+                  "OPENAI_API_KEY": Config.OPENAI_API_KEY, **{key: str(value) for key, value in env.items()}}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        env=server_env, cwd=Path(__file__).parent.parent,
+    )
+    try:
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+                break
+            except OSError:
+                if server.poll() is not None:
+                    raise RuntimeError("uvicorn exited during startup")
+                time.sleep(0.05)
+        yield f"http://127.0.0.1:{port}", headers
+    finally:
+        server.terminate()
+        server.wait()
+
+
+async def http_load(base_url: str, method: str, path: str, headers: dict, body: bytes, clients: int,
+                    requests: int) -> dict:
+    """
+    Send `requests` identical requests over `clients` keep-alive connections.
+
+    A bare asyncio HTTP/1.1 client: at high concurrency httpx spends more CPU per
+    request than the server under test, which on a small machine caps the load.
+
+    Returns:
+        A summarize() dict of the latencies, plus the count of non-2xx responses as `errors`.
+    """
+    import asyncio
+    from urllib.parse import urlsplit
+
+    url = urlsplit(base_url)
+    head = [f"{method} {path} HTTP/1.1", f"Host: {url.netloc}", f"Content-Length: {len(body)}"]
+    head += [f"{name}: {value}" for name, value in headers.items()]
+    request = ("\r\n".join(head) + "\r\n\r\n").encode() + body
+    latencies, errors = [], 0
+
+    async def connection(count: int):
+        nonlocal errors
+        reader, writer = await asyncio.open_connection(url.hostname, url.port)
+        try:
+            for _ in range(count):
+                start = time.perf_counter()
+                writer.write(request)
+                status_line = await reader.readline()
+                length = 0
+                while (line := await reader.readline()) not in (b"\r\n", b""):
+                    name, _, value = line.decode().partition(":")
+                    if name.lower() == "content-length":
+                        length = int(value)
+                await reader.readexactly(length)
+                latencies.append(time.perf_counter() - start)
+                errors += not status_line.split()[1].startswith(b"2")
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(connection(requests // clients) for _ in range(clients)))
+    summary = summarize(latencies, time.perf_counter() - start)
+    summary["errors"] = errors
+    return summary
+
+
+def insert_tasks(path: Path, count: int, users: int = 10, seed: int = 0):
+    """Bulk insert `count` random tasks (and `users` placeholder users) straight through sqlite3."""
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    conn.executemany(
+        "INSERT OR IGNORE INTO users (id, username, hashed_password) VALUES (?, ?, '')",
+        [(i, f"user{i}") for i in range(1, users + 1)],
+    )
+    start_date = date(2025, 3, 20)
+    batch = []
+    for i in range(count):
+        due_date = None if rng.random() < 0.1 else (start_date + timedelta(days=rng.randint(0, 365))).isoformat()
+        batch.append((
+            uuid.UUID(new_task_id()).bytes, f"Task #{i} {words(rng, 3)}", words(rng, rng.randint(5, 20)),
+            rng.choice([None, *range(1, users + 1)]),
+            rng.choice((0, 1, 2)), rng.choice((0, 1, 2)), rng.choice((0, 1, 2)), due_date,
+        ))
+        if len(batch) == 10000:
+            conn.executemany("INSERT INTO tasks (id, title, description, assignee, status, severity, priority, "
+                             "due_date) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", batch)
+            batch = []
+    conn.executemany("INSERT INTO tasks (id, title, description, assignee, status, severity, priority, due_date) "
+                     "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", batch)
+    conn.commit()
+    conn.close()
+
+
+def summarize(samples: list, elapsed: float = None) -> dict:
+    """Latency percentiles (ms) for a list of per-operation durations in seconds."""
+    ordered = sorted(samples)
+
+    def pct(p):
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] * 1000
+
+    summary = {
+        "count": len(ordered),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": pct(50),
+        "p95_ms": pct(95),
+        "p99_ms": pct(99),
+        "max_ms": ordered[-1] * 1000,
+    }
+    if elapsed:
+        summary["ops_per_sec"] = len(ordered) / elapsed
+    return summary
+
+
+def timed(fn, iterations: int) -> dict:
+    """Call ``fn`` ``iterations`` times and summarize the per-call latency."""
+    samples = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return summarize(samples, time.perf_counter() - start)
+
+
+def print_summary(name: str, summary: dict):
+    parts = [f"{key}={value:.3f}" if isinstance(value, float) else f"{key}={value}" for key, value in summary.items()]
+    print(f"{name:<32} " + " ".join(parts))
@@ -0,0 +1,135 @@
+"""
+A local stand-in for openai.AsyncOpenAI with configurable latency, so the AI
+routes can be exercised without network access or an API key, and
+fake_openai_app(), the same over HTTP for the real client to talk to.
+"""
+import asyncio
+import json
+import re
+import time
+from types import SimpleNamespace
+
+
+class FakeStream:
+    """Async iterator of completion chunks, one per word, like a `stream=True` response."""
+
+    def __init__(self, owner: "FakeOpenAI", content: str, usage=None):
+        self.owner = owner
+        self.words = content.split(" ")
+        self.usage = usage
+        self.closed = False
+
+    def __aiter__(self):
+        return self._chunks()
+
+    async def _chunks(self):
+        await asyncio.sleep(self.owner.latency)  # Time to the first token
+        for n, word in enumerate(self.words):
+            if self.closed:
+                return
+            text = word if n == 0 else f" {word}"
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text), finish_reason=None)],
+                                  usage=None)
+            await asyncio.sleep(self.owner.token_latency)
+        if self.usage is not None:
+            # stream_options={"include_usage": True}: a last chunk with the usage and no choices
+            yield SimpleNamespace(choices=[], usage=self.usage)
+
+    async def close(self):
+        self.closed = True
+        self.owner.closed_streams += 1
+
+
+class FakeCompletions:
+    def __init__(self, owner: "FakeOpenAI"):
+        self.owner = owner
+
+    async def create(self, model: str, messages: list, **kwargs):
+        self.owner.calls += 1
+        self.owner.requests.append({"model": model, "messages": messages, **kwargs})
+        content = self.owner.reply(messages[-1]["content"])
+        usage = SimpleNamespace(prompt_tokens=len(messages[-1]["content"]) // 4, completion_tokens=len(content) // 4)
+        if kwargs.get("stream"):
+            include_usage = (kwargs.get("stream_options") or {}).get("include_usage")
+            return FakeStream(self.owner, content, usage if include_usage else None)
+
+        await asyncio.sleep(self.owner.latency)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content), finish_reason="stop")],
+            usage=usage,
+        )
+
+
+class FakeOpenAI:
+    """
+    Mimics the parts of openai.AsyncOpenAI the app uses.
+
+    Args:
+        latency: Seconds every call takes (time to the first token when streaming).
+        reply: Function of the prompt returning the completion text.
+        token_latency: Seconds between streamed tokens.
+    """
+
+    def __init__(self, latency: float = 0.5, reply=None, token_latency: float = 0.02):
+        self.latency = latency
+        self.token_latency = token_latency
+        self.closed_streams = 0
+        self.reply = reply or recommendation_reply
+        self.calls = 0
+        self.requests = []
+        self.chat = SimpleNamespace(completions=FakeCompletions(self))
+
+
+def recommendation_reply(prompt: str) -> str:
+    """A reply to both recommendation prompts: one object, or an array for a batch prompt."""
+    recommendation = {"severity": "Medium", "priority": "High"}
+    tasks = len(re.findall(r"^Task \d+:", prompt, re.MULTILINE))
+    return json.dumps([recommendation] * tasks if tasks else recommendation)
+
+
+def fake_openai_app(latency: float = 0.5, reply=None, max_concurrency: int = 0):
+    """
+    An HTTP server speaking enough of the OpenAI API for openai.AsyncOpenAI(base_url=...)
+    to get chat completions from it (no streaming), to measure the client and
+    network overhead FakeOpenAI skips.
+
+    Args:
+        latency: Seconds every completion takes.
+        reply: Function of the prompt returning the completion text.
+        max_concurrency: Completions served at once; more get 429, like a rate
+            limit. 0 for no limit.
+
+    Returns:
+        The ASGI app; its `state.calls` and `state.rejected` count the requests.
+    """
+    from starlette.applications import Starlette
+    from starlette.responses import JSONResponse
+    from starlette.routing import Route
+
+    reply = reply or recommendation_reply
+
+    async def completions(request):
+        app.state.calls += 1
+        if max_concurrency and app.state.running >= max_concurrency:
+            app.state.rejected += 1
+            return JSONResponse({"error": {"message": "Rate limit reached", "type": "rate_limit_error"}}, 429)
+
+        body = await request.json()
+        prompt = body["messages"][-1]["content"]
+        app.state.running += 1
+        try:
+            await asyncio.sleep(latency)
+        finally:
+            app.state.running -= 1
+        content = reply(prompt)
+        return JSONResponse({
+            "id": f"chatcmpl-{app.state.calls}", "object": "chat.completion", "created": int(time.time()),
+            "model": body["model"],
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4,
+                      "total_tokens": (len(prompt) + len(content)) // 4},
+        })
+
+    app = Starlette(routes=[Route("/v1/chat/completions", completions, methods=["POST"])])
+    app.state.calls = app.state.rejected = app.state.running = 0
+    return app
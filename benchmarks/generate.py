@@ -0,0 +1,145 @@
+"""
+Bulk-load a database with N users and M tasks straight through sqlite3, fast
+enough for tens of millions of tasks, with production-like distributions:
+
+- assignees follow a Zipf-like curve (a few users own most tasks), 10% unassigned
+- about half the tasks are done, and done tasks are older than open ones
+- created dates span two years, due dates fall around them, 15% have none
+- severity and priority lean towards medium
+
+Every user is called user<id> and has the same password, so login benchmarks can
+sign in as anyone; bcrypt runs once, not once per user.
+
+The tasks indexes and triggers are dropped during the load and recreated after it,
+then the full-text index, task_stats (and its rollups) and table_versions are
+rebuilt, which leaves the database exactly as if the tasks had been inserted
+through the app.
+
+    python -m benchmarks.generate <database path> [--users 1000] [--tasks 1000000] [--seed 0]
+"""
+import argparse
+import random
+import sqlite3
+import time
+from itertools import accumulate
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import security
+from benchmarks.common import words
+from database.migrate import upgrade
+from database.session import create_db_engine
+
+PASSWORD = "password"
+BATCH_SIZE = 50_000
+NOW = datetime(2026, 1, 1)
+# Out of 100, indexed with a random percentile: cheaper than choices() per row
+STATUSES = (0,) * 30 + (1,) * 20 + (2,) * 50
+SEVERITIES = (0,) * 25 + (1,) * 50 + (2,) * 25
+PRIORITIES = (0,) * 20 + (1,) * 55 + (2,) * 25
+INSERT_TASK = ("INSERT INTO tasks (id, title, description, assignee, status, severity, priority, due_date, "
+               "created_date, updated_date, version) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1)")
+
+
+def _uuid7(rng: random.Random, created: datetime) -> bytes:
+    # Same layout as models.task.new_task_id(), timestamped with the task's creation time
+    value = (int(created.timestamp() * 1000) << 80) | rng.getrandbits(80)
+    value = (value & ~(0xF << 76)) | (0x7 << 76)
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)
+    return value.to_bytes(16, "big")
+
+
+def _task_rows(rng: random.Random, count: int, users: int):
+    assignees = [None, *range(1, users + 1)]
+    weights = [1 / rank ** 0.8 for rank in range(1, users + 1)]
+    # choices() would otherwise add up the weights again for every task
+    cum_weights = list(accumulate([0.1 * sum(weights), *weights]))
+    span = 2 * 365 * 86400
+
+    for i in range(count):
+        status = STATUSES[int(rng.random() * 100)]
+        # Done tasks were created earlier: skew their age towards the start of the span
+        age = span * (rng.random() ** (0.5 if status == 2 else 2))
+        created = NOW - timedelta(seconds=age)
+        updated = created + timedelta(seconds=rng.random() * min(age, 30 * 86400))
+        due_date = None if rng.random() < 0.15 else (created + timedelta(days=rng.randint(-5, 60))).date().isoformat()
+        yield (
+            _uuid7(rng, created), f"{words(rng, 3).capitalize()} #{i}", words(rng, rng.randint(5, 30)),
+            rng.choices(assignees, cum_weights=cum_weights)[0], status,
+            SEVERITIES[int(rng.random() * 100)], PRIORITIES[int(rng.random() * 100)], due_date,
+            created.strftime("%Y-%m-%d %H:%M:%S.%f"), updated.strftime("%Y-%m-%d %H:%M:%S.%f"),
+        )
+
+
+def generate(path: Path, users: int = 1000, tasks: int = 1_000_000, seed: int = 0, progress: bool = False) -> dict:
+    """
+    Migrate the database at `path` (created if missing) and append `users` users and
+    `tasks` tasks to it.
+
+    Returns:
+        The number of users and tasks inserted and the seconds the load took.
+    """
+    engine = create_db_engine(f"sqlite:///{path}")
+    upgrade(engine)
+    engine.dispose()
+
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA cache_size = -262144")  # 256 MiB
+
+    # Indexes are rebuilt faster in one sort than maintained row by row
+    schema = conn.execute(
+        "SELECT type, name, sql FROM sqlite_master WHERE tbl_name = 'tasks' AND type IN ('index', 'trigger') "
+        "AND sql IS NOT NULL"
+    ).fetchall()
+    conn.execute("BEGIN")
+    for kind, name, _ in schema:
+        conn.execute(f'DROP {kind.upper()} "{name}"')
+
+    first_user = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM users").fetchone()[0]
+    hashed = security.hash_password(PASSWORD)
+    conn.executemany("INSERT INTO users (id, username, hashed_password) VALUES (?, ?, ?)",
+                     ((i, f"user{i}", hashed) for i in range(first_user, first_user + users)))
+    user_count = first_user + users - 1
+
+    batch = []
+    for n, row in enumerate(_task_rows(rng, tasks, user_count), 1):
+        batch.append(row)
+        if len(batch) == BATCH_SIZE:
+            conn.executemany(INSERT_TASK, batch)
+            batch = []
+            if progress and n % 1_000_000 == 0:
+                print(f"{n:,} tasks in {time.perf_counter() - start:.0f} s")
+    conn.executemany(INSERT_TASK, batch)
+
+    for _, _, sql in schema:
+        conn.execute(sql)
+    conn.execute("INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')")
+    conn.execute("DELETE FROM task_stats")
+    # Refilled by the task_stats triggers as the summary is inserted
+    conn.execute("DELETE FROM task_status_totals")
+    conn.execute("DELETE FROM task_assignee_stats")
+    conn.execute("INSERT INTO task_stats (status, assignee, due_date, count) "
+                 "SELECT status, assignee, due_date, COUNT(*) FROM (SELECT status, assignee, due_date FROM tasks "
+                 "UNION ALL SELECT status, assignee, due_date FROM tasks_archive) GROUP BY status, assignee, due_date")
+    conn.execute("UPDATE table_versions SET version = version + 1")
+    conn.execute("COMMIT")
+    conn.execute("ANALYZE")
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.close()
+    return {"users": users, "tasks": tasks, "seconds": time.perf_counter() - start}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    result = generate(args.path, args.users, args.tasks, args.seed, progress=True)
+    print(f"Inserted {result['users']:,} users and {result['tasks']:,} tasks in {result['seconds']:.1f} s "
+          f"({result['tasks'] / result['seconds']:,.0f} tasks/s)")
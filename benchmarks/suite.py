@@ -0,0 +1,195 @@
+"""
+The benchmark suite: every main route driven in-process through httpx against a
+generated database (benchmarks/generate.py), with the OpenAI client replaced by
+benchmarks/fake_openai.py. Prints throughput and latency percentiles per scenario
+and writes them as JSON, so runs on different commits can be compared:
+
+    python -m benchmarks.suite --tasks 1000000 --output before.json
+    git checkout <other commit>
+    python -m benchmarks.suite --tasks 1000000 --output after.json --compare before.json
+
+Generating a large database takes a while; `--database` reuses one (it is copied
+first, the write scenarios modify it). `--compare` exits with status 1 when a
+scenario's throughput dropped or its p99 grew by more than `--threshold`.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, NamedTuple
+
+import httpx
+
+from ai.client import set_openai_client
+from benchmarks.common import load_app, summarize, print_summary, words
+from benchmarks.fake_openai import FakeOpenAI
+from benchmarks.generate import PASSWORD, generate
+
+
+class Scenario(NamedTuple):
+    request: Callable[[httpx.AsyncClient, "Dataset", random.Random], Awaitable[httpx.Response]]
+    # Fraction of --requests and cap on --concurrency: logins are bcrypt bound
+    share: float = 1.0
+    max_concurrency: int = 1000
+
+
+class Dataset(NamedTuple):
+    users: int
+    tasks: int
+    task_ids: list
+
+
+def _user(data: Dataset, rng: random.Random) -> int:
+    # Mostly the busiest users, like the generated assignees
+    return min(int(rng.paretovariate(1.2)), data.users)
+
+
+def _task_fields(rng: random.Random) -> dict:
+    return {"title": words(rng, 4), "description": words(rng, 15), "status": rng.randint(0, 2),
+            "severity": rng.randint(0, 2), "priority": rng.randint(0, 2)}
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "list": Scenario(lambda client, data, rng: client.get(
+        "/tasks", params={"assignee": _user(data, rng), "limit": 20})),
+    "list_done": Scenario(lambda client, data, rng: client.get("/tasks", params={"status": 2, "limit": 20})),
+    "get": Scenario(lambda client, data, rng: client.get(f"/task/{rng.choice(data.task_ids)}")),
+    "open_count": Scenario(lambda client, data, rng: client.get(
+        "/tasks/open-count", params={"assignee": _user(data, rng)})),
+    "percentage_complete": Scenario(lambda client, data, rng: client.get("/tasks/percentage-complete")),
+    "search": Scenario(lambda client, data, rng: client.get(
+        "/tasks/search", params={"q": words(rng, 1), "limit": 20})),
+    "create": Scenario(lambda client, data, rng: client.post(
+        "/task", json={**_task_fields(rng), "assignee": _user(data, rng)})),
+    "update": Scenario(lambda client, data, rng: client.put(
+        f"/task/{rng.choice(data.task_ids)}", json={"status": rng.randint(0, 2), "priority": rng.randint(0, 2)})),
+    "login": Scenario(lambda client, data, rng: client.post(
+        "/login", data={"username": f"user{rng.randint(1, data.users)}", "password": PASSWORD}),
+        share=0.05, max_concurrency=4),
+    # Unique text every time, so the recommendation cache never answers
+    "recommend": Scenario(lambda client, data, rng: client.post(
+        "/task/recommend-fields", json={"title": f"{words(rng, 4)} {uuid.uuid4()}", "description": words(rng, 15)}),
+        share=0.25),
+    "suggest": Scenario(lambda client, data, rng: client.post("/task/suggest-new"), share=0.25),
+}
+
+
+async def run_scenario(client: httpx.AsyncClient, data: Dataset, scenario: Scenario, requests: int,
+                       concurrency: int, seed: int) -> dict:
+    latencies, errors = [], 0
+    remaining = requests
+
+    async def worker(n: int):
+        nonlocal remaining, errors
+        rng = random.Random(seed * 1000 + n)
+        while remaining > 0:
+            remaining -= 1
+            t0 = time.perf_counter()
+            response = await scenario.request(client, data, rng)
+            latencies.append(time.perf_counter() - t0)
+            errors += not response.is_success
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(n) for n in range(min(concurrency, scenario.max_concurrency))))
+    return {**summarize(latencies, time.perf_counter() - start), "errors": errors}
+
+
+def _dataset(path: Path) -> Dataset:
+    conn = sqlite3.connect(path)
+    users = conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+    tasks = conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+    ids = [str(uuid.UUID(bytes=row[0])) for row in conn.execute("SELECT id FROM tasks ORDER BY random() LIMIT 10000")]
+    conn.close()
+    return Dataset(users, tasks, ids)
+
+
+def _environment() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=Path(__file__).parent).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {"commit": commit, "date": datetime.now().isoformat(timespec="seconds"), "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version, "machine": platform.machine(), "platform": platform.platform()}
+
+
+async def main(args) -> dict:
+    workdir = Path(tempfile.mkdtemp(prefix="task-app-suite-"))
+    path = workdir / "database.db"
+    if args.database:
+        shutil.copyfile(args.database, path)
+    else:
+        print(f"Generating {args.users:,} users and {args.tasks:,} tasks")
+        generate(path, args.users, args.tasks, args.seed)
+    data = _dataset(path)
+
+    set_openai_client(FakeOpenAI(latency=args.openai_latency, token_latency=0))
+    app, headers = load_app(path)
+    results = {}
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench",
+                                     headers=headers, timeout=120) as client:
+            for name in args.scenarios:
+                scenario = SCENARIOS[name]
+                requests = max(1, int(args.requests * scenario.share))
+                await run_scenario(client, data, scenario, max(1, requests // 10), args.concurrency, args.seed)  # Warm up
+                results[name] = await run_scenario(client, data, scenario, requests, args.concurrency, args.seed)
+                print_summary(name, results[name])
+
+    return {**_environment(), "dataset": {"users": data.users, "tasks": data.tasks, "seed": args.seed},
+            "requests": args.requests, "concurrency": args.concurrency, "openai_latency": args.openai_latency,
+            "results": results}
+
+
+def compare(baseline: dict, report: dict, threshold: float) -> bool:
+    """
+    Print the change of every scenario against `baseline`.
+
+    Returns:
+        Whether any scenario regressed by more than `threshold` (a fraction).
+    """
+    regressed = False
+    print(f"\nAgainst {baseline.get('commit')} ({baseline.get('date')}):")
+    for name, result in report["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            continue
+        throughput = result["ops_per_sec"] / before["ops_per_sec"] - 1
+        p99 = result["p99_ms"] / before["p99_ms"] - 1
+        flag = throughput < -threshold or p99 > threshold
+        regressed |= flag
+        print(f"{name:<20} req/s {before['ops_per_sec']:>8.1f} -> {result['ops_per_sec']:>8.1f} ({throughput:+.1%})  "
+              f"p99 {before['p99_ms']:>8.1f} -> {result['p99_ms']:>8.1f} ms ({p99:+.1%}){'  REGRESSED' if flag else ''}")
+    return regressed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--tasks", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--database", type=Path, help="Reuse a database made by benchmarks.generate")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=2000, help="Per scenario, before its share")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--openai-latency", type=float, default=0.2)
+    parser.add_argument("--output", type=Path, help="Write the results as JSON")
+    parser.add_argument("--compare", type=Path, help="A previous --output to compare with")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args()
+
+    report = asyncio.run(main(args))
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+    if args.compare and compare(json.loads(args.compare.read_text()), report, args.threshold):
+        sys.exit(1)
@@ -10,6 +10,77 @@ class Config:
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
     SECRET_KEY = os.getenv("SECRET_KEY")
 
+    # Database
+    DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///database.db")
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "-1"))
+
+    # SQLite PRAGMAs applied to every new pooled connection
+    SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", "-64000"))  # Negative = KiB, so ~64 MB
+    SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+    # Group commit of create_task / update_task writes (database/write_queue.py)
+    WRITE_QUEUE_ENABLED = os.getenv("WRITE_QUEUE_ENABLED", "false").lower() == "true"
+    WRITE_QUEUE_WINDOW_MS = float(os.getenv("WRITE_QUEUE_WINDOW_MS", "2"))
+    WRITE_QUEUE_MAX_BATCH = int(os.getenv("WRITE_QUEUE_MAX_BATCH", "100"))
+
+    # Prometheus metrics on GET /metrics (metrics.py)
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+    # Archiving of done tasks to tasks_archive (database/archive.py); 0 days disables it
+    ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "30"))
+    ARCHIVE_INTERVAL_SECONDS = float(os.getenv("ARCHIVE_INTERVAL_SECONDS", "300"))
+    ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "500"))
+
+    # Bulk task endpoints
+    BULK_MAX_ITEMS = int(os.getenv("BULK_MAX_ITEMS", "50000"))
+    BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "1000"))
+
+    # GET /tasks/export: rows fetched from the server-side cursor per batch
+    EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+    # GET /tasks/search: matches ranked per query, newest first (0 ranks every match)
+    SEARCH_MAX_CANDIDATES = int(os.getenv("SEARCH_MAX_CANDIDATES", "10000"))
+
+    # GET /tasks/stream change feed
+    FEED_QUEUE_SIZE = int(os.getenv("FEED_QUEUE_SIZE", "256"))  # Per subscriber, before it is told to resync
+    FEED_HEARTBEAT_SECONDS = float(os.getenv("FEED_HEARTBEAT_SECONDS", "15"))
+
+    # Access tokens from /login and /token/refresh; refresh tokens (database/refresh_tokens.py), 0 days disables them
+    ACCESS_TOKEN_EXPIRE_MINUTES = float(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+    REFRESH_TOKEN_TTL_DAYS = float(os.getenv("REFRESH_TOKEN_TTL_DAYS", "14"))
+    REFRESH_TOKEN_PRUNE_INTERVAL_SECONDS = float(os.getenv("REFRESH_TOKEN_PRUNE_INTERVAL_SECONDS", "3600"))
+    REFRESH_TOKEN_PRUNE_BATCH_SIZE = int(os.getenv("REFRESH_TOKEN_PRUNE_BATCH_SIZE", "1000"))
+
+    # Verified access tokens kept in memory by security.get_principal
+    TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "4096"))
+
+    # Password hashing (bcrypt) process pool; 0 workers runs it on the threadpool instead
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+    PASSWORD_HASH_NICE = int(os.getenv("PASSWORD_HASH_NICE", "10"))
+
+    # AI severity/priority recommendations
+    RECOMMENDATION_CACHE_SIZE = int(os.getenv("RECOMMENDATION_CACHE_SIZE", "1024"))
+    RECOMMENDATION_CACHE_TTL = float(os.getenv("RECOMMENDATION_CACHE_TTL", str(24 * 60 * 60)))
+    RECOMMENDATION_CACHE_PERSIST = os.getenv("RECOMMENDATION_CACHE_PERSIST", "true").lower() == "true"
+    # Cache misses arriving within the window are asked for in one prompt (ai/recommendations.py)
+    RECOMMENDATION_BATCH_ENABLED = os.getenv("RECOMMENDATION_BATCH_ENABLED", "true").lower() == "true"
+    RECOMMENDATION_BATCH_WINDOW_MS = float(os.getenv("RECOMMENDATION_BATCH_WINDOW_MS", "20"))
+    RECOMMENDATION_BATCH_MAX_SIZE = int(os.getenv("RECOMMENDATION_BATCH_MAX_SIZE", "16"))
+
+    # Bulk AI classification jobs (ai/backfill.py)
+    AI_BACKFILL_ENABLED = os.getenv("AI_BACKFILL_ENABLED", "true").lower() == "true"
+    AI_BACKFILL_CONCURRENCY = int(os.getenv("AI_BACKFILL_CONCURRENCY", "8"))
+    AI_BACKFILL_RATE_PER_SECOND = float(os.getenv("AI_BACKFILL_RATE_PER_SECOND", "10"))
+    AI_BACKFILL_BATCH_SIZE = int(os.getenv("AI_BACKFILL_BATCH_SIZE", "50"))
+    AI_BACKFILL_MAX_RETRIES = int(os.getenv("AI_BACKFILL_MAX_RETRIES", "3"))
+
 
 if not Config.OPENAI_API_KEY:
     print("Warning: OPENAI_API_KEY is missing!")
@@ -0,0 +1,236 @@
+from collections import defaultdict
+from typing import Any, List, Optional, Sequence, Union
+from uuid import UUID
+
+from pydantic import ValidationError
+from sqlalchemy import bindparam, delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import Config
+from database.archive import ARCHIVED_COLUMNS
+from models.task import Task, new_task_id
+from models.task_archive import TaskArchive
+from models.users import User
+from schemas.task import TaskCreate, TaskUpdate, TaskBulkUpdate
+
+
+def create_values(task: TaskCreate) -> dict:
+    return dict(
+        title=task.title,
+        description=task.description,
+        assignee=task.assignee,
+        status=task.status.value,
+        severity=task.severity.value,
+        priority=task.priority.value,
+        due_date=task.due_date,
+    )
+
+
+def update_values(task: TaskUpdate) -> dict:
+    """
+        The columns a TaskUpdate changes. Empty fields are left alone and an
+        assignee of -1 unassigns the task.
+    """
+    values = {}
+    if task.title:
+        values["title"] = task.title
+    if task.description:
+        values["description"] = task.description
+    if task.assignee:
+        values["assignee"] = None if task.assignee == -1 else task.assignee
+    if task.status:
+        values["status"] = task.status.value
+    if task.severity:
+        values["severity"] = task.severity.value
+    if task.priority:
+        values["priority"] = task.priority.value
+    if task.due_date:
+        values["due_date"] = task.due_date
+    return values
+
+
+async def update_task_row(db: AsyncSession, task_id: str, values: dict,
+                          version: Optional[int] = None) -> Optional[Union[Task, TaskArchive]]:
+    """
+        Apply `values` to a task and bump its version in one UPDATE ... RETURNING statement.
+        An archived task is moved back to the tasks table first, in the same
+        transaction, once its version matched and only if `values` changes it.
+
+        Args:
+            version: Only update the task if it is still at this version.
+
+        Returns:
+            Optional[Union[Task, TaskArchive]]: The updated task (the archived one,
+            untouched, if there was nothing to change), or None if there is no task
+            with this id (at this version).
+    """
+    if not values:
+        # Nothing to change, so the version stays as it is
+        statement = select(Task).where(Task.id == task_id)
+    else:
+        statement = (
+            update(Task)
+            .where(Task.id == task_id)
+            .values(**values, version=Task.version + 1)
+            .returning(Task)
+            .execution_options(synchronize_session=False)
+        )
+    if version is not None:
+        statement = statement.where(Task.version == version)
+
+    task = await db.scalar(statement)
+    if task is not None:
+        return task
+
+    # Only a miss pays for the archive lookup. Archived rows are never updated, so
+    # the version checked here is still the one the restored row has below.
+    archived = await db.get(TaskArchive, task_id)
+    if archived is None or version is not None and archived.version != version:
+        return None
+    if not values:
+        return archived
+    if await restore_archived_tasks(db, {task_id}):
+        return await db.scalar(statement)
+    return None
+
+
+async def restore_archived_tasks(db: AsyncSession, ids: set) -> set:
+    """
+        Move the archived tasks among `ids` back to the tasks table. Does not commit.
+
+        Returns:
+            set: The ids that were archived, and are live again.
+    """
+    restored = set()
+    for chunk in _chunks(list(ids), Config.BULK_CHUNK_SIZE):
+        archived = TaskArchive.id.in_(chunk)
+        moved = set(await db.scalars(
+            insert(Task)
+            .from_select(ARCHIVED_COLUMNS, select(*(getattr(TaskArchive, column) for column in ARCHIVED_COLUMNS))
+                         .where(archived))
+            .returning(Task.id)
+        ))
+        if moved:
+            await db.execute(delete(TaskArchive).where(archived))
+            restored |= moved
+    return restored
+
+
+def _validation_errors(e: ValidationError) -> List[dict]:
+    return [{"loc": list(error["loc"]), "msg": error["msg"], "type": error["type"]} for error in e.errors()]
+
+
+def _chunks(rows: Sequence, size: int):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+async def _existing_ids(db: AsyncSession, column, ids: set) -> set:
+    found = set()
+    for chunk in _chunks(list(ids), Config.BULK_CHUNK_SIZE):
+        found.update(await db.scalars(select(column).where(column.in_(chunk))))
+    return found
+
+
+async def _drop_unknown_assignees(db: AsyncSession, rows: List[tuple], results: List[dict]) -> List[tuple]:
+    # One lookup for the whole batch instead of letting the foreign key fail mid-transaction
+    assignees = {values["assignee"] for _, values in rows if values.get("assignee") is not None}
+    known = await _existing_ids(db, User.id, assignees)
+
+    kept = []
+    for index, values in rows:
+        if values.get("assignee") is not None and values["assignee"] not in known:
+            results[index]["error"] = "Unknown assignee"
+        else:
+            kept.append((index, values))
+    return kept
+
+
+async def bulk_create_tasks(db: AsyncSession, items: List[Any]) -> List[dict]:
+    """
+        Validate every item as a TaskCreate and insert the valid ones in chunked
+        executemany statements within a single transaction.
+
+        Returns:
+            List[dict]: One result per item, in order, with either its new `id` or an `error`.
+    """
+    results = [{"index": index} for index in range(len(items))]
+
+    rows = []
+    for index, item in enumerate(items):
+        try:
+            task = TaskCreate.model_validate(item)
+        except ValidationError as e:
+            results[index]["error"] = _validation_errors(e)
+            continue
+        rows.append((index, {"id": new_task_id(), **create_values(task)}))
+
+    rows = await _drop_unknown_assignees(db, rows, results)
+
+    for chunk in _chunks(rows, Config.BULK_CHUNK_SIZE):
+        await db.execute(insert(Task), [values for _, values in chunk])
+    await db.commit()
+
+    for index, values in rows:
+        results[index]["id"] = values["id"]
+    return results
+
+
+async def bulk_update_tasks(db: AsyncSession, items: List[Any]) -> List[dict]:
+    """
+        Validate every item as a TaskBulkUpdate (a TaskUpdate plus its `id`) and apply
+        the valid ones as chunked UPDATE ... WHERE id = ? statements within a single
+        transaction. Every updated task's version is bumped, and archived tasks are
+        moved back to the tasks table if the update changes them.
+
+        Returns:
+            List[dict]: One result per item, in order, with its `id` and an `error` if it was not applied.
+    """
+    results = [{"index": index} for index in range(len(items))]
+
+    rows = []
+    for index, item in enumerate(items):
+        try:
+            task = TaskBulkUpdate.model_validate(item)
+            task_id = str(UUID(task.id))
+        except ValidationError as e:
+            results[index]["error"] = _validation_errors(e)
+            continue
+        except ValueError:
+            results[index]["error"] = "Invalid task id"
+            continue
+        results[index]["id"] = task_id
+        rows.append((index, {"id": task_id, **update_values(task)}))
+
+    ids = {values["id"] for _, values in rows}
+    existing = await _existing_ids(db, Task.id, ids)
+    # Archived tasks only move back if the update changes them
+    changed = {values["id"] for _, values in rows if len(values) > 1}
+    existing |= await restore_archived_tasks(db, (ids - existing) & changed)
+    existing |= await _existing_ids(db, TaskArchive.id, ids - existing - changed)
+    found = []
+    for index, values in rows:
+        if values["id"] in existing:
+            found.append((index, values))
+        else:
+            results[index]["error"] = "Task not found"
+    rows = await _drop_unknown_assignees(db, found, results)
+
+    # The SET clause of an executemany comes from the parameter keys, so rows are
+    # grouped by the columns they change; every row also gets its version bumped
+    changes = defaultdict(list)
+    for _, values in rows:
+        task_id = values.pop("id")
+        if values:
+            changes[tuple(sorted(values))].append({"task_id": task_id, **values})
+    statement = (
+        update(Task.__table__)
+        .where(Task.__table__.c.id == bindparam("task_id"))
+        .values(version=Task.__table__.c.version + 1)
+    )
+    for params in changes.values():
+        for chunk in _chunks(params, Config.BULK_CHUNK_SIZE):
+            await db.execute(statement, chunk)
+    await db.commit()
+
+    return results
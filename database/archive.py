@@ -0,0 +1,184 @@
+"""
+Hot/cold tiering of tasks.
+
+GET /tasks and the open count never return done tasks, but done tasks stayed in
+the tasks table (and in all of its indexes) forever. The compactor moves tasks that
+have been done, and untouched, for ARCHIVE_AFTER_DAYS to tasks_archive, in batches
+of ARCHIVE_BATCH_SIZE committed one at a time so it never holds the write lock for
+long. Reads that ask for done tasks union the archive (api/routes/task.py), and
+changing an archived task moves it back first (crud.task.restore_archived_tasks).
+"""
+import asyncio
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import DateTime, delete, func, insert, literal, select, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from config import Config
+from database.session import get_async_session
+from database.write_queue import run_write
+from models.task import Task
+from models.task_archive import TaskArchive
+
+ARCHIVED_COLUMNS = ("id", "title", "description", "assignee", "status", "severity", "priority", "due_date",
+                    "created_date", "updated_date", "version")
+
+TIERS = {"live": "tasks", "archive": "tasks_archive"}
+
+
+async def archive_batch(db: AsyncSession, cutoff: datetime, batch_size: int) -> int:
+    """
+        Move up to `batch_size` tasks done since before `cutoff` to tasks_archive.
+        Does not commit.
+
+        Returns:
+            int: The number of tasks moved.
+    """
+    ids = list(await db.scalars(
+        select(Task.id).where(Task.status == 2, Task.updated_date < cutoff).limit(batch_size)
+    ))
+    if not ids:
+        return 0
+
+    # The conditions are repeated because a task may have been reopened since the
+    # select; the insert and the delete run in the same write transaction
+    due = (Task.id.in_(ids), Task.status == 2, Task.updated_date < cutoff)
+    await db.execute(
+        insert(TaskArchive).from_select(
+            [*ARCHIVED_COLUMNS, "archived_date"],
+            select(*(getattr(Task, column) for column in ARCHIVED_COLUMNS), literal(datetime.now(), DateTime()))
+            .where(*due),
+        )
+    )
+    result = await db.execute(delete(Task).where(*due).execution_options(synchronize_session=False))
+    return result.rowcount
+
+
+class ArchiveCompactor:
+    """
+        Background task that archives due tasks every `interval` seconds.
+
+        Args:
+            session_factory: Sessions for the batches.
+            after: How long a task has to be done (and unmodified) to be archived.
+            interval: Seconds between runs.
+            batch_size: Tasks moved per transaction.
+            pause: Seconds between the batches of a run, for other writers to get the lock.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker, after: timedelta, interval: float, batch_size: int,
+                 pause: float = 0.05):
+        self.session_factory = session_factory
+        self.after = after
+        self.interval = interval
+        self.batch_size = batch_size
+        self.pause = pause
+        self._worker: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.archived = 0
+        self.failed_batches = 0
+        self.last_run: Optional[datetime] = None
+
+    def start(self):
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+        self._worker = None
+
+    async def run_once(self) -> int:
+        """
+            Archive every task that is due now, one batch at a time.
+
+            Returns:
+                int: The number of tasks archived.
+        """
+        cutoff = datetime.now() - self.after
+        archived = 0
+        while True:
+            async with self.session_factory() as db:
+                try:
+                    moved = await run_write(db, lambda session: archive_batch(session, cutoff, self.batch_size))
+                except OperationalError as e:
+                    # Most likely the database was busy for longer than the busy timeout; retried next run
+                    await db.rollback()
+                    self.failed_batches += 1
+                    print(f"Archiving tasks failed: {e}")
+                    break
+            archived += moved
+            self.archived += moved
+            if moved < self.batch_size:
+                break
+            await asyncio.sleep(self.pause)
+
+        self.runs += 1
+        self.last_run = datetime.now()
+        return archived
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                print(f"Archive compactor run failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": True,
+            "archive_after_days": self.after.days,
+            "runs": self.runs,
+            "archived": self.archived,
+            "failed_batches": self.failed_batches,
+            "last_run": self.last_run,
+        }
+
+
+_compactor: Optional[ArchiveCompactor] = None
+
+
+def start_archive_compactor():
+    global _compactor
+    if _compactor is None and Config.ARCHIVE_AFTER_DAYS > 0:
+        _compactor = ArchiveCompactor(
+            get_async_session(),
+            after=timedelta(days=Config.ARCHIVE_AFTER_DAYS),
+            interval=Config.ARCHIVE_INTERVAL_SECONDS,
+            batch_size=Config.ARCHIVE_BATCH_SIZE,
+        )
+        _compactor.start()
+
+
+async def stop_archive_compactor():
+    global _compactor
+    if _compactor is not None:
+        await _compactor.stop()
+    _compactor = None
+
+
+def archive_stats() -> dict:
+    return _compactor.stats() if _compactor is not None else {"enabled": False}
+
+
+async def tier_sizes(db: AsyncSession) -> dict:
+    """
+        Rows and on-disk bytes (the table plus its indexes) of each tier. Counts
+        every row and reads every page, so it is for occasional admin use only.
+    """
+    sizes = {}
+    for tier, table in TIERS.items():
+        rows = await db.scalar(select(func.count()).select_from(text(table)))
+        try:
+            size = await db.scalar(text(
+                "SELECT SUM(pgsize) FROM dbstat WHERE aggregate = TRUE AND name IN "
+                "(SELECT name FROM sqlite_master WHERE tbl_name = :table AND type IN ('table', 'index'))"
+            ), {"table": table})
+        except OperationalError:
+            size = None  # SQLite built without the dbstat virtual table
+        sizes[tier] = {"table": table, "rows": rows, "bytes": size}
+    return sizes
@@ -1,4 +1,4 @@
-from database.session import get_session
+from database.session import get_session, get_async_session
 
 
 def get_db():
@@ -7,3 +7,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with get_async_session()() as db:
+        yield db
@@ -0,0 +1,112 @@
+"""
+Versioned schema migrations.
+
+Migrations are the numbered SQL scripts in sql/migrations (``0001_name.sql``), or
+Python modules (``0001_name.py``) defining ``upgrade(connection)`` for changes SQL
+alone cannot make; they get the sqlite3 connection, already inside the transaction.
+The version of the last applied one is stored in SQLite's ``PRAGMA user_version``,
+so every migration runs exactly once per database, in order, in its own transaction.
+
+    python -m database.migrate            # Apply pending migrations
+    python -m database.migrate status     # Show applied and pending migrations
+"""
+import importlib.util
+import re
+import sys
+from pathlib import Path
+from typing import List, NamedTuple, Optional
+
+from sqlalchemy.engine import Engine
+
+from database.session import create_db_engine
+
+MIGRATIONS_DIR = Path(__file__).parent.parent / "sql" / "migrations"
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    path: Path
+
+
+def get_migrations() -> List[Migration]:
+    migrations = []
+    for path in sorted(MIGRATIONS_DIR.iterdir()):
+        match = re.fullmatch(r"(\d+)_(\w+)\.(sql|py)", path.name)
+        if match:
+            migrations.append(Migration(int(match.group(1)), match.group(2), path))
+
+    versions = [migration.version for migration in migrations]
+    if versions != list(range(1, len(versions) + 1)):
+        raise RuntimeError(f"Migration versions in {MIGRATIONS_DIR} must be consecutive from 1, got {versions}")
+    return migrations
+
+
+def _run_python_migration(connection, migration: Migration):
+    spec = importlib.util.spec_from_file_location(f"migration_{migration.version:04d}", migration.path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    # Explicit BEGIN/COMMIT, like the SQL scripts, instead of sqlite3's implicit transactions
+    isolation_level = connection.isolation_level
+    connection.isolation_level = None
+    try:
+        connection.execute("BEGIN")
+        module.upgrade(connection)
+        connection.execute(f"PRAGMA user_version = {migration.version}")
+        connection.execute("COMMIT")
+    finally:
+        connection.isolation_level = isolation_level
+
+
+def get_version(engine: Engine) -> int:
+    with engine.connect() as connection:
+        return connection.exec_driver_sql("PRAGMA user_version").scalar()
+
+
+def upgrade(engine: Optional[Engine] = None, target: Optional[int] = None) -> List[Migration]:
+    """
+        Apply every migration newer than the database's version, up to `target` if given.
+
+        Returns:
+            List[Migration]: The migrations that were applied.
+    """
+    engine = engine or create_db_engine()
+    current = get_version(engine)
+    pending = [m for m in get_migrations() if m.version > current and (target is None or m.version <= target)]
+
+    for migration in pending:
+        connection = engine.raw_connection()
+        try:
+            if migration.path.suffix == ".py":
+                _run_python_migration(connection.driver_connection, migration)
+            else:
+                script = f"BEGIN;\n{migration.path.read_text()}\nPRAGMA user_version = {migration.version};\nCOMMIT;"
+                connection.driver_connection.executescript(script)
+        except Exception:
+            connection.driver_connection.rollback()
+            raise
+        finally:
+            connection.close()
+        print(f"Applied migration {migration.version:04d}_{migration.name}")
+
+    return pending
+
+
+def status(engine: Optional[Engine] = None):
+    engine = engine or create_db_engine()
+    current = get_version(engine)
+    for migration in get_migrations():
+        state = "applied" if migration.version <= current else "pending"
+        print(f"{migration.version:04d}_{migration.name}: {state}")
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "upgrade"
+    if command == "upgrade":
+        applied = upgrade()
+        print(f"Database is up to date ({len(applied)} migration(s) applied)")
+    elif command == "status":
+        status()
+    else:
+        sys.exit(f"Unknown command: {command}")
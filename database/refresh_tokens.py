@@ -0,0 +1,210 @@
+"""
+Refresh tokens.
+
+Access tokens live ACCESS_TOKEN_EXPIRE_MINUTES, and getting a new one used to
+mean sending the password to /login again, one bcrypt verification (hundreds of
+ms of CPU) per client every half hour. /login now also returns a refresh token,
+valid REFRESH_TOKEN_TTL_DAYS, which /token/refresh exchanges for a new access
+token with one indexed lookup.
+
+Tokens are 256 random bits; only their SHA-256 is stored (refresh_tokens), which
+is enough for values that cannot be guessed and keeps the lookup cheap. Every
+exchange rotates the token: the one presented is revoked and a new one of the
+same family (the tokens descended from one login) is returned. A revoked token
+presented again means two parties hold the family, so all of it is revoked and
+the next refresh has to log in. POST /token/revoke revokes a family on logout.
+Access tokens already issued stay valid until they expire.
+
+The RefreshTokenPruner deletes expired tokens in the background, revoked ones
+included: they are only kept until then to detect reuse.
+"""
+import asyncio
+import hashlib
+import secrets
+from datetime import datetime, timedelta
+from typing import NamedTuple, Optional
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from config import Config
+from database.session import get_async_session
+from database.write_queue import run_write
+from models.refresh_token import RefreshToken
+from models.users import User
+
+
+class Rotation(NamedTuple):
+    user_id: int
+    username: str
+    refresh_token: str
+
+
+def _digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+
+def issue_refresh_token(db: AsyncSession, user_id: int, family: Optional[bytes] = None) -> str:
+    """
+        Add a new refresh token for `user_id` to the session, in `family` or in a
+        new one (a login). Does not commit.
+    """
+    token = secrets.token_urlsafe(32)
+    now = datetime.now()
+    db.add(RefreshToken(
+        token_hash=_digest(token),
+        family=family or secrets.token_bytes(16),
+        user_id=user_id,
+        created_date=now,
+        expires_date=now + timedelta(days=Config.REFRESH_TOKEN_TTL_DAYS),
+    ))
+    return token
+
+
+async def _revoke_family(db: AsyncSession, family: bytes, now: datetime):
+    await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family == family, RefreshToken.revoked_date.is_(None))
+        .values(revoked_date=now)
+    )
+
+
+async def rotate_refresh_token(db: AsyncSession, token: str) -> Optional[Rotation]:
+    """
+        Revoke `token` and issue the next token of its family. Commits.
+
+        Returns:
+            Optional[Rotation]: The user and the new token, or None if `token` is
+            unknown, expired or revoked. A revoked one also revokes its family.
+    """
+    now = datetime.now()
+    # The update takes the write lock first, so of two concurrent exchanges of the same token only one wins
+    used = (await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.token_hash == _digest(token), RefreshToken.revoked_date.is_(None),
+               RefreshToken.expires_date > now)
+        .values(revoked_date=now)
+        .returning(RefreshToken.user_id, RefreshToken.family)
+    )).first()
+
+    if used is None:
+        family = await db.scalar(
+            select(RefreshToken.family)
+            .where(RefreshToken.token_hash == _digest(token), RefreshToken.revoked_date.is_not(None))
+        )
+        if family is not None:
+            await _revoke_family(db, family, now)
+        await db.commit()
+        return None
+
+    username = await db.scalar(select(User.username).where(User.id == used.user_id))
+    if username is None:
+        await db.commit()
+        return None
+    new_token = issue_refresh_token(db, used.user_id, used.family)
+    await db.commit()
+    return Rotation(used.user_id, username, new_token)
+
+
+async def revoke_refresh_token(db: AsyncSession, token: str):
+    """
+        Revoke the family of `token`, if it is one. Commits.
+    """
+    family = await db.scalar(select(RefreshToken.family).where(RefreshToken.token_hash == _digest(token)))
+    if family is not None:
+        await _revoke_family(db, family, datetime.now())
+        await db.commit()
+
+
+async def prune_batch(db: AsyncSession, now: datetime, batch_size: int) -> int:
+    """
+        Delete up to `batch_size` tokens expired before `now`. Does not commit.
+
+        Returns:
+            int: The number of tokens deleted.
+    """
+    expired = select(RefreshToken.id).where(RefreshToken.expires_date < now).limit(batch_size)
+    result = await db.execute(
+        delete(RefreshToken).where(RefreshToken.id.in_(expired)).execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+class RefreshTokenPruner:
+    """
+        Background task that deletes expired refresh tokens every `interval` seconds.
+
+        Args:
+            session_factory: Sessions for the batches.
+            interval: Seconds between runs.
+            batch_size: Tokens deleted per transaction.
+            pause: Seconds between the batches of a run, for other writers to get the lock.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker, interval: float, batch_size: int, pause: float = 0.05):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.batch_size = batch_size
+        self.pause = pause
+        self._worker: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.pruned = 0
+
+    def start(self):
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+        self._worker = None
+
+    async def run_once(self) -> int:
+        """
+            Delete every token expired by now, one batch at a time.
+
+            Returns:
+                int: The number of tokens deleted.
+        """
+        now = datetime.now()
+        pruned = 0
+        while True:
+            async with self.session_factory() as db:
+                deleted = await run_write(db, lambda session: prune_batch(session, now, self.batch_size))
+            pruned += deleted
+            self.pruned += deleted
+            if deleted < self.batch_size:
+                break
+            await asyncio.sleep(self.pause)
+        self.runs += 1
+        return pruned
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                print(f"Refresh token pruning failed: {e}")
+            await asyncio.sleep(self.interval)
+
+
+_pruner: Optional[RefreshTokenPruner] = None
+
+
+def start_refresh_token_pruner():
+    global _pruner
+    if _pruner is None and Config.REFRESH_TOKEN_TTL_DAYS > 0:
+        _pruner = RefreshTokenPruner(
+            get_async_session(),
+            interval=Config.REFRESH_TOKEN_PRUNE_INTERVAL_SECONDS,
+            batch_size=Config.REFRESH_TOKEN_PRUNE_BATCH_SIZE,
+        )
+        _pruner.start()
+
+
+async def stop_refresh_token_pruner():
+    global _pruner
+    if _pruner is not None:
+        await _pruner.stop()
+    _pruner = None
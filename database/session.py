@@ -1,21 +1,166 @@
-from sqlalchemy import create_engine, text
+from typing import Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
+import metrics
+from config import Config
+
+_engine: Optional[Engine] = None
+_session_factory: Optional[sessionmaker] = None
+_async_engine: Optional[AsyncEngine] = None
+_async_session_factory: Optional[async_sessionmaker] = None
+
+
+def _set_sqlite_pragmas(dbapi_connection, _connection_record):
+    """
+        Apply the per-connection SQLite PRAGMAs. Runs once for every new DBAPI
+        connection the pool opens, not on every checkout.
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA foreign_keys = ON")
+        cursor.execute(f"PRAGMA journal_mode = {Config.SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous = {Config.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA cache_size = {Config.SQLITE_CACHE_SIZE}")
+        cursor.execute(f"PRAGMA mmap_size = {Config.SQLITE_MMAP_SIZE}")
+        cursor.execute(f"PRAGMA busy_timeout = {Config.SQLITE_BUSY_TIMEOUT_MS}")
+    finally:
+        cursor.close()
+
+
+def _engine_options(url: str) -> dict:
+    if ":memory:" in url:
+        return {}
+    return dict(
+        pool_size=Config.DB_POOL_SIZE,
+        max_overflow=Config.DB_MAX_OVERFLOW,
+        pool_timeout=Config.DB_POOL_TIMEOUT,
+        pool_recycle=Config.DB_POOL_RECYCLE,
+    )
+
+
+def create_db_engine(url: Optional[str] = None) -> Engine:
+    """
+        Create a pooled engine for the configured database.
+
+        Args:
+            url: Database URL to connect to. Defaults to Config.DATABASE_URL.
+
+        Returns:
+            Engine: An engine with a sized connection pool and SQLite PRAGMAs applied on connect.
+    """
+    url = url or Config.DATABASE_URL
+    engine = create_engine(url, **_engine_options(url))
+    if engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", _set_sqlite_pragmas)
+    if Config.METRICS_ENABLED:
+        metrics.instrument_engine(engine)
+    return engine
+
+
+def create_async_db_engine(url: Optional[str] = None) -> AsyncEngine:
+    """
+        Create a pooled AsyncEngine for the configured database. A plain
+        ``sqlite://`` URL is switched to the aiosqlite driver.
+
+        Args:
+            url: Database URL to connect to. Defaults to Config.DATABASE_URL.
+
+        Returns:
+            AsyncEngine: An engine with a sized connection pool and SQLite PRAGMAs applied on connect.
+    """
+    url = make_url(url or Config.DATABASE_URL)
+    if url.drivername == "sqlite":
+        url = url.set(drivername="sqlite+aiosqlite")
+
+    engine = create_async_engine(url, **_engine_options(str(url)))
+    if engine.dialect.name == "sqlite":
+        event.listen(engine.sync_engine, "connect", _set_sqlite_pragmas)
+    if Config.METRICS_ENABLED:
+        metrics.instrument_engine(engine.sync_engine)
+    return engine
+
+
+def init_engine(url: Optional[str] = None) -> Engine:
+    """
+        Create the process-wide engine and session factory. Called once from the
+        application lifespan; calling it again replaces the existing engine.
+    """
+    global _engine, _session_factory
+    dispose_engine()
+    _engine = create_db_engine(url)
+    _session_factory = sessionmaker(autocommit=False, autoflush=False, bind=_engine)
+    return _engine
+
+
+def dispose_engine():
+    """
+        Close every pooled connection and drop the process-wide engine.
+    """
+    global _engine, _session_factory
+    if _engine is not None:
+        _engine.dispose()
+    _engine = None
+    _session_factory = None
+
+
+def get_engine() -> Engine:
+    if _engine is None:
+        init_engine()
+    return _engine
+
 
 def get_session() -> sessionmaker:
     """
-        Create and return a sessionmaker object for a local database session.
+        Return the sessionmaker bound to the process-wide engine.
+
+        The engine is created lazily if the application lifespan has not run yet
+        (e.g. scripts importing the app outside of uvicorn).
 
         Returns:
             sessionmaker: A sessionmaker object configured for the local database session.
     """
-    #TODO: Move the hardcoded URL
-    engine = create_engine('sqlite:///database.db')
+    if _session_factory is None:
+        init_engine()
+    return _session_factory
+
+
+def init_async_engine(url: Optional[str] = None) -> AsyncEngine:
+    """
+        Create the process-wide AsyncEngine and async session factory used by the routes.
+    """
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        # Only the pool's sync side can be released without awaiting
+        _async_engine.sync_engine.dispose()
+    _async_engine = create_async_db_engine(url)
+    # Objects stay usable after commit, so routes can return them without a refresh round trip
+    _async_session_factory = async_sessionmaker(_async_engine, autoflush=False, expire_on_commit=False)
+    return _async_engine
+
 
-    # Connect to the database and execute PRAGMA to enable foreign key constraints
-    with engine.connect() as connection:
-        # Enable foreign key constraints
-        connection.execute(text('PRAGMA foreign_keys = ON;'))
+async def dispose_async_engine():
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    _async_engine = None
+    _async_session_factory = None
 
-    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    return session
\ No newline at end of file
+
+def get_async_engine() -> AsyncEngine:
+    if _async_engine is None:
+        init_async_engine()
+    return _async_engine
+
+
+def get_async_session() -> async_sessionmaker:
+    """
+        Return the async_sessionmaker bound to the process-wide AsyncEngine,
+        creating it lazily like get_session.
+    """
+    if _async_session_factory is None:
+        init_async_engine()
+    return _async_session_factory
@@ -0,0 +1,49 @@
+"""
+Check or rebuild the tasks_fts full-text index from the tasks table.
+
+    python -m database.task_search check      # FTS5 integrity check against tasks, exit 1 if it fails
+    python -m database.task_search rebuild    # Re-index every task
+"""
+import sys
+from typing import Optional
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DatabaseError
+
+from database.session import create_db_engine
+
+
+def check(engine: Optional[Engine] = None) -> Optional[str]:
+    """
+        Run the FTS5 integrity check, including the comparison with the tasks table.
+
+        Returns:
+            Optional[str]: The error if the index is out of sync or corrupt, None if it is fine.
+    """
+    engine = engine or create_db_engine()
+    try:
+        with engine.connect() as connection:
+            connection.exec_driver_sql("INSERT INTO tasks_fts (tasks_fts, rank) VALUES ('integrity-check', 1)")
+    except DatabaseError as e:
+        return str(e.orig)
+    return None
+
+
+def rebuild(engine: Optional[Engine] = None):
+    engine = engine or create_db_engine()
+    with engine.begin() as connection:
+        connection.exec_driver_sql("INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')")
+        connection.exec_driver_sql("INSERT INTO tasks_fts (tasks_fts) VALUES ('optimize')")
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "check"
+    if command == "check":
+        error = check()
+        print(error or "tasks_fts is in sync with tasks")
+        sys.exit(1 if error else 0)
+    elif command == "rebuild":
+        rebuild()
+        print("Rebuilt tasks_fts")
+    else:
+        sys.exit(f"Unknown command: {command}")
@@ -0,0 +1,94 @@
+"""
+Check or rebuild the task_stats summary table, and its task_status_totals and
+task_assignee_stats rollups, from the tasks and tasks_archive tables.
+
+    python -m database.task_stats verify     # Report drift, exit 1 if there is any
+    python -m database.task_stats rebuild    # Recompute the summaries from scratch
+"""
+import sys
+from typing import List, Optional
+
+from sqlalchemy.engine import Engine
+
+from database.session import create_db_engine
+
+# Archived tasks (sql/migrations/0010_tasks_archive.sql) are counted too
+TASKS = """
+    SELECT status, assignee, due_date FROM tasks
+    UNION ALL
+    SELECT status, assignee, due_date FROM tasks_archive
+"""
+
+# Summary table -> its key columns
+SUMMARIES = {
+    "task_stats": ("status", "assignee", "due_date"),
+    "task_status_totals": ("status",),
+    "task_assignee_stats": ("status", "assignee"),
+}
+
+
+def _expected(columns: tuple) -> str:
+    keys = ", ".join(columns)
+    return f"SELECT {keys}, COUNT(*) AS count FROM ({TASKS}) GROUP BY {keys}"
+
+
+def verify(engine: Optional[Engine] = None) -> List[tuple]:
+    """
+        Compare every summary with a fresh count of the tasks (live and archived).
+
+        Returns:
+            List[tuple]: (table, key, expected, actual) for every key that drifted.
+    """
+    engine = engine or create_db_engine()
+    drift = []
+    with engine.connect() as connection:
+        for table, columns in SUMMARIES.items():
+            keys = len(columns)
+            expected = {row[:keys]: row[keys] for row in connection.exec_driver_sql(_expected(columns))}
+            actual = {
+                row[:keys]: row[keys]
+                for row in connection.exec_driver_sql(
+                    f"SELECT {', '.join(columns)}, count FROM {table} WHERE count != 0"
+                )
+            }
+            drift += [
+                (table, dict(zip(columns, key)), expected.get(key, 0), actual.get(key, 0))
+                for key in sorted(expected.keys() | actual.keys(), key=repr)
+                if expected.get(key, 0) != actual.get(key, 0)
+            ]
+    return drift
+
+
+def rebuild(engine: Optional[Engine] = None) -> int:
+    """
+        Recompute task_stats and its rollups in one transaction.
+
+        Returns:
+            int: The number of task_stats rows written.
+    """
+    engine = engine or create_db_engine()
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DELETE FROM task_stats")
+        # Emptied after task_stats, whose delete triggers subtract from them, so
+        # they are rebuilt from nothing by the insert triggers below even if they drifted
+        connection.exec_driver_sql("DELETE FROM task_status_totals")
+        connection.exec_driver_sql("DELETE FROM task_assignee_stats")
+        result = connection.exec_driver_sql(
+            f"INSERT INTO task_stats (status, assignee, due_date, count) {_expected(SUMMARIES['task_stats'])}"
+        )
+        return result.rowcount
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "verify"
+    if command == "verify":
+        drift = verify()
+        for table, key, expected, actual in drift:
+            print(f"{table} {' '.join(f'{column}={value}' for column, value in key.items())}: "
+                  f"expected {expected}, found {actual}")
+        print(f"{len(drift)} drifted key(s)")
+        sys.exit(1 if drift else 0)
+    elif command == "rebuild":
+        print(f"Rebuilt task_stats with {rebuild()} row(s), and its rollups")
+    else:
+        sys.exit(f"Unknown command: {command}")
@@ -0,0 +1,28 @@
+import uuid
+
+from sqlalchemy import LargeBinary
+from sqlalchemy.types import TypeDecorator
+
+
+class UUIDBytes(TypeDecorator):
+    """
+        A UUID stored as its 16 bytes (a BLOB in SQLite) and handled in Python,
+        and by the API, as its canonical 36-character string.
+
+        Strings bound to it are parsed, so a malformed one raises ValueError; check
+        ids coming from clients before they reach a query.
+    """
+    impl = LargeBinary(16)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None or isinstance(value, bytes):
+            return value
+        if isinstance(value, uuid.UUID):
+            return value.bytes
+        return uuid.UUID(value).bytes
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return str(uuid.UUID(bytes=bytes(value)))
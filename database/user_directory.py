@@ -0,0 +1,127 @@
+"""
+Process-local directory of usernames.
+
+Users only change on /signup, yet GET /users read the whole table on every call
+and the task lists joined users only to turn assignee ids into names. The
+directory keeps id -> username and username -> id maps (and the usernames in
+order, for prefix lookups) in memory, loaded in the lifespan.
+
+It is versioned with the users change counter of table_versions (bumped by
+triggers on every write to users): sync() compares that one row with the loaded
+version, and reloads every user when it moved. Signups in this process are added
+directly, together with the version they were written at, so they cost no
+reload; those of other processes are picked up by the next sync().
+"""
+import asyncio
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.session import get_async_session
+from models.table_version import TableVersion
+from models.users import User
+
+
+class UserDirectory:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """
+            Forget every user; the next sync() loads them all.
+        """
+        self._names: Dict[int, str] = {}
+        self._ids: Dict[str, int] = {}
+        self._sorted: List[str] = []
+        self._lock = asyncio.Lock()
+        self.loaded = False
+        self.version: Optional[int] = None
+        self.loads = 0
+
+    async def sync(self, db: AsyncSession, version: Optional[int] = None):
+        """
+            Bring the directory up to date with the users table, if its version
+            moved. One primary key lookup when nothing changed, none if the caller
+            already read the users `version` in this transaction (see api/etag.py).
+        """
+        if version is None:
+            version = await users_version(db)
+        if self.loaded and version == self.version:
+            return
+        async with self._lock:
+            if self.loaded and version == self.version:
+                return  # Loaded by a concurrent request while this one waited
+            await self._load(db, version)
+
+    async def _load(self, db: AsyncSession, version: Optional[int]):
+        users = (await db.execute(select(User.id, User.username))).all()
+        self._names = {user_id: username for user_id, username in users}
+        self._ids = {username: user_id for user_id, username in users}
+        self._sorted = sorted(self._ids)
+        self.loaded = True
+        self.version = version
+        self.loads += 1
+
+    def add(self, user_id: int, username: str, version: Optional[int] = None):
+        """
+            Record a user created by this process, without waiting for a sync().
+
+            Args:
+                version: The users version read in the transaction that inserted
+                    the user. If it directly follows the loaded one, nothing else
+                    changed in between and no reload is needed.
+        """
+        self._names[user_id] = username
+        self._ids[username] = user_id
+        insort(self._sorted, username)
+        if version is not None and self.loaded and self.version == version - 1:
+            self.version = version
+
+    def name(self, user_id: Optional[int]) -> Optional[str]:
+        return self._names.get(user_id) if user_id is not None else None
+
+    def user_id(self, username: str) -> Optional[int]:
+        return self._ids.get(username)
+
+    async def names(self, db: AsyncSession, user_ids: Iterable[Optional[int]],
+                    version: Optional[int] = None) -> Dict[int, str]:
+        """
+            The usernames of `user_ids`, syncing first. Call it in the transaction
+            that read the ids: the version is then read from the same snapshot, so
+            every user those rows can refer to is loaded.
+        """
+        await self.sync(db, version)
+        return {user_id: self._names[user_id] for user_id in set(user_ids) if user_id in self._names}
+
+    def search(self, prefix: str = "", offset: int = 0, limit: Optional[int] = None) -> Tuple[int, List[dict]]:
+        """
+            Users whose username starts with `prefix`, in username order.
+
+            Returns:
+                Tuple[int, List[dict]]: How many users match, and the page of them
+                (id and username) from `offset`, at most `limit` long.
+        """
+        start = bisect_left(self._sorted, prefix)
+        # Every username with the prefix sorts before the prefix followed by the highest code point
+        end = bisect_left(self._sorted, prefix + "\U0010ffff") if prefix else len(self._sorted)
+        stop = end if limit is None else min(end, start + offset + limit)
+        page = [{"id": self._ids[username], "username": username} for username in self._sorted[start + offset:stop]]
+        return end - start, page
+
+    def stats(self) -> dict:
+        return {"users": len(self._names), "version": self.version, "loads": self.loads}
+
+
+async def users_version(db: AsyncSession) -> Optional[int]:
+    return await db.scalar(select(TableVersion.version).where(TableVersion.name == "users"))
+
+
+user_directory = UserDirectory()
+
+
+async def load_user_directory():
+    user_directory.reset()
+    async with get_async_session()() as db:
+        await user_directory.sync(db)
@@ -0,0 +1,183 @@
+"""
+Group commit for single-row writes.
+
+SQLite has one writer at a time, so concurrent requests that each commit their own
+transaction queue up on the database lock and pay for a commit apiece. With
+WRITE_QUEUE_ENABLED, create_task and update_task hand their write to one writer
+task instead, which runs the writes that arrive within WRITE_QUEUE_WINDOW_MS (or
+until WRITE_QUEUE_MAX_BATCH are pending) in one transaction and resolves each
+request with its own result.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from config import Config
+from database.session import get_async_session
+
+Operation = Callable[[AsyncSession], Awaitable[Any]]
+
+
+class WriteQueue:
+    """
+        A single writer that commits queued operations in batches.
+
+        An operation is a coroutine function taking the batch's session. It must
+        only touch the database (and create its ORM objects itself), because a
+        batch that fails is rolled back and each of its operations is retried
+        alone, in its own transaction, so that one bad write only fails its own
+        request. Savepoints would avoid the retry, but need the pysqlite
+        transaction workaround on every connection.
+
+        Args:
+            session_factory: Sessions for the batches.
+            window: Seconds to wait for more writes after the first one arrives.
+            max_batch: Operations committed together at most.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker, window: float, max_batch: int):
+        self.session_factory = session_factory
+        self.window = window
+        self.max_batch = max_batch
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._worker: Optional[asyncio.Task] = None
+        self.batches = 0
+        self.writes = 0
+        self.retried_batches = 0
+
+    def start(self):
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+            Commit what is still queued, then stop the writer.
+        """
+        if self._worker is not None:
+            await self._queue.join()
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+        self._worker = None
+
+    async def submit(self, operation: Operation) -> Any:
+        """
+            Queue `operation` and wait for the commit of its batch.
+
+            Returns:
+                Whatever the operation returned, once committed.
+
+            Raises:
+                Whatever the operation (or the commit of it alone) raised.
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((operation, future))
+        return await future
+
+    async def _next_batch(self) -> List[Tuple[Operation, asyncio.Future]]:
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.window
+        while len(batch) < self.max_batch:
+            # Everything that piled up during the previous commit goes without waiting
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self._commit(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _commit(self, batch: List[Tuple[Operation, asyncio.Future]]):
+        # Requests that gave up (client disconnected) are not written
+        batch = [(operation, future) for operation, future in batch if not future.done()]
+        if not batch:
+            return
+
+        self.batches += 1
+        self.writes += len(batch)
+        try:
+            async with self.session_factory() as db:
+                results = [await operation(db) for operation, _ in batch]
+                await db.commit()
+        except Exception:
+            # Find out which write failed by committing each one on its own
+            self.retried_batches += len(batch) > 1
+            for operation, future in batch:
+                await self._commit_alone(operation, future)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def _commit_alone(self, operation: Operation, future: asyncio.Future):
+        try:
+            async with self.session_factory() as db:
+                result = await operation(db)
+                await db.commit()
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            return
+        if not future.done():
+            future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": True,
+            "batches": self.batches,
+            "writes": self.writes,
+            "retried_batches": self.retried_batches,
+            "pending": self._queue.qsize(),
+        }
+
+
+_write_queue: Optional[WriteQueue] = None
+
+
+def start_write_queue():
+    global _write_queue
+    if _write_queue is None and Config.WRITE_QUEUE_ENABLED:
+        _write_queue = WriteQueue(
+            get_async_session(),
+            window=Config.WRITE_QUEUE_WINDOW_MS / 1000,
+            max_batch=Config.WRITE_QUEUE_MAX_BATCH,
+        )
+        _write_queue.start()
+
+
+async def stop_write_queue():
+    global _write_queue
+    if _write_queue is not None:
+        await _write_queue.stop()
+    _write_queue = None
+
+
+async def run_write(db: AsyncSession, operation: Operation) -> Any:
+    """
+        Run a write and commit it: through the group-commit queue when it is
+        enabled, otherwise directly in the request's session `db`.
+    """
+    if _write_queue is None:
+        result = await operation(db)
+        await db.commit()
+        return result
+    return await _write_queue.submit(operation)
+
+
+def write_queue_stats() -> dict:
+    return _write_queue.stats() if _write_queue is not None else {"enabled": False}
@@ -1,9 +1,46 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from api import auth_router, task_router, user_router
+from ai.backfill import start_backfill_runner, stop_backfill_runner
+from ai.recommendations import start_recommendation_batcher, stop_recommendation_batcher
+from api import admin_router, ai_backfill_router, auth_router, metrics_router, task_router, user_router
+from config import Config
+from database.archive import start_archive_compactor, stop_archive_compactor
+from database.refresh_tokens import start_refresh_token_pruner, stop_refresh_token_pruner
+from database.session import init_engine, dispose_engine, init_async_engine, dispose_async_engine
+from database.user_directory import load_user_directory
+from database.write_queue import start_write_queue, stop_write_queue
+from metrics import MetricsMiddleware
+from security import start_password_pool, stop_password_pool
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    # One engine (and connection pool) per process, shared by every request.
+    # Routes use the async engine; the sync one remains for scripts and sync callers.
+    init_engine()
+    init_async_engine()
+    await load_user_directory()
+    start_password_pool()
+    start_write_queue()
+    start_archive_compactor()
+    start_refresh_token_pruner()
+    start_recommendation_batcher()
+    await start_backfill_runner()
+    yield
+    await stop_backfill_runner()
+    await stop_recommendation_batcher()
+    await stop_refresh_token_pruner()
+    await stop_archive_compactor()
+    await stop_write_queue()
+    stop_password_pool()
+    await dispose_async_engine()
+    dispose_engine()
 
-app = FastAPI()
+
+app = FastAPI(lifespan=lifespan)
 
 # Define a CORS policy for your frontend (allow requests from localhost:4200)
 app.add_middleware(
@@ -16,6 +53,13 @@ app.add_middleware(
 app.include_router(auth_router)
 app.include_router(task_router)
 app.include_router(user_router)
+app.include_router(admin_router)
+app.include_router(ai_backfill_router)
+
+if Config.METRICS_ENABLED:
+    # Added last, so it is the outermost middleware and times everything
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics_router)
 
 @app.get("/")
 async def root():
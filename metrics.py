@@ -0,0 +1,319 @@
+"""
+Prometheus metrics, served in the text exposition format on GET /metrics.
+
+    http_*     per route, recorded by MetricsMiddleware
+    db_*       per statement (verb and table), recorded by the cursor hooks that
+               database/session.py attaches to every engine
+    openai_*   per AI feature, recorded around the chat completion calls
+
+The routes, the SQL hooks and the OpenAI calls all run on the event loop thread,
+so updates are plain unlocked increments; sync scripts using the metrics from
+other threads may, rarely, lose one. METRICS_ENABLED=false turns off the middleware,
+the SQL hooks and the endpoint.
+"""
+import re
+import time
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+
+HTTP_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+OPENAI_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[tuple, object] = {}
+
+    def labels(self, *values):
+        """
+            The child for these label values (in labelnames order), created on first use.
+        """
+        child = self._children.get(values)
+        if child is None:
+            child = self._children[values] = self._new_child()
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in list(self._children.items()):
+            lines.extend(self._render_child(values, child))
+        return lines
+
+    def _render_child(self, values: tuple, child) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"]
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.value -= amount
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return _Value()
+
+
+class _HistogramValue:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # The last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Tuple[float, ...] = HTTP_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def _render_child(self, values: tuple, child: _HistogramValue) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip((*self.buckets, "+Inf"), child.counts):
+            cumulative += count
+            le = f'le="{bound if isinstance(bound, str) else _format_value(bound)}"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, values, le)} {cumulative}")
+        labels = _format_labels(self.labelnames, values)
+        lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+        lines.append(f"{self.name}_count{labels} {child.count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+http_requests = REGISTRY.register(Counter(
+    "http_requests_total", "HTTP requests by route template and status code.", ("method", "route", "status")))
+http_request_duration = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "Time until the response body was sent (streams count until they end).",
+    ("method", "route"), HTTP_BUCKETS))
+http_requests_in_flight = REGISTRY.register(Gauge(
+    "http_requests_in_flight", "HTTP requests being handled, including open streams."))
+
+db_statement_duration = REGISTRY.register(Histogram(
+    "db_statement_duration_seconds", "SQL statement execution time by verb and table (fetching excluded).",
+    ("statement",), DB_BUCKETS))
+db_statement_rows = REGISTRY.register(Counter(
+    "db_statement_rows_total", "Rows changed by INSERT, UPDATE and DELETE statements.", ("statement",)))
+db_statement_errors = REGISTRY.register(Counter(
+    "db_statement_errors_total", "SQL statements that raised.", ("statement",)))
+
+openai_requests = REGISTRY.register(Counter(
+    "openai_requests_total", "OpenAI chat completion requests by feature and outcome.", ("operation", "outcome")))
+openai_request_duration = REGISTRY.register(Histogram(
+    "openai_request_duration_seconds", "OpenAI chat completion time, until the last chunk for streams.",
+    ("operation",), OPENAI_BUCKETS))
+openai_tokens = REGISTRY.register(Counter(
+    "openai_tokens_total", "Tokens billed by OpenAI, as reported in the responses' usage.", ("operation", "type")))
+
+
+class MetricsMiddleware:
+    """
+        Pure ASGI middleware (no BaseHTTPMiddleware, which wraps every response in
+        an extra task and stream) recording the http_* metrics. Requests are
+        labelled with their route's path template, e.g. /task/{task_id}, so the
+        number of series stays bounded; unknown paths share the "unmatched" route.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+        in_flight = http_requests_in_flight.labels()
+        in_flight.inc()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_flight.dec()
+            # The router stores the matched route in the (shared) scope
+            method, route = scope["method"], _route_template(scope)
+            http_requests.labels(method, route, str(status)).inc()
+            http_request_duration.labels(method, route).observe(time.perf_counter() - start)
+
+
+def _route_template(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+_VERB = re.compile(r"\s*(\w+)")
+_WRITTEN_TABLE = re.compile(r"\s*\w+\s+(?:OR\s+\w+\s+)?(?:INTO\s+|FROM\s+)?\"?(\w+)", re.IGNORECASE)
+_READ_TABLE = re.compile(r"\bFROM\s+\"?(\w+)", re.IGNORECASE)
+_statement_labels: Dict[str, str] = {}
+
+
+def statement_label(statement: str) -> str:
+    """
+        The verb and main table of a statement: "SELECT tasks", "INSERT task_stats",
+        "PRAGMA". SQLAlchemy reuses its compiled statement strings, so the labels
+        are cached by statement text.
+    """
+    label = _statement_labels.get(statement)
+    if label is not None:
+        return label
+
+    match = _VERB.match(statement)
+    verb = match.group(1).upper() if match else "OTHER"
+    if verb in ("INSERT", "REPLACE", "UPDATE", "DELETE"):
+        table = _WRITTEN_TABLE.match(statement)
+    elif verb in ("SELECT", "WITH"):
+        table = _READ_TABLE.search(statement)
+    else:
+        table = None
+    label = f"{verb} {table.group(1)}" if table else verb
+
+    if len(_statement_labels) < 10000:
+        _statement_labels[statement] = label
+    return label
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["metrics_start"].pop()
+    label = statement_label(statement)
+    db_statement_duration.labels(label).observe(elapsed)
+    if cursor.rowcount > 0:
+        db_statement_rows.labels(label).inc(cursor.rowcount)
+
+
+def _handle_error(context):
+    starts = context.connection.info.get("metrics_start") if context.connection is not None else None
+    if starts:
+        starts.pop()
+    db_statement_errors.labels(statement_label(context.statement or "")).inc()
+
+
+def instrument_engine(engine):
+    """
+        Record the db_* metrics for every statement run on `engine` (a sync Engine,
+        or an AsyncEngine's sync_engine).
+    """
+    from sqlalchemy import event
+
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+class track_openai:
+    """
+        Record an OpenAI call's duration, outcome and token usage:
+
+            with track_openai("recommendation") as call:
+                response = await client.chat.completions.create(...)
+                call.record_usage(response.usage)
+    """
+
+    def __init__(self, operation: str):
+        self.operation = operation
+        self.start: Optional[float] = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def record_usage(self, usage):
+        if usage is None:
+            return
+        openai_tokens.labels(self.operation, "prompt").inc(getattr(usage, "prompt_tokens", 0) or 0)
+        openai_tokens.labels(self.operation, "completion").inc(getattr(usage, "completion_tokens", 0) or 0)
+
+    def __exit__(self, exc_type, exc, tb):
+        openai_request_duration.labels(self.operation).observe(time.perf_counter() - self.start)
+        if exc_type is None:
+            outcome = "ok"
+        elif issubclass(exc_type, Exception):
+            outcome = "error"
+        else:
+            outcome = "cancelled"  # e.g. the HTTP client of a streamed suggestion went away
+        openai_requests.labels(self.operation, outcome).inc()
+        return False
+
+
+def render() -> str:
+    return REGISTRY.render()
+
@@ -0,0 +1,36 @@
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, ForeignKey, String, DateTime, Index
+
+from database.base_class import Base
+from database.types import UUIDBytes
+
+ACTIVE_STATUSES = ("pending", "running")
+
+
+class AiBackfillJob(Base):
+    """
+        A bulk AI classification of existing tasks, run by ai/backfill.py.
+        `checkpoint` is the id of the last task written back.
+    """
+    __tablename__ = "ai_backfill_jobs"
+
+    id = Column(Integer, primary_key=True)
+    status = Column(String, nullable=False, default="pending")
+    filters = Column(String, nullable=False, default="{}")  # JSON of schemas.ai_backfill.BackfillFilters
+    total = Column(Integer, nullable=False, default=0)
+    processed = Column(Integer, nullable=False, default=0)
+    changed = Column(Integer, nullable=False, default=0)
+    skipped = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    checkpoint = Column(UUIDBytes, nullable=True)
+    error = Column(String, nullable=True)
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+    created_date = Column(DateTime, nullable=False, default=lambda: datetime.now())
+    updated_date = Column(DateTime, nullable=True, onupdate=lambda: datetime.now())
+    finished_date = Column(DateTime, nullable=True)
+
+    # Mirrors sql/migrations/0011_ai_backfill_jobs.sql, which is what actually creates it
+    __table_args__ = (
+        Index("ix_ai_backfill_jobs_active", id, sqlite_where=status.in_(ACTIVE_STATUSES)),
+    )
@@ -0,0 +1,27 @@
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, ForeignKey, LargeBinary, DateTime, Index
+
+from database.base_class import Base
+
+
+class RefreshToken(Base):
+    """
+        A refresh token, known by its SHA-256 only. Every token issued from one
+        login shares its `family`, see database/refresh_tokens.py.
+    """
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True)
+    token_hash = Column(LargeBinary, unique=True, nullable=False)
+    family = Column(LargeBinary, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    created_date = Column(DateTime, nullable=False, default=lambda: datetime.now())
+    expires_date = Column(DateTime, nullable=False)
+    revoked_date = Column(DateTime, nullable=True)
+
+    # Mirrors sql/migrations/0012_refresh_tokens.sql, which is what actually creates it
+    __table_args__ = (
+        Index("ix_refresh_tokens_family", family),
+        Index("ix_refresh_tokens_expires_date", expires_date),
+    )
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String
+
+from database.base_class import Base
+
+
+class TableVersion(Base):
+    """
+        Change counter per table, bumped on every insert, update and delete by the
+        triggers in sql/migrations/0005_table_versions.sql.
+    """
+    __tablename__ = "table_versions"
+
+    name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
@@ -1,15 +1,30 @@
+import os
+import time
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Date, Column, Integer, ForeignKey, String, DateTime
+from sqlalchemy import Date, Column, Integer, ForeignKey, String, DateTime, Index
 
 from database.base_class import Base
+from database.types import UUIDBytes
+
+
+def new_task_id() -> str:
+    """
+        A UUIDv7: 48 bits of Unix time in milliseconds, then random bits. New ids
+        sort after older ones, so inserts append to the primary key index instead
+        of landing on random pages of it.
+    """
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10), "big")
+    value = value & ~(0xF << 76) | 0x7 << 76  # version 7
+    value = value & ~(0x3 << 62) | 0x2 << 62  # RFC 9562 variant
+    return str(uuid.UUID(int=value))
 
 
 class Task(Base):
     __tablename__ = "tasks"
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(UUIDBytes, primary_key=True, default=new_task_id)  # 16-byte BLOB, see sql/migrations/0009
     title = Column(String, nullable=False)
     description = Column(String, nullable=False)
     assignee = Column(Integer, ForeignKey("users.id"), nullable=True)
@@ -18,3 +33,17 @@ class Task(Base):
     priority = Column(Integer, nullable=False)
     due_date = Column(Date, nullable=True)
     created_date = Column(DateTime, nullable=False, default=lambda: datetime.now())
+    updated_date = Column(DateTime, nullable=True, default=lambda: datetime.now(), onupdate=lambda: datetime.now())
+    version = Column(Integer, nullable=False, default=1)  # Bumped by every update, see crud.task
+
+    # Mirrors sql/migrations 0002_task_indexes.sql, 0007_task_updated_date.sql and 0010_tasks_archive.sql,
+    # which are what actually create them
+    __table_args__ = (
+        Index("ix_tasks_open_due_priority", due_date, priority.desc(), id, sqlite_where=status != 2),
+        Index("ix_tasks_open_assignee_due_priority", assignee, due_date, priority.desc(), id,
+              sqlite_where=status != 2),
+        Index("ix_tasks_status_due_priority", status, due_date, priority.desc(), id),
+        Index("ix_tasks_assignee_created", assignee, created_date.desc()),
+        Index("ix_tasks_updated", updated_date),
+        Index("ix_tasks_done_updated", updated_date, sqlite_where=status == 2),
+    )
@@ -0,0 +1,34 @@
+from datetime import datetime
+
+from sqlalchemy import Date, Column, Integer, ForeignKey, String, DateTime, Index
+
+from database.base_class import Base
+from database.types import UUIDBytes
+
+
+class TaskArchive(Base):
+    """
+        Tasks done for longer than ARCHIVE_AFTER_DAYS, moved out of tasks by
+        database/archive.py. Same columns as Task, plus when it was archived.
+    """
+    __tablename__ = "tasks_archive"
+
+    id = Column(UUIDBytes, primary_key=True)
+    title = Column(String, nullable=False)
+    description = Column(String, nullable=False)
+    assignee = Column(Integer, ForeignKey("users.id"), nullable=True)
+    status = Column(Integer, nullable=False)
+    severity = Column(Integer, nullable=False)
+    priority = Column(Integer, nullable=False)
+    due_date = Column(Date, nullable=True)
+    created_date = Column(DateTime, nullable=False)
+    updated_date = Column(DateTime, nullable=True)
+    version = Column(Integer, nullable=False)
+    archived_date = Column(DateTime, nullable=False, default=lambda: datetime.now())
+
+    # Mirrors sql/migrations/0010_tasks_archive.sql, which is what actually creates them
+    __table_args__ = (
+        Index("ix_tasks_archive_due_priority", due_date, priority.desc(), id),
+        Index("ix_tasks_archive_assignee_due_priority", assignee, due_date, priority.desc(), id),
+        Index("ix_tasks_archive_updated", updated_date),
+    )
@@ -0,0 +1,12 @@
+from sqlalchemy import column, literal_column, table
+
+# The tasks_fts FTS5 index from sql/migrations/0006_task_search.sql. A virtual
+# table, so it is described here for queries only and is not part of Base.metadata.
+tasks_fts = table("tasks_fts", column("rowid"), column("rank"), column("title"), column("description"))
+
+# The whole-table column FTS5 uses as the left operand of MATCH
+tasks_fts_match = literal_column("tasks_fts")
+
+# The rowid of tasks (its seq column, see sql/migrations/0015) is what tasks_fts is
+# keyed on; Task does not map it
+task_rowid = literal_column("tasks.rowid")
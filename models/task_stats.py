@@ -0,0 +1,48 @@
+from sqlalchemy import Column, Integer, Date, Index
+
+from database.base_class import Base
+
+
+class TaskStats(Base):
+    """
+        Number of tasks per (status, assignee, due_date), maintained by the
+        triggers in sql/migrations/0004_task_stats.sql.
+    """
+    __tablename__ = "task_stats"
+
+    id = Column(Integer, primary_key=True)
+    status = Column(Integer, nullable=False)
+    assignee = Column(Integer, nullable=True)
+    due_date = Column(Date, nullable=True)
+    count = Column(Integer, nullable=False, default=0)
+
+    # Mirrors sql/migrations/0013_task_stats_lookup.sql, which is what actually creates them
+    __table_args__ = (
+        Index("ix_task_stats_assignee_due", assignee, due_date),
+        Index("ix_task_stats_due", due_date),
+    )
+
+
+class TaskStatusTotal(Base):
+    """
+        Number of tasks per status, rolled up from task_stats by the triggers in
+        sql/migrations/0014_task_stats_rollups.sql.
+    """
+    __tablename__ = "task_status_totals"
+
+    status = Column(Integer, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class TaskAssigneeStats(Base):
+    """
+        Number of tasks per (status, assignee), rolled up from task_stats by the
+        triggers in sql/migrations/0014_task_stats_rollups.sql. Keyed on
+        IFNULL(assignee, -1): query it that way to use the index.
+    """
+    __tablename__ = "task_assignee_stats"
+
+    id = Column(Integer, primary_key=True)
+    status = Column(Integer, nullable=False)
+    assignee = Column(Integer, nullable=True)
+    count = Column(Integer, nullable=False, default=0)
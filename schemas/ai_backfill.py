@@ -0,0 +1,41 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, ConfigDict
+
+from schemas.task import Priority, Severity, Status
+
+
+class BackfillFilters(BaseModel):
+    """
+        The tasks a backfill job classifies; every field given must match.
+        Archived tasks are never included.
+    """
+    status: Optional[Status] = None
+    assignee: Optional[int] = None
+    severity: Optional[Severity] = None
+    priority: Optional[Priority] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+
+
+class BackfillJobResponse(BaseModel):
+    id: int
+    status: str
+    filters: BackfillFilters
+    total: int
+    processed: int
+    changed: int
+    skipped: int
+    failed: int
+    checkpoint: Optional[str]
+    error: Optional[str]
+    created_date: datetime
+    updated_date: Optional[datetime]
+    finished_date: Optional[datetime]
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class BackfillJobsResponse(BaseModel):
+    jobs: List[BackfillJobResponse]
@@ -1,6 +1,14 @@
+from typing import Optional
+
 from pydantic import BaseModel
 
 
 class Token(BaseModel):
     access_token: str
     token_type: str
+    expires_in: int  # Seconds the access token is valid for
+    refresh_token: Optional[str] = None  # Not issued when REFRESH_TOKEN_TTL_DAYS is 0
+
+
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
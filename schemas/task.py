@@ -1,6 +1,6 @@
 from datetime import date
 from enum import Enum
-from typing import Optional, List
+from typing import Optional, List, Union
 
 from pydantic import BaseModel, ConfigDict
 
@@ -47,6 +47,10 @@ class TaskUpdate(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class TaskBulkUpdate(TaskUpdate):
+    id: str
+
+
 class TaskCreateResponse(BaseModel):
     id: str
     title: str
@@ -56,6 +60,7 @@ class TaskCreateResponse(BaseModel):
     severity: Severity
     priority: Priority
     due_date: Optional[date]
+    version: int
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -76,16 +81,30 @@ class TaskGetResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 class Pagination(BaseModel):
-    total: int
+    total: Optional[int] = None  # Only counted when requested with include_total
     more: bool
     offset: int
     limit: int
+    next_cursor: Optional[str] = None
 
 class TasksGetResponse(BaseModel):
     tasks: List[TaskGetResponse]
     pagination: Pagination
     model_config = ConfigDict(from_attributes=True)
 
+
+class BulkItemResult(BaseModel):
+    index: int
+    id: Optional[str] = None
+    error: Optional[Union[str, List[dict]]] = None
+
+
+class BulkResponse(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[BulkItemResult]
+
+
 class TaskRecommendSeverity(BaseModel):
     title: str
     description: str
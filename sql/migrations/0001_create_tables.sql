@@ -1,3 +1,14 @@
+-- Initial schema, previously created by the raw `make db-tables` scripts
+CREATE TABLE IF NOT EXISTS users
+(
+    id              INTEGER PRIMARY KEY AUTOINCREMENT,
+    username        TEXT NOT NULL UNIQUE,
+    hashed_password TEXT NOT NULL
+);
+
+-- Create an index on the 'username' column to speed up queries
+CREATE INDEX IF NOT EXISTS idx_username ON users (username);
+
 CREATE TABLE IF NOT EXISTS tasks
 (
     id          TEXT PRIMARY KEY,
@@ -11,4 +22,3 @@ CREATE TABLE IF NOT EXISTS tasks
     created_date DATETIME DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (assignee) REFERENCES users (id)
 );
-
@@ -0,0 +1,21 @@
+-- Indexes matching the access paths of the task routes.
+-- Open tasks (status != 2) are what the list and open-count endpoints read by default,
+-- so those indexes are partial and never hold finished tasks.
+
+-- GET /tasks (default filter), GET /tasks/open-count?due_date=
+CREATE INDEX IF NOT EXISTS ix_tasks_open_due_priority
+    ON tasks (due_date, priority DESC, id) WHERE status != 2;
+
+-- GET /tasks?assignee=, GET /tasks/open-count?assignee=[&due_date=]
+CREATE INDEX IF NOT EXISTS ix_tasks_open_assignee_due_priority
+    ON tasks (assignee, due_date, priority DESC, id) WHERE status != 2;
+
+-- GET /tasks?status=, GET /tasks/percentage-complete
+CREATE INDEX IF NOT EXISTS ix_tasks_status_due_priority
+    ON tasks (status, due_date, priority DESC, id);
+
+-- POST /task/suggest-new (latest tasks of the current user)
+CREATE INDEX IF NOT EXISTS ix_tasks_assignee_created
+    ON tasks (assignee, created_date DESC);
+
+ANALYZE;
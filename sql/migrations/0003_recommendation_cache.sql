@@ -0,0 +1,7 @@
+-- Persistent tier of the AI recommendation cache (ai/cache.py)
+CREATE TABLE IF NOT EXISTS recommendation_cache
+(
+    key        TEXT PRIMARY KEY, -- sha256 of the normalized title and description
+    value      TEXT NOT NULL,    -- JSON recommendation
+    expires_at REAL NOT NULL     -- Unix timestamp
+);
@@ -0,0 +1,53 @@
+-- Task counts per (status, assignee, due_date), kept up to date by triggers so the
+-- open-count and percentage-complete endpoints never have to COUNT the tasks table.
+-- Check or repair it with `python -m database.task_stats verify|rebuild`.
+CREATE TABLE IF NOT EXISTS task_stats
+(
+    id       INTEGER PRIMARY KEY,
+    status   INTEGER NOT NULL,
+    assignee INTEGER,
+    due_date DATE,
+    count    INTEGER NOT NULL DEFAULT 0
+);
+
+-- NULLs are distinct in a plain UNIQUE constraint, so key on expressions instead
+CREATE UNIQUE INDEX IF NOT EXISTS ux_task_stats_key
+    ON task_stats (status, IFNULL(assignee, -1), IFNULL(due_date, ''));
+
+CREATE TRIGGER IF NOT EXISTS task_stats_after_insert
+    AFTER INSERT ON tasks
+BEGIN
+    INSERT INTO task_stats (status, assignee, due_date, count)
+    VALUES (NEW.status, NEW.assignee, NEW.due_date, 1)
+    ON CONFLICT (status, IFNULL(assignee, -1), IFNULL(due_date, '')) DO UPDATE SET count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS task_stats_after_delete
+    AFTER DELETE ON tasks
+BEGIN
+    UPDATE task_stats
+    SET count = count - 1
+    WHERE status = OLD.status AND IFNULL(assignee, -1) = IFNULL(OLD.assignee, -1)
+      AND IFNULL(due_date, '') = IFNULL(OLD.due_date, '');
+END;
+
+CREATE TRIGGER IF NOT EXISTS task_stats_after_update
+    AFTER UPDATE OF status, assignee, due_date ON tasks
+    WHEN OLD.status IS NOT NEW.status OR OLD.assignee IS NOT NEW.assignee OR OLD.due_date IS NOT NEW.due_date
+BEGIN
+    UPDATE task_stats
+    SET count = count - 1
+    WHERE status = OLD.status AND IFNULL(assignee, -1) = IFNULL(OLD.assignee, -1)
+      AND IFNULL(due_date, '') = IFNULL(OLD.due_date, '');
+
+    INSERT INTO task_stats (status, assignee, due_date, count)
+    VALUES (NEW.status, NEW.assignee, NEW.due_date, 1)
+    ON CONFLICT (status, IFNULL(assignee, -1), IFNULL(due_date, '')) DO UPDATE SET count = count + 1;
+END;
+
+-- Backfill from the existing tasks
+DELETE FROM task_stats;
+INSERT INTO task_stats (status, assignee, due_date, count)
+SELECT status, assignee, due_date, COUNT(*)
+FROM tasks
+GROUP BY status, assignee, due_date;
@@ -0,0 +1,47 @@
+-- A change counter per table, bumped by triggers on every write, so list endpoints
+-- can derive ETags and answer If-None-Match without running their queries.
+CREATE TABLE IF NOT EXISTS table_versions
+(
+    name    TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+
+INSERT OR IGNORE INTO table_versions (name, version)
+VALUES ('tasks', 0),
+       ('users', 0);
+
+CREATE TRIGGER IF NOT EXISTS table_versions_tasks_insert
+    AFTER INSERT ON tasks
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'tasks';
+END;
+
+CREATE TRIGGER IF NOT EXISTS table_versions_tasks_update
+    AFTER UPDATE ON tasks
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'tasks';
+END;
+
+CREATE TRIGGER IF NOT EXISTS table_versions_tasks_delete
+    AFTER DELETE ON tasks
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'tasks';
+END;
+
+CREATE TRIGGER IF NOT EXISTS table_versions_users_insert
+    AFTER INSERT ON users
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'users';
+END;
+
+CREATE TRIGGER IF NOT EXISTS table_versions_users_update
+    AFTER UPDATE ON users
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'users';
+END;
+
+CREATE TRIGGER IF NOT EXISTS table_versions_users_delete
+    AFTER DELETE ON users
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = 'users';
+END;
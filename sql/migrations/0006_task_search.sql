@@ -0,0 +1,37 @@
+-- Full-text index over task titles and descriptions for GET /tasks/search.
+-- External content table: the text lives only in tasks, tasks_fts holds the index
+-- keyed by tasks.rowid, which 0015_task_rowid_key.py makes an INTEGER PRIMARY KEY
+-- (seq) so that VACUUM cannot renumber it.
+CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5
+(
+    title,
+    description,
+    content = 'tasks',
+    content_rowid = 'rowid',
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+
+CREATE TRIGGER IF NOT EXISTS tasks_fts_after_insert
+    AFTER INSERT ON tasks
+BEGIN
+    INSERT INTO tasks_fts (rowid, title, description) VALUES (NEW.rowid, NEW.title, NEW.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS tasks_fts_after_delete
+    AFTER DELETE ON tasks
+BEGIN
+    INSERT INTO tasks_fts (tasks_fts, rowid, title, description) VALUES ('delete', OLD.rowid, OLD.title, OLD.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS tasks_fts_after_update
+    AFTER UPDATE OF title, description ON tasks
+BEGIN
+    INSERT INTO tasks_fts (tasks_fts, rowid, title, description) VALUES ('delete', OLD.rowid, OLD.title, OLD.description);
+    INSERT INTO tasks_fts (rowid, title, description) VALUES (NEW.rowid, NEW.title, NEW.description);
+END;
+
+INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild');
+
+-- Default ranking for ORDER BY rank: a title hit counts ten times a description hit
+INSERT INTO tasks_fts (tasks_fts, rank) VALUES ('rank', 'bm25(10.0, 1.0)');
@@ -0,0 +1,15 @@
+-- Last modification time of a task, for incremental exports (GET /tasks/export?updated_since=).
+-- The ORM sets it on every insert and update (models/task.py); rows inserted with raw
+-- SQL that leave it empty (seed scripts) get their created_date.
+ALTER TABLE tasks ADD COLUMN updated_date DATETIME;
+
+UPDATE tasks SET updated_date = created_date;
+
+CREATE TRIGGER IF NOT EXISTS tasks_updated_date_default
+    AFTER INSERT ON tasks
+    WHEN NEW.updated_date IS NULL
+BEGIN
+    UPDATE tasks SET updated_date = NEW.created_date WHERE rowid = NEW.rowid;
+END;
+
+CREATE INDEX IF NOT EXISTS ix_tasks_updated ON tasks (updated_date);
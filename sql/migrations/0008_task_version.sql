@@ -0,0 +1,4 @@
+-- Row version for optimistic concurrency: bumped by every application update and
+-- exposed as the task's ETag, so PUT /task/{id} with If-Match fails with 412
+-- instead of overwriting a concurrent edit.
+ALTER TABLE tasks ADD COLUMN version INTEGER NOT NULL DEFAULT 1;
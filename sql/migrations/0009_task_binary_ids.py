@@ -0,0 +1,53 @@
+"""
+Store task ids as 16-byte BLOBs instead of their 36-character text form.
+
+The id is in every index on tasks (the primary key and the ordering indexes of
+0002), so this shrinks all of them. SQLite cannot change a column's type in
+place: the table is rebuilt as tasks_new, the rows copied with their rowid (which
+tasks_fts and the trigger bookkeeping refer to), and the indexes and triggers
+defined on tasks re-created as they were. The API keeps the text form, see
+database/types.py.
+"""
+import uuid
+
+COLUMNS = "title, description, assignee, status, severity, priority, due_date, created_date, updated_date, version"
+
+
+def _uuid_bytes(value):
+    return uuid.UUID(value).bytes if isinstance(value, str) else value
+
+
+def upgrade(connection):
+    connection.create_function("uuid_bytes", 1, _uuid_bytes, deterministic=True)
+
+    # Dropping tasks drops these with it (without firing the delete triggers)
+    dependents = [sql for (sql,) in connection.execute(
+        "SELECT sql FROM sqlite_master WHERE tbl_name = 'tasks' AND type IN ('index', 'trigger') AND sql IS NOT NULL "
+        "ORDER BY type, name"
+    )]
+
+    connection.execute("""
+        CREATE TABLE tasks_new
+        (
+            id           BLOB PRIMARY KEY CHECK (typeof(id) = 'blob' AND length(id) = 16),
+            title        TEXT                                  NOT NULL,
+            description  TEXT                                  NOT NULL,
+            assignee     INTEGER,
+            status       INTEGER CHECK (status IN (0, 1, 2))   NOT NULL,
+            severity     INTEGER CHECK (severity IN (0, 1, 2)) NOT NULL,
+            priority     INTEGER CHECK (priority IN (0, 1, 2)) NOT NULL,
+            due_date     DATE,
+            created_date DATETIME DEFAULT CURRENT_TIMESTAMP,
+            updated_date DATETIME,
+            version      INTEGER                               NOT NULL DEFAULT 1,
+            FOREIGN KEY (assignee) REFERENCES users (id)
+        )
+    """)
+    connection.execute(
+        f"INSERT INTO tasks_new (rowid, id, {COLUMNS}) SELECT rowid, uuid_bytes(id), {COLUMNS} FROM tasks ORDER BY rowid"
+    )
+    connection.execute("DROP TABLE tasks")
+    connection.execute("ALTER TABLE tasks_new RENAME TO tasks")
+    for sql in dependents:
+        connection.execute(sql)
+    connection.execute("ANALYZE tasks")
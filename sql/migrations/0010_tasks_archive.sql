@@ -0,0 +1,47 @@
+-- Cold tier for tasks done longer than ARCHIVE_AFTER_DAYS, filled by database/archive.py.
+-- Same columns as tasks; GET /tasks?status=2 and the export read both tables.
+CREATE TABLE IF NOT EXISTS tasks_archive
+(
+    id            BLOB PRIMARY KEY CHECK (typeof(id) = 'blob' AND length(id) = 16),
+    title         TEXT                                  NOT NULL,
+    description   TEXT                                  NOT NULL,
+    assignee      INTEGER,
+    status        INTEGER CHECK (status IN (0, 1, 2))   NOT NULL,
+    severity      INTEGER CHECK (severity IN (0, 1, 2)) NOT NULL,
+    priority      INTEGER CHECK (priority IN (0, 1, 2)) NOT NULL,
+    due_date      DATE,
+    created_date  DATETIME,
+    updated_date  DATETIME,
+    version       INTEGER                               NOT NULL DEFAULT 1,
+    archived_date DATETIME                              NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (assignee) REFERENCES users (id)
+);
+
+-- Same orderings as the GET /tasks indexes of 0002; every archived task is done
+CREATE INDEX IF NOT EXISTS ix_tasks_archive_due_priority
+    ON tasks_archive (due_date, priority DESC, id);
+CREATE INDEX IF NOT EXISTS ix_tasks_archive_assignee_due_priority
+    ON tasks_archive (assignee, due_date, priority DESC, id);
+CREATE INDEX IF NOT EXISTS ix_tasks_archive_updated ON tasks_archive (updated_date);
+
+-- What the compactor looks for: done tasks by last modification
+CREATE INDEX IF NOT EXISTS ix_tasks_done_updated ON tasks (updated_date) WHERE status = 2;
+
+-- task_stats keeps counting archived tasks, so the percentage complete does not
+-- change when tasks move between the tiers
+CREATE TRIGGER IF NOT EXISTS task_stats_archive_after_insert
+    AFTER INSERT ON tasks_archive
+BEGIN
+    INSERT INTO task_stats (status, assignee, due_date, count)
+    VALUES (NEW.status, NEW.assignee, NEW.due_date, 1)
+    ON CONFLICT (status, IFNULL(assignee, -1), IFNULL(due_date, '')) DO UPDATE SET count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS task_stats_archive_after_delete
+    AFTER DELETE ON tasks_archive
+BEGIN
+    UPDATE task_stats
+    SET count = count - 1
+    WHERE status = OLD.status AND IFNULL(assignee, -1) = IFNULL(OLD.assignee, -1)
+      AND IFNULL(due_date, '') = IFNULL(OLD.due_date, '');
+END;
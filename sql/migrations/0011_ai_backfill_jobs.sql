@@ -0,0 +1,25 @@
+-- Bulk AI classification of existing tasks (ai/backfill.py). A job walks the tasks
+-- matching its filter in id order; checkpoint is the last task id it wrote back,
+-- committed with the task updates, so a restarted server resumes after it.
+CREATE TABLE IF NOT EXISTS ai_backfill_jobs
+(
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    status        TEXT CHECK (status IN ('pending', 'running', 'done', 'cancelled', 'failed')) NOT NULL,
+    filters       TEXT                                  NOT NULL DEFAULT '{}',
+    total         INTEGER                               NOT NULL DEFAULT 0,
+    processed     INTEGER                               NOT NULL DEFAULT 0,
+    changed       INTEGER                               NOT NULL DEFAULT 0,
+    skipped       INTEGER                               NOT NULL DEFAULT 0,
+    failed        INTEGER                               NOT NULL DEFAULT 0,
+    checkpoint    BLOB,
+    error         TEXT,
+    created_by    INTEGER,
+    created_date  DATETIME                              NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_date  DATETIME,
+    finished_date DATETIME,
+    FOREIGN KEY (created_by) REFERENCES users (id)
+);
+
+-- What the runner resumes at startup
+CREATE INDEX IF NOT EXISTS ix_ai_backfill_jobs_active ON ai_backfill_jobs (id)
+    WHERE status IN ('pending', 'running');
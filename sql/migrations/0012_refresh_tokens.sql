@@ -0,0 +1,18 @@
+-- Refresh tokens issued by /login and rotated by /token/refresh (database/refresh_tokens.py).
+-- Only the SHA-256 of a token is stored. Every token of one login shares a family:
+-- a rotated token presented again revokes the whole family. Rows are pruned once
+-- they expire; rotated and revoked ones are kept until then to detect reuse.
+CREATE TABLE IF NOT EXISTS refresh_tokens
+(
+    id           INTEGER PRIMARY KEY,
+    token_hash   BLOB UNIQUE NOT NULL,
+    family       BLOB        NOT NULL,
+    user_id      INTEGER     NOT NULL,
+    created_date DATETIME    NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    expires_date DATETIME    NOT NULL,
+    revoked_date DATETIME,
+    FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS ix_refresh_tokens_family ON refresh_tokens (family);
+CREATE INDEX IF NOT EXISTS ix_refresh_tokens_expires_date ON refresh_tokens (expires_date);
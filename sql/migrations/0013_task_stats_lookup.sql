@@ -0,0 +1,5 @@
+-- GET /tasks/open-count?assignee=[&due_date=] and ?due_date= look up task_stats by
+-- plain columns, which the expression index ux_task_stats_key cannot serve, and
+-- task_stats holds a row per status, assignee and due date.
+CREATE INDEX IF NOT EXISTS ix_task_stats_assignee_due ON task_stats (assignee, due_date);
+CREATE INDEX IF NOT EXISTS ix_task_stats_due ON task_stats (due_date);
@@ -0,0 +1,69 @@
+-- Coarse rollups of task_stats, so the unfiltered and assignee-only open counts and
+-- the percentage complete read a handful of rows however many assignees and due
+-- dates there are: task_stats itself grows with both. The triggers below apply
+-- every change of task_stats to them, so whatever maintains task_stats (the tasks
+-- and tasks_archive triggers, database/task_stats.py rebuild) maintains them too.
+CREATE TABLE IF NOT EXISTS task_status_totals
+(
+    status INTEGER PRIMARY KEY,
+    count  INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS task_assignee_stats
+(
+    id       INTEGER PRIMARY KEY,
+    status   INTEGER NOT NULL,
+    assignee INTEGER,
+    count    INTEGER NOT NULL DEFAULT 0
+);
+
+-- Looked up with IFNULL(assignee, -1) = ?, -1 being how the API asks for unassigned tasks
+CREATE UNIQUE INDEX IF NOT EXISTS ux_task_assignee_stats_key
+    ON task_assignee_stats (IFNULL(assignee, -1), status);
+
+CREATE TRIGGER IF NOT EXISTS task_stats_rollup_after_insert
+    AFTER INSERT ON task_stats
+BEGIN
+    INSERT INTO task_status_totals (status, count)
+    VALUES (NEW.status, NEW.count)
+    ON CONFLICT (status) DO UPDATE SET count = count + excluded.count;
+
+    INSERT INTO task_assignee_stats (status, assignee, count)
+    VALUES (NEW.status, NEW.assignee, NEW.count)
+    ON CONFLICT (IFNULL(assignee, -1), status) DO UPDATE SET count = count + excluded.count;
+END;
+
+-- The status and assignee of a task_stats row never change, only its count
+CREATE TRIGGER IF NOT EXISTS task_stats_rollup_after_update
+    AFTER UPDATE OF count ON task_stats
+    WHEN OLD.count IS NOT NEW.count
+BEGIN
+    UPDATE task_status_totals SET count = count + NEW.count - OLD.count WHERE status = NEW.status;
+
+    UPDATE task_assignee_stats
+    SET count = count + NEW.count - OLD.count
+    WHERE IFNULL(assignee, -1) = IFNULL(NEW.assignee, -1) AND status = NEW.status;
+END;
+
+CREATE TRIGGER IF NOT EXISTS task_stats_rollup_after_delete
+    AFTER DELETE ON task_stats
+BEGIN
+    UPDATE task_status_totals SET count = count - OLD.count WHERE status = OLD.status;
+
+    UPDATE task_assignee_stats
+    SET count = count - OLD.count
+    WHERE IFNULL(assignee, -1) = IFNULL(OLD.assignee, -1) AND status = OLD.status;
+END;
+
+-- Backfill from task_stats
+DELETE FROM task_status_totals;
+INSERT INTO task_status_totals (status, count)
+SELECT status, SUM(count)
+FROM task_stats
+GROUP BY status;
+
+DELETE FROM task_assignee_stats;
+INSERT INTO task_assignee_stats (status, assignee, count)
+SELECT status, assignee, SUM(count)
+FROM task_stats
+GROUP BY status, assignee;
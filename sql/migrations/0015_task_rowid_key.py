@@ -0,0 +1,46 @@
+"""
+Give tasks an INTEGER PRIMARY KEY (seq), an alias of its rowid.
+
+tasks_fts (0006) is an external content index keyed by tasks.rowid. Without an
+INTEGER PRIMARY KEY the rowid is implicit, and VACUUM is free to renumber it,
+which leaves every search hit pointing at some other task until the index is
+rebuilt. A declared alias is part of the row, so VACUUM keeps it. The table is
+rebuilt as in 0009, the rows copied with their rowid into seq; id keeps its
+CHECK and becomes UNIQUE, which is the same index its PRIMARY KEY was on a rowid
+table. tasks_fts is rebuilt at the end in case a VACUUM already renumbered them.
+"""
+COLUMNS = "id, title, description, assignee, status, severity, priority, due_date, created_date, updated_date, version"
+
+
+def upgrade(connection):
+    # Dropping tasks drops these with it (without firing the delete triggers)
+    dependents = [sql for (sql,) in connection.execute(
+        "SELECT sql FROM sqlite_master WHERE tbl_name = 'tasks' AND type IN ('index', 'trigger') AND sql IS NOT NULL "
+        "ORDER BY type, name"
+    )]
+
+    connection.execute("""
+        CREATE TABLE tasks_new
+        (
+            seq          INTEGER PRIMARY KEY,
+            id           BLOB UNIQUE NOT NULL CHECK (typeof(id) = 'blob' AND length(id) = 16),
+            title        TEXT                                  NOT NULL,
+            description  TEXT                                  NOT NULL,
+            assignee     INTEGER,
+            status       INTEGER CHECK (status IN (0, 1, 2))   NOT NULL,
+            severity     INTEGER CHECK (severity IN (0, 1, 2)) NOT NULL,
+            priority     INTEGER CHECK (priority IN (0, 1, 2)) NOT NULL,
+            due_date     DATE,
+            created_date DATETIME DEFAULT CURRENT_TIMESTAMP,
+            updated_date DATETIME,
+            version      INTEGER                               NOT NULL DEFAULT 1,
+            FOREIGN KEY (assignee) REFERENCES users (id)
+        )
+    """)
+    connection.execute(f"INSERT INTO tasks_new (seq, {COLUMNS}) SELECT rowid, {COLUMNS} FROM tasks ORDER BY rowid")
+    connection.execute("DROP TABLE tasks")
+    connection.execute("ALTER TABLE tasks_new RENAME TO tasks")
+    for sql in dependents:
+        connection.execute(sql)
+    connection.execute("INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')")
+    connection.execute("ANALYZE tasks")
@@ -1,4 +1,5 @@
 import sqlite3
+import sys
 import uuid
 from datetime import date, timedelta
 import random
@@ -8,6 +9,10 @@ from pathlib import Path
 SCRIPT_DIR = Path(__file__).parent
 DB_PATH = SCRIPT_DIR.parent.parent / "database.db"
 
+# Run as a script (see the Makefile), so the project root is not on the path
+sys.path.insert(0, str(SCRIPT_DIR.parent.parent))
+from models.task import new_task_id  # noqa: E402
+
 USER_IDS = list(range(1, 11))  # Users with IDs 1-10 (after seeding users)
 STATUSES = [0, 1, 2]  # 0 = To Do, 1 = In Progress, 2 = Done
 SEVERITIES = [0, 1, 2]  # 0 = Low, 1 = Medium, 2 = High
@@ -46,7 +51,7 @@ def generate_tasks(num_tasks=100):
     start_date = date(2025, 3, 20)  # Starting from today
 
     for i in range(num_tasks):
-        task_id = str(uuid.uuid4())
+        task_id = uuid.UUID(new_task_id()).bytes  # tasks.id is a 16-byte BLOB since migration 0009
         title = f"{random.choice(TASK_TITLES)} #{i + 1}"
         description = random.choice(DESCRIPTIONS)
         assignee = random.choice(USER_IDS + [None])  # Random user (1-10) or unassigned